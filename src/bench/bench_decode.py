@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from decode.ffmpeg_decode import DecodeConfig, iter_frames  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark decode backends on one clip.")
+    parser.add_argument("video", help="Input video path")
+    parser.add_argument("--fps", type=float, default=2.0)
+    parser.add_argument("--start", type=float, default=0.0)
+    parser.add_argument("--end", type=float, default=420.0)
+    parser.add_argument("--size", help="Output size as WxH")
+    parser.add_argument("--backend", default="both", help="opencv|ffmpeg|both")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x")) if args.size else None
+    backends = ["opencv", "ffmpeg"] if args.backend == "both" else [args.backend]
+    report = {}
+    for backend in backends:
+        cfg = DecodeConfig(fps=args.fps, start_sec=args.start, end_sec=args.end, size=size, backend=backend)  # type: ignore[arg-type]
+        t0 = time.perf_counter()
+        frames = sum(1 for _ in iter_frames(args.video, cfg))
+        wall = time.perf_counter() - t0
+        report[backend] = {"frames": frames, "wall_sec": round(wall, 3), "frames_per_sec": round(frames / wall, 1) if wall > 0 else 0.0}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench.synth import SynthConfig, load_glyphs, make_script, render_frame, write_profile  # noqa: E402
+from ocr.procpool import OCRProcessPool  # noqa: E402
+from roi.crop import ROITracker  # noqa: E402
+
+PAYLOADS = {
+    "frame": ("checksum", None),
+    "supply": ("supply", "supply"),
+    "selection": ("selection", "selection_panel"),
+    "queue": ("queue", "production_queue"),
+}
+
+
+def make_payload(name: str, count: int, templates_dir: Path) -> List[np.ndarray]:
+    cfg = SynthConfig(duration_sec=count / 10.0 + 2.0, intro_sec=0.0)
+    script = make_script(cfg)
+    glyphs = load_glyphs(templates_dir)
+    roi = PAYLOADS[name][1]
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ROITracker(write_profile(Path(tmp) / "profile.json"))
+    items = []
+    for i in range(count):
+        frame = render_frame(i / 10.0, script, glyphs, cfg)
+        items.append(frame if roi is None else np.ascontiguousarray(tracker.crop(frame, roi)))
+    return items
+
+
+def bench_transport(transport: str, kind: str, items: List[np.ndarray], workers: int, slot_bytes: int, repeat: int) -> Dict:
+    with OCRProcessPool("none", workers=workers, slot_bytes=slot_bytes, transport=transport) as pool:
+        pool.read(kind, items[0])
+        t0 = time.perf_counter()
+        futures = [pool.submit(kind, img) for _ in range(repeat) for img in items]
+        for fut in futures:
+            fut.result()
+        wall = time.perf_counter() - t0
+        stats = pool.stats()
+    n = len(futures)
+    mb = sum(img.nbytes for img in items) * repeat / 1e6
+    return {
+        "transport": transport,
+        "items": n,
+        "wall_sec": round(wall, 3),
+        "items_per_sec": round(n / wall, 1),
+        "mb_per_sec": round(mb / wall, 1),
+        "inline": stats["inline"],
+        "slot_wait_sec": stats["slot_wait_sec"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare shared-memory slots with queue pickling for OCR worker processes.")
+    parser.add_argument("-o", "--out", default="bench_ocr_transport.json")
+    parser.add_argument("--payloads", default="frame,supply,selection,queue", help="Comma list of frame|supply|selection|queue")
+    parser.add_argument("--count", type=int, default=50, help="Distinct images per payload")
+    parser.add_argument("--repeat", type=int, default=2, help="Submit every image this many times")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--transport-only", action="store_true", help="Workers only checksum the pixels instead of running OCR")
+    args = parser.parse_args()
+
+    templates_dir = Path(__file__).resolve().parents[2] / "a"
+    report = []
+    for name in args.payloads.split(","):
+        name = name.strip()
+        kind = "checksum" if args.transport_only else PAYLOADS[name][0]
+        items = make_payload(name, args.count, templates_dir)
+        slot_bytes = max(img.nbytes for img in items)
+        for transport in ("pickle", "shm"):
+            row = bench_transport(transport, kind, items, args.workers, slot_bytes, args.repeat)
+            row.update(payload=name, kind=kind, shape=list(items[0].shape))
+            report.append(row)
+            print(json.dumps(row))
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench.synth import SynthConfig, synthesize  # noqa: E402
+from eval.eval import evaluate  # noqa: E402
+from pipeline import PipelineConfig, run_pipeline  # noqa: E402
+
+
+def _gt_supply_at(gt_supply: List[Dict], t: float) -> Optional[Dict]:
+    current = None
+    for entry in gt_supply:
+        if entry["t"] > t:
+            break
+        current = entry
+    return current
+
+
+def supply_accuracy(pred_supply: List[Dict], gt_supply: List[Dict], max_dt: float = 1.0) -> Dict:
+    correct = 0
+    for p in pred_supply:
+        g = _gt_supply_at(gt_supply, float(p["t"]))
+        if g is not None and (g["used"], g["total"]) == (p["used"], p["total"]):
+            correct += 1
+    found = 0
+    for g in gt_supply:
+        for p in pred_supply:
+            if (p["used"], p["total"]) == (g["used"], g["total"]) and abs(float(p["t"]) - g["t"]) <= max_dt:
+                found += 1
+                break
+    return {
+        "precision": correct / len(pred_supply) if pred_supply else 0.0,
+        "recall": found / len(gt_supply) if gt_supply else 0.0,
+        "predicted": len(pred_supply),
+        "expected": len(gt_supply),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(
+    work_dir: Path,
+    synth_cfg: SynthConfig | None = None,
+    ocr_engine: str = "none",
+    supply_fps: float = 2.0,
+    supply_samples: int = 7,
+    roi_samples: int = 10,
+    supply_ocr_engine: Optional[str] = None,
+    use_vocab: bool = False,
+    fuse_frames: bool = False,
+    supply_consensus: bool = False,
+    frame_index: bool = False,
+    strip_cache_dir: Optional[Path] = None,
+) -> Dict:
+    synth_cfg = synth_cfg or SynthConfig()
+    templates_dir = Path(__file__).resolve().parents[2] / "a"
+    assets = synthesize(work_dir, templates_dir, synth_cfg)
+    output_path = work_dir / "output.json"
+    cfg = PipelineConfig(
+        video_path=str(assets["video"]),
+        profile_path=str(assets["profile"]),
+        output_path=str(output_path),
+        start_sec=0.0,
+        end_sec=synth_cfg.duration_sec,
+        supply_fps=supply_fps,
+        supply_samples=supply_samples,
+        roi_samples=roi_samples,
+        ocr_engine=ocr_engine,
+        supply_ocr_engine=supply_ocr_engine,
+        vocab_path=str(assets["vocab"]) if use_vocab else None,
+        fuse_frames=fuse_frames,
+        supply_consensus=supply_consensus,
+        frame_index=frame_index,
+        strip_cache=strip_cache_dir is not None,
+        strip_cache_dir=str(strip_cache_dir) if strip_cache_dir is not None else None,
+    )
+
+    t0 = time.perf_counter()
+    output = run_pipeline(cfg)
+    wall = time.perf_counter() - t0
+
+    gt = json.loads(assets["gt"].read_text(encoding="utf-8"))
+    diagnostics = output["diagnostics"]
+    stages = diagnostics.get("timing", {}).get("stages", {})
+    ocr_calls = stages.get("ocr", {}).get("calls", 0)
+    frames = diagnostics.get("frames_decoded", 0)
+    video_sec = synth_cfg.duration_sec
+    events = evaluate(str(output_path), str(assets["gt"]))["metrics"]
+
+    accuracy = {
+        "supply": supply_accuracy(output["signals"]["supply_series"], gt["supply_series"]),
+        "events": events,
+    }
+    if "supply_series_consensus" in output["signals"]:
+        accuracy["supply_consensus"] = supply_accuracy(output["signals"]["supply_series_consensus"], gt["supply_series"])
+
+    return {
+        "commit": _git_commit(),
+        "config": {
+            "duration_sec": video_sec,
+            "video_fps": synth_cfg.fps,
+            "seed": synth_cfg.seed,
+            "ocr_engine": diagnostics.get("ocr_engine"),
+            "supply_ocr_engine": diagnostics.get("supply_ocr_engine"),
+            "vocab": use_vocab,
+            "fuse_frames": fuse_frames,
+            "supply_consensus": supply_consensus,
+            "frame_index": frame_index,
+            "strip_cache": strip_cache_dir is not None,
+            "supply_fps": supply_fps,
+            "supply_samples": supply_samples,
+            "roi_samples": roi_samples,
+        },
+        "throughput": {
+            "wall_sec": round(wall, 3),
+            "realtime_factor": round(video_sec / wall, 3) if wall > 0 else 0.0,
+            "frames_decoded": frames,
+            "frames_per_sec": round(frames / wall, 2) if wall > 0 else 0.0,
+            "ocr_calls": ocr_calls,
+            "ocr_calls_per_video_sec": round(ocr_calls / video_sec, 3) if video_sec > 0 else 0.0,
+        },
+        "stages": stages,
+        "accuracy": accuracy,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark run_pipeline on a synthetic game-UI video.")
+    parser.add_argument("-o", "--out", default="bench.json", help="Output benchmark JSON")
+    parser.add_argument("--work-dir", help="Keep synthetic video/output here (default: temp dir)")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--video-fps", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ocr", default="none", help="OCR engine: paddleocr|easyocr|tesseract|auto|none")
+    parser.add_argument("--supply-ocr", default=None, help="Engine for the supply digits only (e.g. digits)")
+    parser.add_argument("--vocab", action="store_true", help="Snap names to the synthetic clip's vocabulary")
+    parser.add_argument("--fuse-frames", action="store_true", help="OCR one fused crop per window")
+    parser.add_argument("--supply-consensus", action="store_true", help="Score the Viterbi-smoothed supply series too")
+    parser.add_argument("--frame-index", action="store_true", help="Seek through the keyframe/PTS sidecar")
+    parser.add_argument("--strip-cache-dir", help="Use (and keep) an ROI strip cache in this directory")
+    parser.add_argument("--fps", type=float, default=2.0, help="Supply sampling FPS")
+    parser.add_argument("--supply-samples", type=int, default=7)
+    parser.add_argument("--roi-samples", type=int, default=10)
+    args = parser.parse_args()
+
+    synth_cfg = SynthConfig(duration_sec=args.duration, fps=args.video_fps, seed=args.seed)
+    kwargs = dict(
+        synth_cfg=synth_cfg,
+        ocr_engine=args.ocr,
+        supply_fps=args.fps,
+        supply_samples=args.supply_samples,
+        roi_samples=args.roi_samples,
+        supply_ocr_engine=args.supply_ocr,
+        use_vocab=args.vocab,
+        fuse_frames=args.fuse_frames,
+        supply_consensus=args.supply_consensus,
+        frame_index=args.frame_index,
+        strip_cache_dir=Path(args.strip_cache_dir) if args.strip_cache_dir else None,
+    )
+    if args.work_dir:
+        report = run_benchmark(Path(args.work_dir), **kwargs)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run_benchmark(Path(tmp), **kwargs)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report["throughput"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench.bench_pipeline import _gt_supply_at  # noqa: E402
+from bench.synth import SynthConfig, synthesize  # noqa: E402
+from ocr.engine import OCREngine  # noqa: E402
+from ocr.read_supply import read_supply  # noqa: E402
+from roi.crop import ROITracker  # noqa: E402
+
+
+def collect_crops(assets: Dict[str, Path], step_sec: float = 0.5, settle_sec: float = 0.3) -> List[Tuple[np.ndarray, Tuple[int, int]]]:
+    gt = json.loads(assets["gt"].read_text(encoding="utf-8"))["supply_series"]
+    tracker = ROITracker(assets["profile"])
+    cap = cv2.VideoCapture(str(assets["video"]))
+    crops = []
+    t = 0.0
+    try:
+        while True:
+            cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0)
+            ok, frame = cap.read()
+            if not ok:
+                break
+            g = _gt_supply_at(gt, t)
+            if g is not None and t - g["t"] > settle_sec:
+                roi = tracker.crop(frame, "supply")
+                if roi is not None:
+                    crops.append((roi, (g["used"], g["total"])))
+            t += step_sec
+    finally:
+        cap.release()
+    return crops
+
+
+def bench_engine(name: str, crops: List[Tuple[np.ndarray, Tuple[int, int]]], templates_dir: Path) -> Dict:
+    t0 = time.perf_counter()
+    engine = OCREngine(name)
+    init_sec = time.perf_counter() - t0
+    if name != "none" and engine.name == "none":
+        return {"engine": name, "available": False}
+    correct = 0
+    t0 = time.perf_counter()
+    for roi, expected in crops:
+        res = read_supply(roi, templates_dir, engine)
+        correct += (res.used, res.total) == expected
+    wall = time.perf_counter() - t0
+    return {
+        "engine": engine.name if name != "none" else "template",
+        "available": True,
+        "reads": len(crops),
+        "accuracy": round(correct / len(crops), 4) if crops else 0.0,
+        "ms_per_read": round(wall / len(crops) * 1000.0, 3) if crops else 0.0,
+        "init_sec": round(init_sec, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare supply digit readers on synthetic supply crops.")
+    parser.add_argument("-o", "--out", default="bench_supply_ocr.json")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", default="none,digits,tesseract", help="Comma list; none = template fallback")
+    args = parser.parse_args()
+
+    templates_dir = Path(__file__).resolve().parents[2] / "a"
+    with tempfile.TemporaryDirectory() as tmp:
+        assets = synthesize(Path(tmp), templates_dir, SynthConfig(duration_sec=args.duration, seed=args.seed))
+        crops = collect_crops(assets)
+    report = [bench_engine(name.strip(), crops, templates_dir) for name in args.engines.split(",")]
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
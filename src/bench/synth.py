@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+REF_SIZE = (854, 480)
+SUPPLY_RECT = (784, 1, 57, 18)
+SELECTION_RECT = (20, 380, 220, 90)
+QUEUE_RECT = (560, 380, 220, 90)
+UNIT_NAMES = ["SCV", "Marine", "Medic", "Firebat", "Vulture", "Goliath", "Tank", "Wraith"]
+BUILDING_NAMES = ["Command Center", "Barracks", "Factory", "Starport", "Supply Depot", "Academy"]
+
+
+@dataclass
+class SynthConfig:
+    duration_sec: float = 60.0
+    fps: float = 10.0
+    intro_sec: float = 3.0
+    seed: int = 0
+    supply_start: Tuple[int, int] = (4, 10)
+    supply_step_sec: Tuple[float, float] = (2.5, 5.0)
+    selection_step_sec: Tuple[float, float] = (5.0, 9.0)
+    queue_step_sec: Tuple[float, float] = (6.0, 11.0)
+    breaks: Tuple[Tuple[float, float], ...] = ()
+    supply_frame_hud: bool = False
+    frame_size: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class SynthScript:
+    supply: List[Tuple[float, int, int]] = field(default_factory=list)
+    selection: List[Tuple[float, str]] = field(default_factory=list)
+    queue: List[Tuple[float, str]] = field(default_factory=list)
+
+    def value_at(self, track: List[Tuple], t: float):
+        current = None
+        for entry in track:
+            if entry[0] > t:
+                break
+            current = entry
+        return current
+
+
+def load_glyphs(templates_dir: Path) -> Dict[str, np.ndarray]:
+    glyphs = {}
+    for name in [str(d) for d in range(10)] + ["slash"]:
+        for ext in ("png", "jpg", "jpeg"):
+            p = templates_dir / f"{name}.{ext}"
+            if p.exists():
+                glyphs["/" if name == "slash" else name] = cv2.imread(str(p), cv2.IMREAD_GRAYSCALE)
+                break
+    return glyphs
+
+
+def make_script(cfg: SynthConfig) -> SynthScript:
+    rng = np.random.default_rng(cfg.seed)
+    script = SynthScript()
+
+    used, total = cfg.supply_start
+    t = cfg.intro_sec
+    script.supply.append((t, used, total))
+    while True:
+        t += float(rng.uniform(*cfg.supply_step_sec))
+        if t >= cfg.duration_sec - 1.0:
+            break
+        if used + 2 >= total and total < 99:
+            total = min(99, total + 8)
+        else:
+            used = min(total, used + int(rng.integers(1, 3)))
+        script.supply.append((round(t, 2), used, total))
+
+    for track, names, step in (
+        (script.selection, UNIT_NAMES + BUILDING_NAMES, cfg.selection_step_sec),
+        (script.queue, UNIT_NAMES, cfg.queue_step_sec),
+    ):
+        t = cfg.intro_sec + float(rng.uniform(*step))
+        last = None
+        while t < cfg.duration_sec - 1.0:
+            name = names[int(rng.integers(0, len(names)))]
+            if name != last:
+                track.append((round(t, 2), name))
+                last = name
+            t += float(rng.uniform(*step))
+    return script
+
+
+def draw_supply(frame: np.ndarray, glyphs: Dict[str, np.ndarray], used: int, total: int) -> None:
+    x0, y0, w, h = SUPPLY_RECT
+    roi = np.zeros((h, w), dtype=np.uint8)
+    x = 2
+    for ch in f"{used}/{total}":
+        g = glyphs[ch]
+        gh, gw = g.shape[:2]
+        if x + gw > w:
+            break
+        y = max(0, (h - gh) // 2)
+        roi[y : y + gh, x : x + gw] = g
+        x += gw + (2 if ch == "/" or x == 2 else 1)
+    frame[y0 : y0 + h, x0 : x0 + w] = cv2.cvtColor(roi, cv2.COLOR_GRAY2BGR)
+
+
+def _draw_panel(frame: np.ndarray, rect: Tuple[int, int, int, int], text: str | None) -> None:
+    x, y, w, h = rect
+    frame[y : y + h, x : x + w] = (24, 32, 24)
+    if text:
+        cv2.putText(frame, text, (x + 6, y + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (230, 230, 230), 1, cv2.LINE_AA)
+
+
+def render_frame(t: float, script: SynthScript, glyphs: Dict[str, np.ndarray], cfg: SynthConfig) -> np.ndarray:
+    w, h = REF_SIZE
+    rng = np.random.default_rng(cfg.seed * 100003 + int(round(t * cfg.fps)))
+    frame = rng.integers(0, 40, size=(h, w, 3), dtype=np.uint8)
+    if t < cfg.intro_sec:
+        cv2.putText(frame, "INTRO", (w // 2 - 80, h // 2), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (200, 200, 255), 3)
+        return frame
+    if any(start <= t < end for start, end in cfg.breaks):
+        cv2.putText(frame, "REPLAY", (w // 2 - 100, h // 2), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (255, 200, 200), 3)
+        return frame
+    supply = script.value_at(script.supply, t)
+    if cfg.supply_frame_hud:
+        x0, y0, sw, sh = SUPPLY_RECT
+        frame[y0 : y0 + sh, x0 : x0 + sw] = cv2.cvtColor(cv2.resize(glyphs["supply_frame"], (sw, sh)), cv2.COLOR_GRAY2BGR)
+    elif supply is not None:
+        draw_supply(frame, glyphs, supply[1], supply[2])
+    sel = script.value_at(script.selection, t)
+    queue = script.value_at(script.queue, t)
+    _draw_panel(frame, SELECTION_RECT, sel[1] if sel else None)
+    _draw_panel(frame, QUEUE_RECT, queue[1] if queue else None)
+    return frame
+
+
+def write_profile(path: Path) -> Path:
+    ref_w, ref_h = REF_SIZE
+
+    def norm(rect: Tuple[int, int, int, int]) -> Dict:
+        x, y, w, h = rect
+        return {"x": round(x / ref_w, 6), "y": round(y / ref_h, 6), "w": round(w / ref_w, 6), "h": round(h / ref_h, 6)}
+
+    profile = {
+        "resolution": [ref_w, ref_h],
+        "units": "normalized",
+        "rois": {
+            "supply": {"mode": "static", **norm(SUPPLY_RECT), "template_min_conf": 0.8, "enabled": True},
+            "selection_panel": {"mode": "static", **norm(SELECTION_RECT), "enabled": True},
+            "production_queue": {"mode": "static", **norm(QUEUE_RECT), "enabled": True},
+        },
+    }
+    path.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+    return path
+
+
+def write_vocab(path: Path) -> Path:
+    path.write_text("\n".join(UNIT_NAMES + BUILDING_NAMES) + "\n", encoding="utf-8")
+    return path
+
+
+def ground_truth(script: SynthScript) -> Dict:
+    return {
+        "supply_series": [{"t": t, "used": u, "total": tot} for t, u, tot in script.supply],
+        "selection_changes": [{"t": t, "text": name} for t, name in script.selection],
+        "events": [{"t": t, "id": f"{name.strip().lower()}_started"} for t, name in script.queue],
+    }
+
+
+def synthesize(out_dir: Path, templates_dir: Path, cfg: SynthConfig | None = None) -> Dict[str, Path]:
+    cfg = cfg or SynthConfig()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    script = make_script(cfg)
+    glyphs = load_glyphs(templates_dir)
+    if cfg.supply_frame_hud:
+        glyphs["supply_frame"] = cv2.imread(str(templates_dir / "supply_frame.png"), cv2.IMREAD_GRAYSCALE)
+
+    video_path = out_dir / "synth.mp4"
+    size = cfg.frame_size or REF_SIZE
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), cfg.fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Failed to open video writer: {video_path}")
+    try:
+        for i in range(int(round(cfg.duration_sec * cfg.fps))):
+            frame = render_frame(i / cfg.fps, script, glyphs, cfg)
+            writer.write(frame if size == REF_SIZE else cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR))
+    finally:
+        writer.release()
+
+    gt_path = out_dir / "gt.json"
+    gt_path.write_text(json.dumps(ground_truth(script), indent=2), encoding="utf-8")
+    profile_path = write_profile(out_dir / "profile.json")
+    vocab_path = write_vocab(out_dir / "vocab.txt")
+    return {"video": video_path, "gt": gt_path, "profile": profile_path, "vocab": vocab_path}
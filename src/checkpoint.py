@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def fingerprint(values: Dict[str, Any], exclude: Iterable[str] = ()) -> str:
+    skip = set(exclude)
+    data = {k: v for k, v in sorted(values.items()) if k not in skip}
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    state: Dict[str, Any]
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+class Checkpointer:
+    def __init__(self, path: Path, key: str, every_sec: float = 60.0) -> None:
+        self.path = Path(path)
+        self.key = key
+        self.every_sec = every_sec
+        self.saves = 0
+        self._last = time.monotonic()
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last >= self.every_sec
+
+    def save(self, state: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None) -> None:
+        header = {"version": CHECKPOINT_VERSION, "key": self.key, "state": state}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, _header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8), **(arrays or {}))
+        os.replace(tmp, self.path)
+        self.saves += 1
+        self._last = time.monotonic()
+
+    def load(self) -> Optional[Checkpoint]:
+        if not self.path.exists():
+            return None
+        with np.load(self.path) as data:
+            header = json.loads(data["_header"].tobytes().decode("utf-8"))
+            arrays = {name: data[name] for name in data.files if name != "_header"}
+        if header.get("version") != CHECKPOINT_VERSION:
+            return None
+        if header.get("key") != self.key:
+            raise ValueError(f"Checkpoint {self.path} was written for a different video or config")
+        return Checkpoint(header["state"], arrays)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -3,25 +3,88 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from pipeline import PipelineConfig, run_pipeline
-
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Supply/selection/queue OCR pipeline (480p).")
+    parser = argparse.ArgumentParser(description="Supply/selection/queue OCR pipeline (any resolution, 480p reference).")
     parser.add_argument("video", help="Input video path")
     parser.add_argument("-o", "--output", default="output.json", help="Output JSON path")
     parser.add_argument("--profile", default=str(Path(__file__).resolve().parent / "roi" / "profile_480p.json"))
     parser.add_argument("--start", type=float, default=0.0)
     parser.add_argument("--end", type=float, default=420.0)
     parser.add_argument("--ocr", default=None, help="OCR engine: paddleocr|easyocr|tesseract|auto")
+    parser.add_argument("--supply-ocr", default=None, help="Engine for the supply digits only (e.g. digits); defaults to --ocr")
+    parser.add_argument(
+        "--vocab",
+        nargs="?",
+        const=str(Path(__file__).resolve().parent / "ocr" / "vocab_names.txt"),
+        help="Snap selection/queue names to this vocabulary file (default list if no path)",
+    )
+    parser.add_argument("--glyph-cache", action="store_true", help="Reuse recognised name crops across videos of this profile")
+    parser.add_argument("--glyph-cache-dir", help="Glyph cache directory (default: ~/.cache/supply_ocr/glyphs)")
+    parser.add_argument("--fuse-frames", action="store_true", help="Align and median-stack each window's crops, OCR once")
+    parser.add_argument("--fusion-method", default="median", help="Stack method for --fuse-frames: median|mean")
+    parser.add_argument("--fusion-denoise", action="store_true", help="Keep fastNlMeans denoise on fused crops")
+    parser.add_argument(
+        "--supply-consensus", action="store_true", help="Also emit a Viterbi-smoothed supply_series_consensus"
+    )
     parser.add_argument("--fps", type=float, default=2.0, help="Supply sampling FPS")
     parser.add_argument("--supply-samples", type=int, default=7, help="Frames per supply window")
     parser.add_argument("--roi-samples", type=int, default=10, help="Frames per ROI window")
+    parser.add_argument("--no-skip-intro", action="store_true", help="Disable binary-search intro detection")
+    parser.add_argument(
+        "--native-resolution",
+        action="store_true",
+        help="Keep decoded frames at source size and scale ROIs/templates instead",
+    )
+    parser.add_argument("--decode-backend", default="opencv", help="Sequential decode backend: opencv|ffmpeg")
+    parser.add_argument(
+        "--frame-index",
+        action="store_true",
+        help="Seek via a keyframe/PTS sidecar (<video>.frameidx.npz), built on first use",
+    )
+    parser.add_argument(
+        "--strip-cache",
+        action="store_true",
+        help="Read ROI crops from a per-video mmap cache (built on first use) instead of decoding",
+    )
+    parser.add_argument("--strip-cache-dir", help="Strip cache directory (default: ~/.cache/supply_ocr/strips)")
+    parser.add_argument(
+        "--checkpoint-every",
+        type=float,
+        metavar="SEC",
+        help="Save resumable state to <output>.ckpt.npz every SEC seconds of wall time",
+    )
+    parser.add_argument("--resume", action="store_true", help="Continue from <output>.ckpt.npz if it exists")
+    parser.add_argument(
+        "--columnar-dir",
+        help="Also append signals to this columnar export (Parquet with pyarrow, else .npy); JSON is still written",
+    )
+    parser.add_argument("--video-id", help="video_id for the columnar export (default: video file stem)")
+    parser.add_argument("--no-timing", action="store_true", help="Disable per-stage timing in diagnostics")
+    parser.add_argument("--metrics-textfile", help="Rewrite Prometheus metrics to this file periodically")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--staged", action="store_true", help="Run decode/preprocess/OCR on separate threads")
+    parser.add_argument("--decode-workers", type=int, default=2)
+    parser.add_argument("--preprocess-workers", type=int, default=2)
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    parser.add_argument("--queue-depth", type=int, default=8, help="Bounded queue size between stages")
+    parser.add_argument("--ocr-pool-size", type=int, help="OCR engine instances (default depends on backend)")
+    parser.add_argument("--no-ocr-warmup", action="store_true", help="Skip the warm-up inference at start-up")
+    parser.add_argument(
+        "--skip-non-gameplay",
+        action="store_true",
+        help="Scan UI presence once per second and only sample/OCR inside gameplay intervals (pauses, replays, casters skipped)",
+    )
+    parser.add_argument("--gameplay-step", type=float, default=1.0, help="UI presence scan step in seconds")
+    parser.add_argument("--gameplay-min-gap", type=float, default=3.0, help="Shorter UI-absent gaps stay inside gameplay")
+    parser.add_argument("--intro-min-conf", type=float, default=0.6, help="Supply template conf that marks game start")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    from pipeline import PipelineConfig, run_pipeline
+
     cfg = PipelineConfig(
         video_path=args.video,
         profile_path=args.profile,
@@ -29,9 +92,41 @@ def main() -> None:
         start_sec=args.start,
         end_sec=args.end,
         ocr_engine=args.ocr,
+        supply_ocr_engine=args.supply_ocr,
+        vocab_path=args.vocab,
+        glyph_cache=args.glyph_cache,
+        glyph_cache_dir=args.glyph_cache_dir,
+        fuse_frames=args.fuse_frames,
+        fusion_method=args.fusion_method,
+        fusion_denoise=args.fusion_denoise,
+        supply_consensus=args.supply_consensus,
         supply_fps=args.fps,
         supply_samples=args.supply_samples,
         roi_samples=args.roi_samples,
+        skip_intro=not args.no_skip_intro,
+        intro_min_conf=args.intro_min_conf,
+        skip_non_gameplay=args.skip_non_gameplay,
+        gameplay_scan_step_sec=args.gameplay_step,
+        gameplay_min_gap_sec=args.gameplay_min_gap,
+        decode_to_profile=not args.native_resolution,
+        decode_backend=args.decode_backend,
+        frame_index=args.frame_index,
+        strip_cache=args.strip_cache,
+        strip_cache_dir=args.strip_cache_dir,
+        checkpoint_every_sec=args.checkpoint_every,
+        resume=args.resume,
+        columnar_dir=args.columnar_dir,
+        video_id=args.video_id,
+        timing=not args.no_timing,
+        metrics_textfile=args.metrics_textfile,
+        metrics_port=args.metrics_port,
+        staged=args.staged,
+        decode_workers=args.decode_workers,
+        preprocess_workers=args.preprocess_workers,
+        ocr_workers=args.ocr_workers,
+        queue_depth=args.queue_depth,
+        ocr_pool_size=args.ocr_pool_size,
+        ocr_warmup=not args.no_ocr_warmup,
     )
     run_pipeline(cfg)
 
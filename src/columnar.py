@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+COLUMNAR_VERSION = 1
+MANIFEST = "columnar.json"
+
+Column = Tuple[str, str, Tuple[str, ...]]
+
+TABLES: Dict[str, Tuple[Column, ...]] = {
+    "supply_series": (
+        ("t", "f8", ("t",)),
+        ("used", "i4", ("used",)),
+        ("total", "i4", ("total",)),
+        ("raw_text", "U", ("raw_text",)),
+        ("conf", "f4", ("conf",)),
+        ("frame", "U", ("frame",)),
+    ),
+    "selection_changes": (
+        ("t", "f8", ("t",)),
+        ("selected_name", "U", ("ocr", "selected_name", "text")),
+        ("selected_name_conf", "f4", ("ocr", "selected_name", "conf")),
+        ("hp_text", "U", ("ocr", "hp_text", "text")),
+        ("hp_text_conf", "f4", ("ocr", "hp_text", "conf")),
+        ("frame", "U", ("frame",)),
+    ),
+    "queue_events": (
+        ("t", "f8", ("t",)),
+        ("queue_text", "U", ("ocr", "queue_text", "text")),
+        ("queue_text_conf", "f4", ("ocr", "queue_text", "conf")),
+        ("frame", "U", ("frame",)),
+    ),
+}
+
+_MISSING = {"f8": np.nan, "f4": np.nan, "i4": -1, "U": ""}
+
+
+def _have_pyarrow() -> bool:
+    try:
+        import pyarrow  # type: ignore  # noqa: F401
+        import pyarrow.parquet  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _get(entry: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        entry = entry.get(key) if isinstance(entry, dict) else None
+    return entry
+
+
+def to_columns(table: str, outputs: Iterable[Tuple[str, Dict]]) -> Dict[str, List[Any]]:
+    spec = TABLES[table]
+    cols: Dict[str, List[Any]] = {"video_id": [], **{name: [] for name, _, _ in spec}}
+    for video_id, output in outputs:
+        for entry in output.get("signals", {}).get(table, []):
+            cols["video_id"].append(video_id)
+            for name, kind, path in spec:
+                value = _get(entry, path)
+                cols[name].append(_MISSING[kind] if value is None else value)
+    return cols
+
+
+def _dtype(table: str, cols: Dict[str, List[Any]]) -> np.dtype:
+    kinds = [("video_id", "U")] + [(name, kind) for name, kind, _ in TABLES[table]]
+    return np.dtype(
+        [(name, f"U{max([1] + [len(str(v)) for v in cols[name]])}" if kind == "U" else kind) for name, kind in kinds]
+    )
+
+
+def to_structured(table: str, cols: Dict[str, List[Any]]) -> np.ndarray:
+    arr = np.empty(len(cols["video_id"]), dtype=_dtype(table, cols))
+    for name in arr.dtype.names:
+        arr[name] = cols[name]
+    return arr
+
+
+def _common_dtype(dtypes: Sequence[np.dtype]) -> np.dtype:
+    fields = []
+    for name in dtypes[0].names:
+        sub = [dt[name] for dt in dtypes]
+        fields.append((name, max(sub, key=lambda d: d.itemsize) if sub[0].kind == "U" else sub[0]))
+    return np.dtype(fields)
+
+
+class ColumnarWriter:
+    def __init__(self, root: Path, fmt: str = "auto") -> None:
+        self.root = Path(root)
+        manifest = self.root / MANIFEST
+        existing = json.loads(manifest.read_text(encoding="utf-8"))["format"] if manifest.exists() else None
+        if fmt == "auto":
+            fmt = existing or ("parquet" if _have_pyarrow() else "npy")
+        if fmt not in ("parquet", "npy"):
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        if existing is not None and existing != fmt:
+            raise ValueError(f"{self.root} already holds {existing} parts, not {fmt}")
+        if fmt == "parquet" and not _have_pyarrow():
+            raise RuntimeError("Parquet export needs pyarrow")
+        self.fmt = fmt
+        self.rows = {table: 0 for table in TABLES}
+        if existing is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            manifest.write_text(json.dumps({"version": COLUMNAR_VERSION, "format": fmt}), encoding="utf-8")
+
+    @property
+    def ext(self) -> str:
+        return ".parquet" if self.fmt == "parquet" else ".npy"
+
+    def _next_part(self, table_dir: Path) -> Path:
+        # Names sort in write order and stay unique across concurrent writers (time, pid, random suffix).
+        return table_dir / _part_name(self.ext)
+
+    def _write(self, table: str, cols: Dict[str, List[Any]], path: Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        if self.fmt == "parquet":
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+
+            kinds = {"video_id": "U", **{name: kind for name, kind, _ in TABLES[table]}}
+            types = {"f8": pa.float64(), "f4": pa.float32(), "i4": pa.int32(), "U": pa.string()}
+            pq.write_table(pa.table({k: pa.array(v, type=types[kinds[k]]) for k, v in cols.items()}), tmp)
+        else:
+            with tmp.open("wb") as f:
+                np.save(f, to_structured(table, cols))
+        os.replace(tmp, path)
+
+    def append(self, outputs: Iterable[Tuple[str, Dict]]) -> Dict[str, int]:
+        outputs = list(outputs)
+        written = {}
+        for table in TABLES:
+            cols = to_columns(table, outputs)
+            written[table] = len(cols["video_id"])
+            if not written[table]:
+                continue
+            table_dir = self.root / table
+            table_dir.mkdir(exist_ok=True)
+            self._write(table, cols, self._next_part(table_dir))
+            self.rows[table] += written[table]
+        return written
+
+
+def _part_name(ext: str) -> str:
+    return f"part-{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}{ext}"
+
+
+def _format(root: Path) -> str:
+    manifest = Path(root) / MANIFEST
+    if not manifest.exists():
+        raise FileNotFoundError(f"No columnar export at {root}")
+    return json.loads(manifest.read_text(encoding="utf-8"))["format"]
+
+
+def part_paths(root: Path, table: str) -> List[Path]:
+    ext = ".parquet" if _format(root) == "parquet" else ".npy"
+    return sorted((Path(root) / table).glob(f"part-*{ext}"))
+
+
+def iter_parts(root: Path, table: str, mmap: bool = True) -> Iterator[Any]:
+    fmt = _format(root)
+    for path in part_paths(root, table):
+        if fmt == "parquet":
+            import pyarrow.parquet as pq  # type: ignore
+
+            yield pq.read_table(path, memory_map=mmap)
+        else:
+            yield np.load(path, mmap_mode="r" if mmap else None)
+
+
+def load_table(root: Path, table: str, mmap: bool = True) -> Any:
+    if table not in TABLES:
+        raise KeyError(f"Unknown table: {table}")
+    parts = list(iter_parts(root, table, mmap))
+    if _format(root) == "parquet":
+        import pyarrow as pa  # type: ignore
+
+        return pa.concat_tables(parts) if parts else None
+    if not parts:
+        return np.empty(0, dtype=_dtype(table, {"video_id": [], **{n: [] for n, _, _ in TABLES[table]}}))
+    if len(parts) == 1:
+        return parts[0]
+    dtype = _common_dtype([p.dtype for p in parts])
+    return np.concatenate([p.astype(dtype) for p in parts])
+
+
+def compact(root: Path) -> Dict[str, int]:
+    root = Path(root)
+    fmt = _format(root)
+    merged = {}
+    for table in TABLES:
+        paths = part_paths(root, table)
+        if len(paths) < 2:
+            merged[table] = len(paths)
+            continue
+        data = load_table(root, table, mmap=fmt == "npy")
+        tmp = root / table / (_part_name(paths[0].suffix) + ".tmp")
+        if fmt == "parquet":
+            import pyarrow.parquet as pq  # type: ignore
+
+            pq.write_table(data, tmp)
+        else:
+            with tmp.open("wb") as f:
+                np.save(f, data)
+        for path in paths:
+            path.unlink()
+        os.replace(tmp, paths[0])
+        merged[table] = len(paths)
+    return merged
+
+
+def _batches(items: List[Path], size: int) -> Iterator[List[Path]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _video_id(path: Path, id_from: str) -> str:
+    return path.parent.name if id_from == "parent" else path.stem
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Append pipeline output JSON signals to a columnar export.")
+    parser.add_argument("out_dir", help="Columnar export directory")
+    parser.add_argument("outputs", nargs="+", help="Pipeline output JSON files (or directories to search)")
+    parser.add_argument("--format", default="auto", help="auto|parquet|npy (auto picks parquet when pyarrow is installed)")
+    parser.add_argument("--id-from", default="stem", choices=["stem", "parent"], help="Derive video_id from the file stem or its directory name")
+    parser.add_argument("--batch-size", type=int, default=500, help="JSON files per appended part")
+    parser.add_argument("--compact", action="store_true", help="Merge all parts of each table into one afterwards")
+    args = parser.parse_args(argv)
+
+    paths: List[Path] = []
+    for item in args.outputs:
+        p = Path(item)
+        paths.extend(sorted(p.rglob("*.json")) if p.is_dir() else [p])
+    writer = ColumnarWriter(Path(args.out_dir), args.format)
+    for batch in _batches(paths, args.batch_size):
+        writer.append((_video_id(p, args.id_from), json.loads(p.read_text(encoding="utf-8"))) for p in batch)
+    if args.compact:
+        compact(writer.root)
+    print(json.dumps({"format": writer.fmt, "files": len(paths), "rows": writer.rows}))
+
+
+if __name__ == "__main__":
+    main()
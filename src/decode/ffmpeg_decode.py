@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import shutil
+import subprocess
+import threading
 from dataclasses import dataclass
 from typing import Iterator, List, Tuple, Optional
 
 import cv2
+import numpy as np
+
+from decode.index import IndexedCapture, load_or_build_index
+from timing import timed
 
 
 @dataclass
@@ -11,30 +18,171 @@ class DecodeConfig:
     fps: float = 2.0
     start_sec: float = 0.0
     end_sec: float = 420.0
+    size: Optional[Tuple[int, int]] = None
+    backend: str = "opencv"
+    crop: Optional[Tuple[int, int, int, int]] = None
+    ffmpeg_bin: str = "ffmpeg"
+    frame_index: bool = False
 
 
-def open_capture(video_path: str) -> cv2.VideoCapture:
+def open_capture(video_path: str, frame_index: bool = False) -> cv2.VideoCapture:
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"Failed to open video: {video_path}")
+    if frame_index:
+        return IndexedCapture(cap, load_or_build_index(video_path))
     return cap
 
 
-def get_frame_at(cap: cv2.VideoCapture, t: float) -> Optional[any]:
+class ThreadCaptures:
+    def __init__(self, video_path: str, frame_index: bool = False) -> None:
+        self.video_path = video_path
+        self.frame_index = frame_index
+        self._local = threading.local()
+        self._caps: List[cv2.VideoCapture] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> cv2.VideoCapture:
+        cap = getattr(self._local, "cap", None)
+        if cap is None:
+            cap = open_capture(self.video_path, self.frame_index)
+            self._local.cap = cap
+            with self._lock:
+                self._caps.append(cap)
+        return cap
+
+    def release(self) -> None:
+        with self._lock:
+            for cap in self._caps:
+                cap.release()
+            self._caps.clear()
+
+    def captures(self) -> List[cv2.VideoCapture]:
+        with self._lock:
+            return list(self._caps)
+
+
+def resize_frame(frame: any, size: Optional[Tuple[int, int]]) -> any:
+    if size is None:
+        return frame
+    w, h = size
+    if frame.shape[1] == w and frame.shape[0] == h:
+        return frame
+    interp = cv2.INTER_AREA if frame.shape[1] > w else cv2.INTER_LINEAR
+    return cv2.resize(frame, (w, h), interpolation=interp)
+
+
+def get_frame_at(cap: cv2.VideoCapture, t: float, size: Optional[Tuple[int, int]] = None) -> Optional[any]:
     cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, t) * 1000.0)
     ok, frame = cap.read()
     if not ok:
         return None
-    return frame
+    return resize_frame(frame, size)
 
 
-def iter_frames(video_path: str, cfg: DecodeConfig) -> Iterator[Tuple[float, any]]:
+def video_duration(cap: cv2.VideoCapture) -> float | None:
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    if not fps or fps <= 0 or not count or count <= 0:
+        return None
+    return float(count / fps)
+
+
+def _probe_size(video_path: str) -> Tuple[int, int]:
     cap = open_capture(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+
+
+def ffmpeg_output_size(video_path: str, cfg: DecodeConfig) -> Tuple[int, int]:
+    if cfg.size is not None:
+        return cfg.size
+    if cfg.crop is not None:
+        return cfg.crop[2], cfg.crop[3]
+    return _probe_size(video_path)
+
+
+def ffmpeg_command(video_path: str, cfg: DecodeConfig, ffmpeg_bin: str) -> List[str]:
+    filters = [f"fps={cfg.fps}"]
+    if cfg.crop is not None:
+        x, y, w, h = cfg.crop
+        filters.append(f"crop={w}:{h}:{x}:{y}")
+    if cfg.size is not None:
+        filters.append(f"scale={cfg.size[0]}:{cfg.size[1]}:flags=area")
+    return [
+        ffmpeg_bin,
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-ss",
+        f"{cfg.start_sec:.3f}",
+        "-to",
+        f"{cfg.end_sec + 0.5 / cfg.fps:.3f}",
+        "-i",
+        video_path,
+        "-vf",
+        ",".join(filters),
+        "-an",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "bgr24",
+        "pipe:1",
+    ]
+
+
+def _iter_frames_ffmpeg(video_path: str, cfg: DecodeConfig) -> Iterator[Tuple[float, any]]:
+    ffmpeg_bin = shutil.which(cfg.ffmpeg_bin)
+    if ffmpeg_bin is None:
+        raise RuntimeError(f"ffmpeg binary not found: {cfg.ffmpeg_bin}")
+    w, h = ffmpeg_output_size(video_path, cfg)
+    frame_bytes = w * h * 3
+    proc = subprocess.Popen(
+        ffmpeg_command(video_path, cfg, ffmpeg_bin),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=frame_bytes,
+    )
+    try:
+        step = 1.0 / cfg.fps
+        idx = 0
+        while True:
+            t = cfg.start_sec + idx * step
+            if t > cfg.end_sec:
+                break
+            buf = bytearray(frame_bytes)
+            view = memoryview(buf)
+            got = 0
+            while got < frame_bytes:
+                n = proc.stdout.readinto(view[got:])
+                if not n:
+                    break
+                got += n
+            if got < frame_bytes:
+                break
+            yield t, np.frombuffer(buf, dtype=np.uint8).reshape(h, w, 3)
+            idx += 1
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def iter_frames(video_path: str, cfg: DecodeConfig) -> Iterator[Tuple[float, any]]:
+    if cfg.backend == "ffmpeg":
+        yield from _iter_frames_ffmpeg(video_path, cfg)
+        return
+    if cfg.backend != "opencv":
+        raise ValueError(f"Unknown decode backend: {cfg.backend}")
+    cap = open_capture(video_path, cfg.frame_index)
     try:
         t = cfg.start_sec
         step = 1.0 / cfg.fps
         while t <= cfg.end_sec:
-            frame = get_frame_at(cap, t)
+            frame = get_frame_at(cap, t, cfg.size)
             if frame is None:
                 break
             yield t, frame
@@ -48,19 +196,22 @@ def sample_frames(
     center_t: float,
     window_sec: float,
     count: int,
+    size: Optional[Tuple[int, int]] = None,
 ) -> List[Tuple[float, any]]:
     cap = open_capture(video_path)
     try:
-        return sample_frames_with_capture(cap, center_t, window_sec, count)
+        return sample_frames_with_capture(cap, center_t, window_sec, count, size)
     finally:
         cap.release()
 
 
+@timed("decode_window")
 def sample_frames_with_capture(
     cap: cv2.VideoCapture,
     center_t: float,
     window_sec: float,
     count: int,
+    size: Optional[Tuple[int, int]] = None,
 ) -> List[Tuple[float, any]]:
     half = window_sec / 2.0
     if count <= 1:
@@ -70,7 +221,7 @@ def sample_frames_with_capture(
         times = [center_t - half + i * step for i in range(count)]
     frames = []
     for t in times:
-        frame = get_frame_at(cap, t)
+        frame = get_frame_at(cap, t, size)
         if frame is not None:
             frames.append((t, frame))
     return frames
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from timing import timed
+
+INDEX_VERSION = 1
+SIDECAR_SUFFIX = ".frameidx.npz"
+
+
+@dataclass
+class FrameIndex:
+    pts: np.ndarray
+    keyframes: np.ndarray
+    fps: float
+    source: str
+    built: bool = False
+
+    @property
+    def frame_count(self) -> int:
+        return int(self.pts.size)
+
+    def frame_at(self, t: float) -> int:
+        i = int(np.searchsorted(self.pts, t))
+        if i >= self.pts.size:
+            # Past the last frame by more than half a frame is past the end, like a plain seek.
+            half = 0.5 / self.fps if self.fps > 0 else 0.0
+            return self.pts.size - 1 if t - self.pts[-1] < half else self.pts.size
+        # Midpoints round up, matching OpenCV's own msec -> frame rounding.
+        if i > 0 and t - self.pts[i - 1] < self.pts[i] - t - 1e-6:
+            return i - 1
+        return i
+
+    def keyframe_before(self, n: int) -> int:
+        i = int(np.searchsorted(self.keyframes, n, side="right")) - 1
+        return int(self.keyframes[i]) if i >= 0 else 0
+
+
+def sidecar_path(video_path: str) -> Path:
+    p = Path(video_path)
+    return p.with_name(p.name + SIDECAR_SUFFIX)
+
+
+def _stamp(video_path: str) -> Tuple[int, int]:
+    st = Path(video_path).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def parse_ffprobe_packets(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    pts = []
+    key = []
+    for line in text.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or parts[0] in ("", "N/A"):
+            continue
+        pts.append(float(parts[0]))
+        key.append(parts[1].startswith("K"))
+    order = np.argsort(np.array(pts, dtype=np.float64), kind="stable")
+    pts_sorted = np.array(pts, dtype=np.float64)[order]
+    keyframes = np.flatnonzero(np.array(key, dtype=bool)[order])
+    return pts_sorted, keyframes
+
+
+def _index_ffprobe(video_path: str, ffprobe_bin: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    cmd = [
+        ffprobe_bin,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=p=0",
+        video_path,
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if proc.returncode != 0:
+        return None
+    pts, keyframes = parse_ffprobe_packets(proc.stdout)
+    if pts.size == 0:
+        return None
+    # Stream timestamps may not start at zero; OpenCV reports positions relative to the first frame.
+    return pts - pts[0], keyframes
+
+
+def _index_opencv(video_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+    pts = []
+    keyframes = []
+    try:
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keyframes.append(len(pts))
+            pts.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    finally:
+        cap.release()
+    return np.array(pts, dtype=np.float64), np.array(keyframes, dtype=np.int64)
+
+
+@timed("frame_index")
+def build_index(video_path: str, ffprobe_bin: str = "ffprobe") -> FrameIndex:
+    cap = cv2.VideoCapture(video_path)
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    cap.release()
+    found = None
+    source = "opencv"
+    probe = shutil.which(ffprobe_bin)
+    if probe is not None:
+        found = _index_ffprobe(video_path, probe)
+        source = "ffprobe"
+    if found is None:
+        found = _index_opencv(video_path)
+        source = "opencv"
+    pts, keyframes = found
+    if keyframes.size == 0 or keyframes[0] != 0:
+        keyframes = np.concatenate([[0], keyframes]).astype(np.int64)
+    if fps <= 0 and pts.size > 1:
+        fps = float((pts.size - 1) / max(1e-9, pts[-1] - pts[0]))
+    return FrameIndex(pts, keyframes.astype(np.int64), fps, source, built=True)
+
+
+def save_index(index: FrameIndex, video_path: str, path: Optional[Path] = None) -> Path:
+    path = Path(path) if path is not None else sidecar_path(video_path)
+    size, mtime = _stamp(video_path)
+    with path.open("wb") as f:
+        np.savez(
+            f,
+            version=np.int64(INDEX_VERSION),
+            stamp=np.array([size, mtime], dtype=np.int64),
+            fps=np.float64(index.fps),
+            source=np.str_(index.source),
+            pts=index.pts,
+            keyframes=index.keyframes,
+        )
+    return path
+
+
+def load_index(video_path: str, path: Optional[Path] = None) -> Optional[FrameIndex]:
+    path = Path(path) if path is not None else sidecar_path(video_path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as data:
+            if int(data["version"]) != INDEX_VERSION or tuple(data["stamp"].tolist()) != _stamp(video_path):
+                return None
+            return FrameIndex(data["pts"], data["keyframes"], float(data["fps"]), str(data["source"]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+_loaded: Dict[Tuple[str, int, int], FrameIndex] = {}
+_loaded_lock = threading.Lock()
+
+
+def load_or_build_index(video_path: str, path: Optional[Path] = None) -> FrameIndex:
+    key = (str(Path(video_path).resolve()), *_stamp(video_path))
+    with _loaded_lock:
+        index = _loaded.get(key)
+        if index is not None:
+            return index
+        index = load_index(video_path, path)
+        if index is None:
+            index = build_index(video_path)
+            try:
+                save_index(index, video_path, path)
+            except OSError:
+                pass
+        _loaded[key] = index
+        return index
+
+
+class IndexedCapture:
+    def __init__(self, cap: cv2.VideoCapture, index: FrameIndex, max_forward: Optional[int] = None) -> None:
+        self.cap = cap
+        self.index = index
+        self.max_forward = max_forward if max_forward is not None else max(1, int(round(index.fps)))
+        self.stats = {"seeks": 0, "grabs": 0, "reused": 0}
+        self._next = 0
+        self._target: Optional[int] = None
+        self._last_n = -1
+        self._last_frame: Optional[np.ndarray] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self) -> None:
+        self.cap.release()
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.index.frame_count)
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            self._target = self.index.frame_at(value / 1000.0)
+            return True
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self._target = int(value)
+            return True
+        return self.cap.set(prop, value)
+
+    def _seek(self, n: int) -> None:
+        k = self.index.keyframe_before(n)
+        ahead = self._next <= n
+        # Decoding forward is cheaper than a seek while we stay inside the current GOP or close to it.
+        if ahead and (k <= self._next or n - self._next <= self.max_forward):
+            return
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, k)
+        self.stats["seeks"] += 1
+        self._next = k
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        n = self._target if self._target is not None else self._next
+        self._target = None
+        if n == self._last_n and self._last_frame is not None:
+            self.stats["reused"] += 1
+            return True, self._last_frame
+        if n < 0 or n >= self.index.frame_count:
+            return False, None
+        self._seek(n)
+        while self._next < n:
+            if not self.cap.grab():
+                return False, None
+            self._next += 1
+            self.stats["grabs"] += 1
+        ok, frame = self.cap.read()
+        if not ok:
+            return False, None
+        self._next = n + 1
+        self._last_n = n
+        self._last_frame = frame
+        return True, frame
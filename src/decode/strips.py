@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from decode.ffmpeg_decode import resize_frame
+from decode.index import FrameIndex
+from timing import timed
+
+STRIPS_VERSION = 1
+_HASH_CHUNK = 1 << 20
+
+CropFn = Callable[[np.ndarray, str], Optional[np.ndarray]]
+
+
+def video_key(video_path: str) -> str:
+    # Size plus head/tail bytes: cheap on multi-GB files and still changes when the content does.
+    path = Path(video_path)
+    size = path.stat().st_size
+    h = hashlib.sha1(str(size).encode())
+    with path.open("rb") as f:
+        h.update(f.read(_HASH_CHUNK))
+        if size > _HASH_CHUNK:
+            f.seek(max(_HASH_CHUNK, size - _HASH_CHUNK))
+            h.update(f.read(_HASH_CHUNK))
+    return h.hexdigest()[:16]
+
+
+def strips_dir(
+    video_path: str,
+    profile_path: Path,
+    size: Optional[Tuple[int, int]],
+    cache_dir: Path,
+) -> Path:
+    profile_digest = hashlib.sha1(Path(profile_path).read_bytes()).hexdigest()[:10]
+    size_tag = f"{size[0]}x{size[1]}" if size is not None else "native"
+    return Path(cache_dir) / f"{Path(video_path).stem}_{video_key(video_path)}_{profile_digest}_{size_tag}"
+
+
+class StripCache:
+    def __init__(self, path: Path, meta: Dict, pts: np.ndarray, strips: Dict[str, np.memmap]) -> None:
+        self.path = Path(path)
+        self.meta = meta
+        self.strips = strips
+        self.index = FrameIndex(pts, np.zeros(1, dtype=np.int64), float(meta["fps"]), "strips")
+        self.frame_size = tuple(meta["frame_size"])
+        self.built = False
+        self.rows_read = 0
+
+    @property
+    def frame_count(self) -> int:
+        return self.index.frame_count
+
+    @property
+    def kinds(self) -> List[str]:
+        return list(self.strips)
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["StripCache"]:
+        path = Path(path)
+        meta_path = path / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != STRIPS_VERSION:
+            return None
+        pts = np.load(path / "t.npy")
+        strips = {}
+        for kind, shape in meta["rois"].items():
+            strips[kind] = np.memmap(path / f"{kind}.u8", dtype=np.uint8, mode="r", shape=(meta["frames"], *shape))
+        return cls(path, meta, pts, strips)
+
+    def row_at(self, t: float) -> Optional[int]:
+        n = self.index.frame_at(max(0.0, t))
+        return n if n < self.frame_count else None
+
+    def crop(self, kind: str, row: int) -> Optional[np.ndarray]:
+        strip = self.strips.get(kind)
+        if strip is None:
+            return None
+        self.rows_read += 1
+        return strip[row]
+
+    def scale(self, reference: Optional[Tuple[int, int]]) -> float:
+        if reference is None:
+            return 1.0
+        return self.frame_size[0] / reference[0]
+
+    def sample(self, center_t: float, window_sec: float, count: int) -> List[Tuple[float, int]]:
+        half = window_sec / 2.0
+        if count <= 1:
+            times = [center_t]
+        else:
+            step = window_sec / (count - 1)
+            times = [center_t - half + i * step for i in range(count)]
+        rows = []
+        for t in times:
+            row = self.row_at(t)
+            if row is not None:
+                rows.append((t, row))
+        return rows
+
+    def iter_rows(self, start_sec: float, end_sec: float, fps: float) -> Iterator[Tuple[float, int]]:
+        t = start_sec
+        step = 1.0 / fps
+        while t <= end_sec:
+            row = self.row_at(t)
+            if row is None:
+                break
+            yield t, row
+            t += step
+
+
+@timed("strip_build")
+def build_strips(
+    video_path: str,
+    path: Path,
+    crop: CropFn,
+    kinds: Sequence[str],
+    size: Optional[Tuple[int, int]] = None,
+) -> StripCache:
+    path = Path(path)
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    files = {}
+    shapes: Dict[str, Tuple[int, ...]] = {}
+    pts = []
+    frame_size = None
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = resize_frame(frame, size)
+            if frame_size is None:
+                frame_size = (frame.shape[1], frame.shape[0])
+                for kind in kinds:
+                    roi = crop(frame, kind)
+                    if roi is not None:
+                        shapes[kind] = roi.shape
+                        files[kind] = (tmp / f"{kind}.u8").open("wb")
+            for kind, f in files.items():
+                roi = crop(frame, kind)
+                if roi is None or roi.shape != shapes[kind]:
+                    raise ValueError(f"ROI {kind!r} has no fixed crop; strip cache needs static ROIs")
+                f.write(np.ascontiguousarray(roi).tobytes())
+            pts.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    except BaseException:
+        for f in files.values():
+            f.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    finally:
+        cap.release()
+    for f in files.values():
+        f.close()
+    if not pts:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError(f"No frames decoded from {video_path}")
+    np.save(tmp / "t.npy", np.array(pts, dtype=np.float64))
+    meta = {
+        "version": STRIPS_VERSION,
+        "video": Path(video_path).name,
+        "frames": len(pts),
+        "fps": fps,
+        "frame_size": list(frame_size or (0, 0)),
+        "kinds": list(kinds),
+        "rois": {kind: list(shape) for kind, shape in shapes.items()},
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    cache = StripCache.open(path)
+    cache.built = True
+    return cache
+
+
+def open_or_build_strips(
+    video_path: str,
+    path: Path,
+    crop: CropFn,
+    kinds: Sequence[str],
+    size: Optional[Tuple[int, int]] = None,
+) -> StripCache:
+    cache = StripCache.open(path)
+    if cache is not None and set(kinds) <= set(cache.meta.get("kinds", ())):
+        return cache
+    return build_strips(video_path, path, crop, kinds, size)
@@ -6,6 +6,8 @@ from typing import Tuple
 import cv2
 import numpy as np
 
+from timing import timed
+
 
 @dataclass
 class DiffConfig:
@@ -21,6 +23,7 @@ def diff_score(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.mean(diff) / 255.0)
 
 
+@timed("diff")
 def changed(a: np.ndarray, b: np.ndarray, cfg: DiffConfig | None = None) -> bool:
     cfg = cfg or DiffConfig()
     return diff_score(a, b) >= cfg.threshold
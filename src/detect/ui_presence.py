@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from decode.ffmpeg_decode import get_frame_at, video_duration
+from roi.match import match_template, pyramid_match
+from timing import timed
+
+
+@dataclass
+class UIPresenceConfig:
+    min_conf: float = 0.6
+    search_margin: int = 16
+    tolerance_sec: float = 0.5
+    scan_step_sec: float = 1.0
+    min_gap_sec: float = 3.0
+    start_scan_probes: int = 8
+
+
+class UIPresenceDetector:
+    def __init__(
+        self,
+        template: np.ndarray,
+        region: Tuple[int, int, int, int] | None = None,
+        cfg: UIPresenceConfig | None = None,
+    ) -> None:
+        self.template = template if len(template.shape) == 2 else cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        self.region = region
+        self.cfg = cfg or UIPresenceConfig()
+        self.probes = 0
+
+    def score(self, frame: np.ndarray) -> float:
+        self.probes += 1
+        if self.region is not None:
+            x, y, w, h = self.region
+            m = self.cfg.search_margin
+            x0 = max(0, x - m)
+            y0 = max(0, y - m)
+            x1 = min(frame.shape[1], x + w + m)
+            y1 = min(frame.shape[0], y + h + m)
+            frame = frame[y0:y1, x0:x1]
+        gray = frame if len(frame.shape) == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        th, tw = self.template.shape[:2]
+        if gray.shape[0] < th or gray.shape[1] < tw:
+            return 0.0
+        if self.region is not None:
+            _, conf = match_template(gray, self.template)
+        else:
+            _, conf = pyramid_match(gray, self.template)
+        return conf
+
+    def present(self, frame: np.ndarray | None) -> bool:
+        if frame is None:
+            return False
+        return self.score(frame) >= self.cfg.min_conf
+
+    def present_roi(self, crop: np.ndarray | None) -> bool:
+        if crop is None:
+            return False
+        self.probes += 1
+        gray = crop if len(crop.shape) == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        template = self.template
+        th, tw = template.shape[:2]
+        if gray.shape[0] < th or gray.shape[1] < tw:
+            template = cv2.resize(template, (min(tw, gray.shape[1]), min(th, gray.shape[0])), interpolation=cv2.INTER_AREA)
+        _, conf = match_template(gray, template)
+        return conf >= self.cfg.min_conf
+
+
+@timed("intro_detect")
+def find_game_start(
+    cap: cv2.VideoCapture,
+    detector: UIPresenceDetector,
+    start_sec: float,
+    end_sec: float,
+    size: Optional[Tuple[int, int]] = None,
+) -> float | None:
+    duration = video_duration(cap)
+    if duration is not None:
+        end_sec = min(end_sec, duration - detector.cfg.tolerance_sec)
+    if end_sec <= start_sec:
+        return None
+
+    def present(t: float) -> bool:
+        return detector.present(get_frame_at(cap, t, size))
+
+    if present(start_sec):
+        return start_sec
+    # The HUD can flicker on and off before play settles, so bisect from the first present coarse probe
+    # rather than across the whole window, which would land on whichever edge the midpoints happen to hit.
+    probes = max(1, detector.cfg.start_scan_probes)
+    step = (end_sec - start_sec) / probes
+    lo = start_sec
+    for i in range(1, probes + 1):
+        t = end_sec if i == probes else start_sec + i * step
+        if present(t):
+            return _edge(present, lo, t, True, detector.cfg.tolerance_sec)
+        lo = t
+    return None
+
+
+def _edge(present: Callable[[float], bool], lo: float, hi: float, hi_state: bool, tolerance: float) -> float:
+    while hi - lo > tolerance:
+        mid = (lo + hi) / 2.0
+        if present(mid) == hi_state:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+@timed("gameplay_scan")
+def find_gameplay_intervals(
+    present: Callable[[float], bool],
+    start_sec: float,
+    end_sec: float,
+    cfg: UIPresenceConfig | None = None,
+) -> List[Tuple[float, float]]:
+    cfg = cfg or UIPresenceConfig()
+    if end_sec < start_sec:
+        return []
+    steps = int(np.floor((end_sec - start_sec) / cfg.scan_step_sec + 1e-9))
+    times = [start_sec + i * cfg.scan_step_sec for i in range(steps + 1)]
+    if end_sec - times[-1] > 1e-9:
+        times.append(end_sec)
+    states = [present(t) for t in times]
+
+    intervals: List[Tuple[float, float]] = []
+    run_start = times[0] if states[0] else None
+    for i in range(1, len(times)):
+        if states[i] == states[i - 1]:
+            continue
+        edge = _edge(present, times[i - 1], times[i], states[i], cfg.tolerance_sec)
+        if states[i]:
+            run_start = edge
+        else:
+            intervals.append((run_start, edge))
+            run_start = None
+    if run_start is not None:
+        intervals.append((run_start, times[-1]))
+
+    merged: List[Tuple[float, float]] = []
+    for s, e in intervals:
+        if merged and s - merged[-1][1] < cfg.min_gap_sec:
+            merged[-1] = (merged[-1][0], e)
+        else:
+            merged.append((s, e))
+    return merged
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -19,22 +23,76 @@ def _load(path: str) -> Dict:
     return json.loads(Path(path).read_text(encoding="utf-8"))
 
 
+class _Unused:
+    def __init__(self, n: int) -> None:
+        self._next = list(range(n + 1))
+        self._prev = list(range(-1, n))
+
+    def _find(self, links: List[int], i: int, offset: int) -> int:
+        root = i
+        while links[root + offset] != root:
+            root = links[root + offset]
+        while links[i + offset] != root:
+            links[i + offset], i = root, links[i + offset]
+        return root
+
+    def at_or_after(self, i: int) -> int:
+        return self._find(self._next, i, 0)
+
+    def at_or_before(self, i: int) -> int:
+        return self._find(self._prev, i, 1)
+
+    def remove(self, i: int) -> None:
+        self._next[i] = i + 1
+        self._prev[i + 1] = i - 1
+
+
+class _IdIndex:
+    def __init__(self, items: List[Tuple[float, int]]) -> None:
+        items.sort()
+        self.times = [t for t, _ in items]
+        self.order = [i for _, i in items]
+        self.unused = _Unused(len(items))
+
+    def take_nearest(self, t: float, max_dt: float) -> Optional[int]:
+        # Same choice as scanning every prediction: smallest |dt|, then lowest prediction index.
+        n = len(self.times)
+        pos = bisect_left(self.times, t)
+        right = self.unused.at_or_after(pos)
+        left = self.unused.at_or_before(pos - 1)
+        best_dt = None
+        if right < n:
+            best_dt = abs(self.times[right] - t)
+        if left >= 0:
+            d = abs(self.times[left] - t)
+            best_dt = d if best_dt is None else min(best_dt, d)
+        if best_dt is None or best_dt > max_dt:
+            return None
+        ties = []
+        k = right
+        while k < n and abs(self.times[k] - t) == best_dt:
+            ties.append(k)
+            k = self.unused.at_or_after(k + 1)
+        k = left
+        while k >= 0 and abs(self.times[k] - t) == best_dt:
+            ties.append(k)
+            k = self.unused.at_or_before(k - 1)
+        k = min(ties, key=lambda j: self.order[j])
+        self.unused.remove(k)
+        return self.order[k]
+
+
 def _match_events(pred: List[Dict], gt: List[Dict], max_dt: float) -> Tuple[List[Tuple[Dict, Dict]], List[Dict], List[Dict]]:
+    by_id: Dict[Any, List[Tuple[float, int]]] = defaultdict(list)
+    for pi, p in enumerate(pred):
+        by_id[p.get("id")].append((float(p.get("t", 0.0)), pi))
+    index = {key: _IdIndex(items) for key, items in by_id.items()}
     matched = []
     used_pred = set()
     used_gt = set()
     for gi, g in enumerate(gt):
-        best = None
-        best_i = None
-        for pi, p in enumerate(pred):
-            if pi in used_pred:
-                continue
-            if p.get("id") != g.get("id"):
-                continue
-            dt = abs(float(p.get("t", 0.0)) - float(g.get("t", 0.0)))
-            if dt <= max_dt and (best is None or dt < best):
-                best = dt
-                best_i = pi
+        idx = index.get(g.get("id"))
+        best_i = idx.take_nearest(float(g.get("t", 0.0)), max_dt) if idx is not None else None
         if best_i is not None:
             used_pred.add(best_i)
             used_gt.add(gi)
@@ -44,6 +102,13 @@ def _match_events(pred: List[Dict], gt: List[Dict], max_dt: float) -> Tuple[List
     return matched, unmatched_pred, unmatched_gt
 
 
+def _prf(tp: int, fp: int, fn: int) -> Tuple[float, float, float]:
+    precision = tp / (tp + fp) if tp + fp > 0 else 0.0
+    recall = tp / (tp + fn) if tp + fn > 0 else 0.0
+    f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) > 0 else 0.0
+    return precision, recall, f1
+
+
 def evaluate(pred_path: str, gt_path: str, max_dt: float = 3.0) -> Dict:
     pred = _load(pred_path)
     gt = _load(gt_path)
@@ -51,12 +116,7 @@ def evaluate(pred_path: str, gt_path: str, max_dt: float = 3.0) -> Dict:
     gt_events = gt.get("events", [])
 
     matched, un_pred, un_gt = _match_events(pred_events, gt_events, max_dt)
-    tp = len(matched)
-    fp = len(un_pred)
-    fn = len(un_gt)
-    precision = tp / (tp + fp) if tp + fp > 0 else 0.0
-    recall = tp / (tp + fn) if tp + fn > 0 else 0.0
-    f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) > 0 else 0.0
+    precision, recall, f1 = _prf(len(matched), len(un_pred), len(un_gt))
 
     if matched:
         mean_dt = sum(abs(float(p["t"]) - float(g["t"])) for p, g in matched) / len(matched)
@@ -71,15 +131,96 @@ def evaluate(pred_path: str, gt_path: str, max_dt: float = 3.0) -> Dict:
     }
 
 
+def _count_pair(pair: Tuple[Optional[str], str, float]) -> Dict:
+    pred_path, gt_path, max_dt = pair
+    pred_events = _load(pred_path).get("events", []) if pred_path is not None else []
+    gt_events = _load(gt_path).get("events", [])
+    matched, un_pred, un_gt = _match_events(pred_events, gt_events, max_dt)
+    per_id: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0, 0.0])
+    for p, g in matched:
+        per_id[str(p.get("id"))][0] += 1
+        per_id[str(p.get("id"))][3] += abs(float(p["t"]) - float(g["t"]))
+    for p in un_pred:
+        per_id[str(p.get("id"))][1] += 1
+    for g in un_gt:
+        per_id[str(g.get("id"))][2] += 1
+    return {
+        "tp": len(matched),
+        "fp": len(un_pred),
+        "fn": len(un_gt),
+        "sum_dt": sum(abs(float(p["t"]) - float(g["t"])) for p, g in matched),
+        "per_id": dict(per_id),
+    }
+
+
+def _metrics(tp: int, fp: int, fn: int, sum_dt: float) -> Dict:
+    precision, recall, f1 = _prf(tp, fp, fn)
+    return dict(Metrics(precision, recall, f1, sum_dt / tp if tp else 0.0).__dict__, tp=tp, fp=fp, fn=fn)
+
+
+def pair_files(pred_dir: Path, gt_dir: Path) -> List[Tuple[str, Optional[Path], Path]]:
+    pairs = []
+    for gt_path in sorted(Path(gt_dir).rglob("*.json")):
+        rel = gt_path.relative_to(gt_dir)
+        pred_path = Path(pred_dir) / rel
+        pairs.append((rel.with_suffix("").as_posix(), pred_path if pred_path.exists() else None, gt_path))
+    return pairs
+
+
+def evaluate_dir(pred_dir: str, gt_dir: str, max_dt: float = 3.0, workers: Optional[int] = None) -> Dict:
+    pairs = pair_files(Path(pred_dir), Path(gt_dir))
+    jobs = [(str(p) if p is not None else None, str(g), max_dt) for _, p, g in pairs]
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_count_pair, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        counts = [_count_pair(job) for job in jobs]
+
+    per_video = {}
+    per_id: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0, 0.0])
+    total = {"tp": 0, "fp": 0, "fn": 0, "sum_dt": 0.0}
+    for (name, _, _), c in zip(pairs, counts):
+        per_video[name] = _metrics(c["tp"], c["fp"], c["fn"], c["sum_dt"])
+        for key in total:
+            total[key] += c[key]
+        for event_id, values in c["per_id"].items():
+            acc = per_id[event_id]
+            for i, v in enumerate(values):
+                acc[i] += v
+
+    videos = list(per_video.values())
+    n = len(videos)
+    with_matches = [m["mean_dt"] for m in videos if m["tp"]]
+    macro = {
+        "precision": sum(m["precision"] for m in videos) / n if n else 0.0,
+        "recall": sum(m["recall"] for m in videos) / n if n else 0.0,
+        "f1": sum(m["f1"] for m in videos) / n if n else 0.0,
+        "mean_dt": sum(with_matches) / len(with_matches) if with_matches else 0.0,
+    }
+    return {
+        "videos": n,
+        "missing_pred": [name for name, p, _ in pairs if p is None],
+        "micro": _metrics(total["tp"], total["fp"], total["fn"], total["sum_dt"]),
+        "macro": macro,
+        "per_id": {event_id: _metrics(int(tp), int(fp), int(fn), sum_dt) for event_id, (tp, fp, fn, sum_dt) in sorted(per_id.items())},
+        "per_video": per_video,
+    }
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Evaluate predicted events vs GT.")
-    parser.add_argument("pred", help="Predicted output JSON")
-    parser.add_argument("gt", help="Ground truth JSON")
+    parser.add_argument("pred", help="Predicted output JSON, or a directory of them")
+    parser.add_argument("gt", help="Ground truth JSON, or a directory with the same relative paths")
     parser.add_argument("--max-dt", type=float, default=3.0, help="Max time delta for match")
+    parser.add_argument("--workers", type=int, help="Processes for directory mode (default: CPU count)")
     parser.add_argument("-o", "--out", default="eval.json", help="Output evaluation JSON")
     args = parser.parse_args()
 
-    result = evaluate(args.pred, args.gt, args.max_dt)
+    if Path(args.gt).is_dir():
+        result = evaluate_dir(args.pred, args.gt, args.max_dt, args.workers)
+    else:
+        result = evaluate(args.pred, args.gt, args.max_dt)
     Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
 
 
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from timing import timed
+
+Supply = Tuple[int, int]
+
+
+@dataclass
+class ConsensusConfig:
+    change_cost: float = 2.0
+    used_step_cost: float = 0.5
+    total_step_cost: float = 1.0
+    total_jump_cost: float = 8.0
+    total_steps: Tuple[int, ...] = (1, 8, 9, 10)
+    max_total_multiple: int = 3
+    miss_floor: float = 0.05
+
+
+def transition_costs(states: np.ndarray, cfg: ConsensusConfig) -> np.ndarray:
+    used = states[:, 0]
+    total = states[:, 1]
+    du = np.abs(used[None, :] - used[:, None])
+    dt = np.abs(total[None, :] - total[:, None])
+    plausible = np.array(sorted({s * k for s in cfg.total_steps for k in range(1, cfg.max_total_multiple + 1)}))
+    total_cost = np.where(np.isin(dt, plausible), cfg.total_step_cost, cfg.total_jump_cost)
+    cost = cfg.change_cost + cfg.used_step_cost * du + np.where(dt == 0, 0.0, total_cost)
+    np.fill_diagonal(cost, 0.0)
+    return cost
+
+
+def emission_scores(obs: Sequence[Dict[Supply, float]], index: Dict[Supply, int], cfg: ConsensusConfig) -> np.ndarray:
+    conf = np.zeros((len(obs), len(index)), dtype=np.float64)
+    seen = np.zeros(len(obs), dtype=bool)
+    for n, tick in enumerate(obs):
+        for value, c in tick.items():
+            conf[n, index[value]] = max(conf[n, index[value]], float(c))
+            seen[n] = True
+    scores = np.log(cfg.miss_floor + (1.0 - cfg.miss_floor) * np.clip(conf, 0.0, 1.0))
+    scores[~seen] = 0.0
+    return scores
+
+
+@timed("consensus")
+def decode_supply(obs: Sequence[Dict[Supply, float]], cfg: ConsensusConfig | None = None) -> List[Optional[Supply]]:
+    cfg = cfg or ConsensusConfig()
+    values = sorted({v for tick in obs for v in tick})
+    if not values:
+        return [None] * len(obs)
+    index = {v: i for i, v in enumerate(values)}
+    states = np.array(values, dtype=np.int64)
+    trans = -transition_costs(states, cfg)
+    emit = emission_scores(obs, index, cfg)
+
+    n_ticks, k = emit.shape
+    back = np.zeros((n_ticks, k), dtype=np.int64)
+    score = emit[0].copy()
+    for n in range(1, n_ticks):
+        cand = score[:, None] + trans
+        back[n] = cand.argmax(axis=0)
+        score = cand[back[n], np.arange(k)] + emit[n]
+
+    path = np.empty(n_ticks, dtype=np.int64)
+    path[-1] = int(score.argmax())
+    for n in range(n_ticks - 1, 0, -1):
+        path[n - 1] = back[n, path[n]]
+
+    first_seen = next(n for n, tick in enumerate(obs) if tick)
+    return [None if n < first_seen else values[int(path[n])] for n in range(n_ticks)]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from .engine import OCRResult
+
+GLYPH_H = 20
+GLYPH_W = 12
+CLASSES = "0123456789?"
+REJECT = "?"
+MODEL_PATH = Path(__file__).resolve().parent / "models" / "digits.onnx"
+
+
+def _foreground(gray: np.ndarray) -> np.ndarray:
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if np.count_nonzero(binary) > binary.size // 2:
+        binary = 255 - binary
+    return binary
+
+
+def segment_glyphs(gray: np.ndarray, min_height_ratio: float = 0.5) -> List[np.ndarray]:
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+    binary = _foreground(gray)
+    cols = np.flatnonzero(binary.any(axis=0))
+    if cols.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(cols) > 1)
+    starts = np.concatenate([[cols[0]], cols[breaks + 1]])
+    ends = np.concatenate([cols[breaks], [cols[-1]]]) + 1
+
+    boxes: List[Tuple[int, int, int, int]] = []
+    for x0, x1 in zip(starts, ends):
+        rows = np.flatnonzero(binary[:, x0:x1].any(axis=1))
+        boxes.append((int(x0), int(rows[0]), int(x1), int(rows[-1]) + 1))
+    tallest = max(y1 - y0 for _, y0, _, y1 in boxes)
+    return [
+        gray[y0:y1, x0:x1]
+        for x0, y0, x1, y1 in boxes
+        if (y1 - y0) >= tallest * min_height_ratio
+    ]
+
+
+def normalize_glyph(crop: np.ndarray) -> np.ndarray:
+    binary = _foreground(crop) if crop.size > 1 else np.zeros((1, 1), np.uint8)
+    h, w = binary.shape[:2]
+    scale = min(GLYPH_H / h, GLYPH_W / w)
+    nh = max(1, int(round(h * scale)))
+    nw = max(1, int(round(w * scale)))
+    resized = cv2.resize(binary, (nw, nh), interpolation=cv2.INTER_AREA)
+    out = np.zeros((GLYPH_H, GLYPH_W), dtype=np.float32)
+    y0 = (GLYPH_H - nh) // 2
+    x0 = (GLYPH_W - nw) // 2
+    out[y0 : y0 + nh, x0 : x0 + nw] = resized.astype(np.float32) / 255.0
+    return out
+
+
+class DigitClassifier:
+    def __init__(self, model_path: Path = MODEL_PATH) -> None:
+        self.net = cv2.dnn.readNetFromONNX(str(model_path))
+
+    def classify(self, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+        if not crops:
+            return []
+        batch = np.stack([normalize_glyph(c) for c in crops])[:, None, :, :]
+        self.net.setInput(batch)
+        probs = self.net.forward()
+        idx = probs.argmax(axis=1)
+        return [(CLASSES[i], float(probs[n, i])) for n, i in enumerate(idx)]
+
+    def read(self, img: np.ndarray, whitelist: str | None = None) -> OCRResult:
+        return self.read_many([img], whitelist)[0]
+
+    def read_many(self, imgs: List[np.ndarray], whitelist: str | None = None) -> List[OCRResult]:
+        # One forward pass over the glyphs of every image, then split the labels back per image.
+        glyphs = [segment_glyphs(img) for img in imgs]
+        labels = self.classify([g for gs in glyphs for g in gs])
+        results = []
+        for gs in glyphs:
+            picked = [(ch, p) for ch, p in labels[: len(gs)] if ch != REJECT]
+            labels = labels[len(gs) :]
+            if whitelist:
+                picked = [(ch, p) for ch, p in picked if ch in whitelist]
+            if not picked:
+                results.append(OCRResult("", 0.0))
+            else:
+                results.append(OCRResult("".join(ch for ch, _ in picked), min(p for _, p in picked)))
+        return results
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import importlib.util
+import json
 import os
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-import numpy as np
-import cv2
+from timing import timed
+
+if TYPE_CHECKING:
+    import numpy as np
 
 os.environ.setdefault("FLAGS_use_onednn", "false")
 os.environ.setdefault("FLAGS_use_mkldnn", "false")
@@ -15,6 +20,44 @@ os.environ.setdefault("PYTHONIOENCODING", "utf-8")
 os.environ.setdefault("PYTHONUTF8", "1")
 
 
+BACKEND_MODULES = {"paddleocr": "paddleocr", "easyocr": "easyocr", "tesseract": "pytesseract"}
+
+
+def available_backends() -> List[str]:
+    return [name for name, module in BACKEND_MODULES.items() if importlib.util.find_spec(module) is not None]
+
+
+def cache_root() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "supply_ocr"
+
+
+def _resolved_cache_path() -> Path:
+    override = os.environ.get("SUPPLY_OCR_ENGINE_CACHE")
+    if override:
+        return Path(override)
+    return cache_root() / "ocr_engine.json"
+
+
+def _read_resolved(available: List[str]) -> Optional[str]:
+    # Only trust the entry if the installed backends are the same as when it was resolved.
+    try:
+        data = json.loads(_resolved_cache_path().read_text(encoding="utf-8"))
+        if data.get("available") != available:
+            return None
+        return data.get("auto")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_resolved(name: str, available: List[str]) -> None:
+    path = _resolved_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"auto": name, "available": available}), encoding="utf-8")
+    except OSError:
+        pass
+
+
 @dataclass
 class OCRResult:
     text: str
@@ -26,20 +69,33 @@ class OCREngine:
         self.engine = (engine or os.environ.get("OCR_ENGINE") or "auto").lower()
         self._impl = None
         self._impl_name = None
+        self.calls = 0
         self._init_impl()
 
     @property
     def name(self) -> str:
         return self._impl_name or "none"
 
+    @property
+    def wants_raw(self) -> bool:
+        return self._impl_name == "digits"
+
     def _init_impl(self) -> None:
         if self.engine in ("none", "off", "disabled"):
             self._impl = None
             self._impl_name = "none"
             return
         if self.engine == "auto":
-            for name in ("paddleocr", "easyocr", "tesseract"):
+            available = available_backends()
+            candidates = list(available)
+            cached = _read_resolved(available)
+            if cached in candidates:
+                candidates.remove(cached)
+                candidates.insert(0, cached)
+            for name in candidates:
                 if self._try_init(name):
+                    if name != cached:
+                        _write_resolved(name, available)
                     return
         else:
             self._try_init(self.engine)
@@ -63,6 +119,15 @@ class OCREngine:
                 return True
             except Exception:
                 return False
+        if name == "digits":
+            try:
+                from .digits import DigitClassifier
+
+                self._impl = DigitClassifier()
+                self._impl_name = "digits"
+                return True
+            except Exception:
+                return False
         if name == "tesseract":
             try:
                 import pytesseract  # type: ignore
@@ -74,7 +139,22 @@ class OCREngine:
                 return False
         return False
 
+    @timed("ocr")
     def read_text(self, img: np.ndarray, whitelist: str | None = None) -> OCRResult:
+        self.calls += 1
+        return self._read(img, whitelist)
+
+    @timed("ocr")
+    def read_texts(self, imgs: List[np.ndarray], whitelist: str | None = None) -> List[OCRResult]:
+        self.calls += len(imgs)
+        if self._impl_name == "digits":
+            return self._impl.read_many(imgs, whitelist)
+        return [self._read(img, whitelist) for img in imgs]
+
+    def warmup(self, img: np.ndarray) -> OCRResult:
+        return self._read(img, None)
+
+    def _read(self, img: np.ndarray, whitelist: str | None) -> OCRResult:
         if self._impl_name is None or self._impl_name == "none":
             return OCRResult("", 0.0)
         if self._impl_name == "paddleocr":
@@ -83,10 +163,14 @@ class OCREngine:
             return self._read_easy(img, whitelist)
         if self._impl_name == "tesseract":
             return self._read_tesseract(img, whitelist)
+        if self._impl_name == "digits":
+            return self._impl.read(img, whitelist)
         return OCRResult("", 0.0)
 
     def _read_paddle(self, img: np.ndarray, whitelist: str | None) -> OCRResult:
         if img.ndim == 2:
+            import cv2
+
             img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
         result = self._impl.ocr(img)
         if not result:
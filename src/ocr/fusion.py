@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from timing import timed
+
+
+@dataclass
+class FusionConfig:
+    method: str = "median"
+    min_shift: float = 0.5
+    max_shift: float = 3.0
+    min_response: float = 0.05
+
+
+def _gray32(img: np.ndarray) -> np.ndarray:
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return gray.astype(np.float32)
+
+
+def align_crops(crops: List[np.ndarray], cfg: FusionConfig | None = None) -> List[np.ndarray]:
+    cfg = cfg or FusionConfig()
+    ref = crops[len(crops) // 2]
+    ref_gray = _gray32(ref)
+    h, w = ref_gray.shape[:2]
+    window = cv2.createHanningWindow((w, h), cv2.CV_32F) if h > 1 and w > 1 else None
+    aligned = []
+    for crop in crops:
+        if crop is ref:
+            aligned.append(crop)
+            continue
+        (dx, dy), response = cv2.phaseCorrelate(ref_gray, _gray32(crop), window)
+        # Sub-half-pixel estimates on noisy crops are mostly noise; warping on them only blurs the glyphs.
+        small = abs(dx) < cfg.min_shift and abs(dy) < cfg.min_shift
+        if small or response < cfg.min_response or abs(dx) > cfg.max_shift or abs(dy) > cfg.max_shift:
+            aligned.append(crop)
+            continue
+        m = np.float32([[1, 0, -dx], [0, 1, -dy]])
+        aligned.append(cv2.warpAffine(crop, m, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE))
+    return aligned
+
+
+@timed("fusion")
+def fuse_crops(
+    items: List[Tuple[float, np.ndarray]], cfg: FusionConfig | None = None
+) -> Tuple[float, np.ndarray, int] | None:
+    # Also returns how many crops were stacked; 1 means the result is a single raw crop.
+    cfg = cfg or FusionConfig()
+    if not items:
+        return None
+    # Template-mode ROIs can drift by a pixel; only stack crops of the dominant size.
+    shape = Counter(crop.shape for _, crop in items).most_common(1)[0][0]
+    kept = [(t, crop) for t, crop in items if crop.shape == shape]
+    t_mid = kept[len(kept) // 2][0]
+    if len(kept) == 1:
+        return t_mid, kept[0][1], 1
+    stack = np.stack(align_crops([crop for _, crop in kept], cfg)).astype(np.float32)
+    fused = np.median(stack, axis=0) if cfg.method == "median" else stack.mean(axis=0)
+    return t_mid, np.clip(fused + 0.5, 0, 255).astype(np.uint8), len(kept)
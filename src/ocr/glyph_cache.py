@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from .engine import OCRResult, cache_root
+
+HASH_SIZE = (64, 16)
+
+
+def average_hash(img: np.ndarray, size: Tuple[int, int] = HASH_SIZE) -> int:
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    return int.from_bytes(np.packbits(small > small.mean()).tobytes(), "big")
+
+
+def reader_key(engine: str, vocab_path: Optional[Path] = None, vocab_min_score: Optional[float] = None) -> str:
+    # Cached texts are engine output after vocabulary snapping, so both go into the cache identity.
+    h = hashlib.sha1(engine.encode())
+    if vocab_path is not None:
+        h.update(Path(vocab_path).read_bytes())
+        h.update(f"|{vocab_min_score}".encode())
+    return f"{engine}_{h.hexdigest()[:10]}"
+
+
+def profile_cache_path(
+    profile_path: Path, roi_name: str, cache_dir: Optional[Path] = None, reader: Optional[str] = None
+) -> Path:
+    profile_path = Path(profile_path)
+    digest = hashlib.sha1(profile_path.read_bytes()).hexdigest()[:10]
+    base = Path(cache_dir) if cache_dir is not None else cache_root() / "glyphs"
+    suffix = f"_{reader}" if reader else ""
+    return base / f"{profile_path.stem}_{digest}_{roi_name}{suffix}.json"
+
+
+@dataclass
+class GlyphEntry:
+    hash: int
+    text: str
+    conf: float
+    hits: int = 0
+
+
+class GlyphCache:
+    def __init__(self, max_distance: int = 8, min_conf: float = 0.6, max_entries: int = 4096) -> None:
+        self.max_distance = max_distance
+        self.min_conf = min_conf
+        self.max_entries = max_entries
+        self.entries: List[GlyphEntry] = []
+        self._bits = HASH_SIZE[0] * HASH_SIZE[1]
+        self._bands = max_distance + 1
+        self._band_bits = -(-self._bits // self._bands)
+        self._index: List[Dict[int, List[int]]] = [{} for _ in range(self._bands)]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "added": 0}
+
+    def _band_keys(self, h: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(h >> (i * self._band_bits)) & mask for i in range(self._bands)]
+
+    def _nearest(self, h: int) -> Optional[GlyphEntry]:
+        # Pigeonhole: a hash within max_distance agrees with an entry on at least one band.
+        candidates: Set[int] = set()
+        for band, key in zip(self._index, self._band_keys(h)):
+            candidates.update(band.get(key, ()))
+        best = None
+        best_d = self.max_distance + 1
+        for idx in candidates:
+            d = (self.entries[idx].hash ^ h).bit_count()
+            if d < best_d:
+                best, best_d = self.entries[idx], d
+        return best
+
+    def _insert(self, entry: GlyphEntry) -> None:
+        idx = len(self.entries)
+        self.entries.append(entry)
+        for band, key in zip(self._index, self._band_keys(entry.hash)):
+            band.setdefault(key, []).append(idx)
+
+    def lookup(self, crop: np.ndarray) -> Optional[OCRResult]:
+        h = average_hash(crop)
+        with self._lock:
+            entry = self._nearest(h)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            entry.hits += 1
+            self.stats["hits"] += 1
+            return OCRResult(entry.text, entry.conf)
+
+    def add(self, crop: np.ndarray, res: OCRResult) -> None:
+        if not res.text.strip() or res.conf < self.min_conf:
+            return
+        h = average_hash(crop)
+        with self._lock:
+            if len(self.entries) >= self.max_entries or self._nearest(h) is not None:
+                return
+            self._insert(GlyphEntry(h, res.text, float(res.conf)))
+            self.stats["added"] += 1
+
+    def dump(self) -> Dict:
+        with self._lock:
+            return {
+                "version": 1,
+                "hash_size": list(HASH_SIZE),
+                "max_distance": self.max_distance,
+                "entries": [{"hash": f"{e.hash:x}", "text": e.text, "conf": e.conf, "hits": e.hits} for e in self.entries],
+            }
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.dump(), indent=2), encoding="utf-8")
+
+    @classmethod
+    def from_data(cls, data: Dict, max_distance: int = 8, min_conf: float = 0.6, max_entries: int = 4096) -> "GlyphCache":
+        cache = cls(max_distance, min_conf, max_entries)
+        if data.get("version") != 1 or tuple(data.get("hash_size", ())) != HASH_SIZE:
+            return cache
+        for e in data.get("entries", [])[:max_entries]:
+            cache._insert(GlyphEntry(int(e["hash"], 16), e["text"], float(e["conf"]), int(e.get("hits", 0))))
+        return cache
+
+    @classmethod
+    def load(cls, path: Path, max_distance: int = 8, min_conf: float = 0.6, max_entries: int = 4096) -> "GlyphCache":
+        path = Path(path)
+        if not path.exists():
+            return cls(max_distance, min_conf, max_entries)
+        return cls.from_data(json.loads(path.read_text(encoding="utf-8")), max_distance, min_conf, max_entries)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .engine import OCREngine, OCRResult
+
+
+class OCRMemo:
+    def __init__(self, max_entries: int = 200_000) -> None:
+        self.max_entries = max_entries
+        self._results: Dict[bytes, OCRResult] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(engine: str, img: np.ndarray, whitelist: Optional[str]) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{engine}|{whitelist}|{img.dtype}|{img.shape}".encode())
+        h.update(np.ascontiguousarray(img).data)
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[OCRResult]:
+        with self._lock:
+            res = self._results.get(key)
+            self.stats["hits" if res is not None else "misses"] += 1
+            return res
+
+    def put(self, key: bytes, res: OCRResult) -> None:
+        with self._lock:
+            if len(self._results) < self.max_entries:
+                self._results[key] = res
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+class MemoEngine:
+    def __init__(self, engine: OCREngine, memo: OCRMemo) -> None:
+        self.engine = engine
+        self.memo = memo
+
+    @property
+    def name(self) -> str:
+        return self.engine.name
+
+    @property
+    def wants_raw(self) -> bool:
+        return self.engine.wants_raw
+
+    @property
+    def calls(self) -> int:
+        return self.engine.calls
+
+    def read_text(self, img: np.ndarray, whitelist: str | None = None) -> OCRResult:
+        key = self.memo.key(self.engine.name, img, whitelist)
+        res = self.memo.get(key)
+        if res is None:
+            res = self.engine.read_text(img, whitelist)
+            self.memo.put(key, res)
+        return OCRResult(res.text, res.conf)
+
+    def read_texts(self, imgs: List[np.ndarray], whitelist: str | None = None) -> List[OCRResult]:
+        keys = [self.memo.key(self.engine.name, img, whitelist) for img in imgs]
+        results = [self.memo.get(key) for key in keys]
+        missing = [i for i, res in enumerate(results) if res is None]
+        if missing:
+            for i, res in zip(missing, self.engine.read_texts([imgs[i] for i in missing], whitelist)):
+                self.memo.put(keys[i], res)
+                results[i] = res
+        return [OCRResult(res.text, res.conf) for res in results]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+import cv2
+import numpy as np
+
+from .engine import OCREngine
+from .memo import MemoEngine, OCRMemo
+
+DEFAULT_POOL_SIZES = {"paddleocr": 1, "easyocr": 1, "tesseract": 2, "none": 1}
+
+
+def _warmup_image() -> np.ndarray:
+    img = np.full((32, 64), 255, dtype=np.uint8)
+    cv2.putText(img, "12", (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 0, 2, cv2.LINE_AA)
+    return img
+
+
+class OCREnginePool:
+    def __init__(
+        self,
+        engine: Optional[str] = None,
+        size: Optional[int] = None,
+        warmup: bool = True,
+        memo: Optional[OCRMemo] = None,
+    ) -> None:
+        t0 = time.perf_counter()
+        first = OCREngine(engine)
+        self.name = first.name
+        self.size = max(1, size if size is not None else DEFAULT_POOL_SIZES.get(self.name, 1))
+        self.engines: List[OCREngine] = [first]
+        for _ in range(self.size - 1):
+            self.engines.append(OCREngine(self.name))
+        self.init_sec = time.perf_counter() - t0
+
+        self.warmup_sec = 0.0
+        if warmup and self.name != "none":
+            img = _warmup_image()
+            t0 = time.perf_counter()
+            for eng in self.engines:
+                eng.warmup(img)
+            self.warmup_sec = time.perf_counter() - t0
+
+        self._idle: queue.Queue = queue.Queue()
+        for eng in self.engines:
+            self._idle.put(eng)
+        self._lock = threading.Lock()
+        self.memo = memo
+        self.checkouts = 0
+        self.wait_sec = 0.0
+
+    @property
+    def calls(self) -> int:
+        return sum(eng.calls for eng in self.engines)
+
+    @property
+    def wants_raw(self) -> bool:
+        return self.engines[0].wants_raw
+
+    @contextmanager
+    def checkout(self) -> Iterator[Union[OCREngine, MemoEngine]]:
+        t0 = time.perf_counter()
+        eng = self._idle.get()
+        waited = time.perf_counter() - t0
+        with self._lock:
+            self.checkouts += 1
+            self.wait_sec += waited
+        try:
+            yield MemoEngine(eng, self.memo) if self.memo is not None else eng
+        finally:
+            self._idle.put(eng)
+
+    def stats(self) -> Dict:
+        return {
+            "engine": self.name,
+            "size": self.size,
+            "init_sec": round(self.init_sec, 4),
+            "warmup_sec": round(self.warmup_sec, 4),
+            "checkouts": self.checkouts,
+            "checkout_wait_sec": round(self.wait_sec, 4),
+        }
@@ -6,6 +6,8 @@ from typing import Tuple
 import cv2
 import numpy as np
 
+from timing import timed
+
 
 @dataclass
 class PreprocessConfig:
@@ -25,6 +27,8 @@ def upscale3x(img: np.ndarray, factor: int = 3) -> np.ndarray:
 
 
 def denoise(img: np.ndarray, strength: int = 10) -> np.ndarray:
+    if strength <= 0:
+        return img
     if len(img.shape) == 2:
         return cv2.fastNlMeansDenoising(img, h=strength)
     return cv2.fastNlMeansDenoisingColored(img, h=strength, hColor=strength)
@@ -56,6 +60,7 @@ def sharpness_score(img: np.ndarray) -> float:
     return float(cv2.Laplacian(gray, cv2.CV_64F).var())
 
 
+@timed("preprocess")
 def preprocess(img: np.ndarray, cfg: PreprocessConfig | None = None) -> np.ndarray:
     cfg = cfg or PreprocessConfig()
     out = upscale3x(img, cfg.upscale)
@@ -66,6 +71,7 @@ def preprocess(img: np.ndarray, cfg: PreprocessConfig | None = None) -> np.ndarr
     return out
 
 
+@timed("preprocess")
 def preprocess_text(img: np.ndarray, upscale: int = 3, denoise_strength: int = 10) -> np.ndarray:
     out = upscale3x(img, upscale)
     out = denoise(out, denoise_strength)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .engine import OCREngine
+from .read_queue import read_queue
+from .read_selection import read_selection
+from .read_supply import SlashTracker, read_supply
+
+DEFAULT_SLOT_BYTES = 256 * 1024
+KINDS = ("supply", "selection", "queue", "checksum")
+
+
+class SlotRing:
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None) -> None:
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, slots * slot_bytes))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def view(self, slot: int, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if not 0 <= slot < self.slots or nbytes > self.slot_bytes:
+            raise ValueError(f"{nbytes} bytes do not fit slot {slot} of {self.slots}x{self.slot_bytes}")
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def write(self, slot: int, img: np.ndarray) -> Tuple[Tuple[int, ...], str]:
+        self.view(slot, img.shape, img.dtype)[...] = img
+        return tuple(img.shape), img.dtype.str
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _read(kind: str, img: np.ndarray, ocr: OCREngine, tracker: SlashTracker, templates_dir: Path, params: Dict) -> Any:
+    if kind == "supply":
+        return read_supply(img, templates_dir, ocr, tracker, **params)
+    if kind == "selection":
+        return read_selection(img, ocr, **params)
+    if kind == "queue":
+        return read_queue(img, ocr, **params)
+    return int(img.sum(dtype=np.uint64))
+
+
+def _worker(
+    shm_name: Optional[str],
+    slots: int,
+    slot_bytes: int,
+    engine: Optional[str],
+    templates_dir: Path,
+    tasks: mp.Queue,
+    results: Connection,
+) -> None:
+    ring = SlotRing(slots, slot_bytes, shm_name) if shm_name is not None else None
+    ocr = OCREngine(engine)
+    tracker = SlashTracker()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            job, kind, slot, shape, dtype, payload, params = task
+            img = payload if slot is None else ring.view(slot, shape, dtype)
+            try:
+                out = (job, _read(kind, img, ocr, tracker, templates_dir, params), None)
+            except Exception as exc:
+                out = (job, None, f"{type(exc).__name__}: {exc}")
+            del img
+            results.send(out)
+    finally:
+        if ring is not None:
+            ring.close()
+
+
+class OCRProcessPool:
+    def __init__(
+        self,
+        engine: Optional[str] = None,
+        workers: int = 2,
+        templates_dir: Optional[Path] = None,
+        slots: Optional[int] = None,
+        slot_bytes: int = DEFAULT_SLOT_BYTES,
+        transport: str = "shm",
+    ) -> None:
+        if transport not in ("shm", "pickle"):
+            raise ValueError(f"Unknown transport: {transport}")
+        self.transport = transport
+        self.workers = max(1, workers)
+        self.slots = slots if slots is not None else 4 * self.workers
+        self.ring = SlotRing(self.slots, slot_bytes) if transport == "shm" else None
+        templates_dir = templates_dir or Path(__file__).resolve().parents[2] / "a"
+
+        self._free: queue.Queue = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        ctx = mp.get_context()
+        self._tasks = ctx.Queue()
+        self._pending: Dict[int, Tuple[Future, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self._next_job = 0
+        self._closed = False
+        self.broken: Optional[str] = None
+        self.submitted = 0
+        self.inline = 0
+        self.slot_wait_sec = 0.0
+
+        shm_name = self.ring.name if self.ring is not None else None
+        self.procs: List[mp.Process] = []
+        self._results: List[Connection] = []
+        for _ in range(self.workers):
+            # One result pipe per worker; the parent drops its write end so a dead worker reads as EOF.
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_worker,
+                args=(shm_name, self.slots, slot_bytes, engine, templates_dir, self._tasks, send),
+                daemon=True,
+            )
+            proc.start()
+            send.close()
+            self.procs.append(proc)
+            self._results.append(recv)
+        self._collector = threading.Thread(target=self._collect, name="ocr-results", daemon=True)
+        self._collector.start()
+
+    def submit(self, kind: str, img: np.ndarray, **params: Any) -> Future:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown read kind: {kind}")
+        if self._closed:
+            raise RuntimeError("OCRProcessPool is closed")
+        self._check_broken()
+        fut: Future = Future()
+        slot = None
+        payload = None
+        if self.ring is not None and img.nbytes <= self.ring.slot_bytes:
+            t0 = time.perf_counter()
+            slot = self._take_slot()
+            self.slot_wait_sec += time.perf_counter() - t0
+            shape, dtype = self.ring.write(slot, img)
+        else:
+            # No ring, or a crop bigger than a slot: ship the pixels in the task itself.
+            payload = np.ascontiguousarray(img)
+            shape, dtype = tuple(img.shape), img.dtype.str
+            self.inline += self.ring is not None
+        with self._lock:
+            if self.broken is not None:
+                if slot is not None:
+                    self._free.put(slot)
+                raise RuntimeError(self.broken)
+            job = self._next_job
+            self._next_job += 1
+            self._pending[job] = (fut, slot)
+            self.submitted += 1
+        self._tasks.put((job, kind, slot, shape, dtype, payload, params))
+        return fut
+
+    def read(self, kind: str, img: np.ndarray, **params: Any) -> Any:
+        return self.submit(kind, img, **params).result()
+
+    def _check_broken(self) -> None:
+        if self.broken is not None:
+            raise RuntimeError(self.broken)
+
+    def _take_slot(self) -> int:
+        # Poll so a submit blocked on a full ring still notices a pool that broke meanwhile.
+        while True:
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                self._check_broken()
+
+    def _finish(self, job: int, res: Any, err: Optional[str]) -> None:
+        with self._lock:
+            entry = self._pending.pop(job, None)
+        if entry is None:
+            return
+        fut, slot = entry
+        if slot is not None:
+            self._free.put(slot)
+        if err is None:
+            fut.set_result(res)
+        else:
+            fut.set_exception(RuntimeError(err))
+
+    def _fail_pending(self, msg: str) -> None:
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for fut, slot in pending:
+            if slot is not None:
+                self._free.put(slot)
+            if not fut.done():
+                fut.set_exception(RuntimeError(msg))
+
+    def _drain(self, conn: Connection) -> bool:
+        try:
+            while conn.poll():
+                self._finish(*conn.recv())
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def _collect(self) -> None:
+        conns = dict(zip([proc.sentinel for proc in self.procs], zip(self.procs, self._results)))
+        readers = set(self._results)
+        while conns:
+            for ready in wait(list(readers) + list(conns)):
+                if ready not in conns:
+                    if ready in readers and not self._drain(ready):
+                        readers.discard(ready)
+                    continue
+                proc, conn = conns.pop(ready)
+                self._drain(conn)
+                readers.discard(conn)
+                if not self._closed:
+                    # Queued tasks are not tied to a worker, so any of them may have died with it: fail them all.
+                    with self._lock:
+                        self.broken = self.broken or f"OCR worker {proc.pid} exited with code {proc.exitcode}"
+                    self._fail_pending(self.broken)
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self.procs:
+            self._tasks.put(None)
+        for proc in self.procs:
+            # A broken pool may have lost the task queue's lock with the dead worker, so do not wait on it.
+            proc.join(timeout if self.broken is None else 0)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(timeout)
+        self._collector.join(timeout)
+        self._fail_pending("OCR worker exited before answering")
+        for conn in self._results:
+            conn.close()
+        self._tasks.cancel_join_thread()
+        self._tasks.close()
+        if self.ring is not None:
+            self.ring.close()
+
+    def __enter__(self) -> "OCRProcessPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> Dict:
+        return {
+            "transport": self.transport,
+            "workers": self.workers,
+            "slots": self.slots if self.ring is not None else 0,
+            "slot_bytes": self.ring.slot_bytes if self.ring is not None else 0,
+            "submitted": self.submitted,
+            "inline": self.inline,
+            "slot_wait_sec": round(self.slot_wait_sec, 4),
+            "free_slots": self._free.qsize() if self.ring is not None else 0,
+            "broken": self.broken,
+        }
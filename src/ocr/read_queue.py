@@ -6,7 +6,9 @@ from typing import Tuple
 import numpy as np
 
 from .engine import OCREngine, OCRResult
+from .glyph_cache import GlyphCache
 from .preprocess import preprocess, preprocess_text
+from .vocab import NameSnapper
 
 
 @dataclass
@@ -18,12 +20,24 @@ def read_queue(
     roi_img: np.ndarray,
     ocr: OCREngine,
     text_line: Tuple[int, int, int, int] | None = None,
+    snapper: NameSnapper | None = None,
+    glyph_cache: GlyphCache | None = None,
+    denoise_strength: int = 10,
 ) -> QueueOCRResult:
     h, w = roi_img.shape[:2]
     if text_line is None:
         text_line = (0, 0, w, max(1, int(h * 0.4)))
     x, y, cw, ch = text_line
     crop = roi_img[y : y + ch, x : x + cw]
-    pre = preprocess_text(crop)
-    res = ocr.read_text(pre, whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ")
+    res = glyph_cache.lookup(crop) if glyph_cache is not None else None
+    if res is None and glyph_cache is None and snapper is not None:
+        # Without a glyph cache, fall back to the snapper's exact crop-signature early stop.
+        res = snapper.lookup(crop)
+    if res is None:
+        pre = preprocess_text(crop, denoise_strength=denoise_strength)
+        res = ocr.read_text(pre, whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ")
+        if snapper is not None:
+            res = snapper.snap(res, crop if glyph_cache is None else None)
+        if glyph_cache is not None:
+            glyph_cache.add(crop, res)
     return QueueOCRResult(res)
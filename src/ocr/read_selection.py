@@ -6,7 +6,9 @@ from typing import Dict, Tuple
 import numpy as np
 
 from .engine import OCREngine, OCRResult
+from .glyph_cache import GlyphCache
 from .preprocess import preprocess, preprocess_text
+from .vocab import NameSnapper
 
 
 @dataclass
@@ -20,6 +22,9 @@ def read_selection(
     ocr: OCREngine,
     name_line: Tuple[int, int, int, int] | None = None,
     hp_line: Tuple[int, int, int, int] | None = None,
+    snapper: NameSnapper | None = None,
+    glyph_cache: GlyphCache | None = None,
+    denoise_strength: int = 10,
 ) -> SelectionOCRResult:
     h, w = roi_img.shape[:2]
     if name_line is None:
@@ -29,12 +34,21 @@ def read_selection(
 
     x, y, cw, ch = name_line
     name_crop = roi_img[y : y + ch, x : x + cw]
-    name_pre = preprocess_text(name_crop)
-    name_res = ocr.read_text(name_pre, whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ")
+    name_res = glyph_cache.lookup(name_crop) if glyph_cache is not None else None
+    if name_res is None and glyph_cache is None and snapper is not None:
+        # Without a glyph cache, fall back to the snapper's exact crop-signature early stop.
+        name_res = snapper.lookup(name_crop)
+    if name_res is None:
+        name_pre = preprocess_text(name_crop, denoise_strength=denoise_strength)
+        name_res = ocr.read_text(name_pre, whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ")
+        if snapper is not None:
+            name_res = snapper.snap(name_res, name_crop if glyph_cache is None else None)
+        if glyph_cache is not None:
+            glyph_cache.add(name_crop, name_res)
 
     x, y, cw, ch = hp_line
     hp_crop = roi_img[y : y + ch, x : x + cw]
-    hp_pre = preprocess_text(hp_crop)
+    hp_pre = preprocess_text(hp_crop, denoise_strength=denoise_strength)
     hp_res = ocr.read_text(hp_pre, whitelist="0123456789/ ")
 
     return SelectionOCRResult(name_res, hp_res)
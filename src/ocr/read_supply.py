@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Tuple, List
 
 import cv2
 import numpy as np
 
+from roi.match import load_template
+from timing import timed
+
 from .engine import OCREngine, OCRResult
-from .preprocess import preprocess
+from .preprocess import PreprocessConfig, preprocess
 
 
 @dataclass
@@ -19,19 +23,35 @@ class SupplyReadResult:
     conf: float
 
 
-def _load_templates(templates_dir: Path) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+@dataclass
+class SlashTracker:
+    margin: int = 4
+    min_conf: float = 0.6
+    loc: Tuple[int, int] | None = None
+    fast_attempts: int = 0
+    fast_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        if self.fast_attempts == 0:
+            return 0.0
+        return self.fast_hits / self.fast_attempts
+
+
+@lru_cache(maxsize=16)
+def _load_templates(templates_dir: Path, scale: float = 1.0) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
     digits = {}
     for d in range(10):
         for ext in ("png", "jpg", "jpeg"):
             p = templates_dir / f"{d}.{ext}"
             if p.exists():
-                digits[str(d)] = cv2.imread(str(p), cv2.IMREAD_GRAYSCALE)
+                digits[str(d)] = load_template(str(p), scale)
                 break
     slash = None
     for ext in ("png", "jpg", "jpeg"):
         p = templates_dir / f"slash.{ext}"
         if p.exists():
-            slash = cv2.imread(str(p), cv2.IMREAD_GRAYSCALE)
+            slash = load_template(str(p), scale)
             break
     if slash is None:
         raise FileNotFoundError("slash template not found")
@@ -49,6 +69,34 @@ def _match_template(image: np.ndarray, template: np.ndarray) -> Tuple[Tuple[int,
     return max_loc, float(max_val)
 
 
+@timed("template_match")
+def _locate_slash(
+    gray: np.ndarray,
+    slash_template: np.ndarray,
+    tracker: SlashTracker | None,
+) -> Tuple[Tuple[int, int], float]:
+    sh, sw = slash_template.shape[:2]
+    if tracker is not None and tracker.loc is not None:
+        tracker.fast_attempts += 1
+        lx, ly = tracker.loc
+        x0 = max(0, lx - tracker.margin)
+        y0 = max(0, ly - tracker.margin)
+        x1 = min(gray.shape[1], lx + sw + tracker.margin)
+        y1 = min(gray.shape[0], ly + sh + tracker.margin)
+        window = gray[y0:y1, x0:x1]
+        if window.shape[0] >= sh and window.shape[1] >= sw:
+            (wx, wy), conf = _match_template(window, slash_template)
+            if conf >= tracker.min_conf:
+                tracker.fast_hits += 1
+                tracker.loc = (x0 + wx, y0 + wy)
+                return tracker.loc, conf
+
+    loc, conf = _match_template(gray, slash_template)
+    if tracker is not None:
+        tracker.loc = loc if conf >= tracker.min_conf else None
+    return loc, conf
+
+
 def _template_digit_read(img: np.ndarray, digit_templates: Dict[str, np.ndarray]) -> OCRResult:
     if not digit_templates:
         return OCRResult("", 0.0)
@@ -137,18 +185,37 @@ def _template_digits_from_contours(img: np.ndarray, digit_templates: Dict[str, n
     return max(results, key=lambda r: (len(r.text), r.conf))
 
 
-def read_supply(
+@dataclass
+class SupplySplit:
+    left_raw: np.ndarray
+    right_raw: np.ndarray
+    slash_conf: float
+    digit_templates: Dict[str, np.ndarray]
+
+
+@dataclass
+class SupplyPrepared:
+    left_raw: np.ndarray
+    right_raw: np.ndarray
+    left_pre: np.ndarray | None
+    right_pre: np.ndarray | None
+    slash_conf: float
+    digit_templates: Dict[str, np.ndarray]
+
+
+def split_supply(
     roi_img: np.ndarray,
     templates_dir: Path,
-    ocr: OCREngine,
-) -> SupplyReadResult:
-    digit_templates, slash_template = _load_templates(templates_dir)
+    tracker: SlashTracker | None = None,
+    template_scale: float = 1.0,
+) -> SupplySplit | None:
+    digit_templates, slash_template = _load_templates(Path(templates_dir), round(template_scale, 4))
     gray = roi_img if len(roi_img.shape) == 2 else cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
 
     if gray.shape[0] < slash_template.shape[0] or gray.shape[1] < slash_template.shape[1]:
-        return SupplyReadResult(None, None, "", 0.0)
+        return None
 
-    slash_loc, slash_conf = _match_template(gray, slash_template)
+    slash_loc, slash_conf = _locate_slash(gray, slash_template, tracker)
     sx, sy = slash_loc
     sh, sw = slash_template.shape[:2]
 
@@ -166,23 +233,58 @@ def read_supply(
             right_raw = gray[:, split_idx:]
 
     if left_raw is None or right_raw is None:
-        return SupplyReadResult(None, None, "", 0.0)
+        return None
 
     left_raw = left_raw[:, : max(1, left_raw.shape[1])]
     right_raw = right_raw[:, : max(1, right_raw.shape[1])]
 
     if left_raw.size == 0 or right_raw.size == 0:
+        return None
+
+    return SupplySplit(left_raw=left_raw, right_raw=right_raw, slash_conf=slash_conf, digit_templates=digit_templates)
+
+
+def preprocess_supply(
+    split: SupplySplit | None, preprocess_cfg: PreprocessConfig | None = None, raw: bool = False
+) -> SupplyPrepared | None:
+    # raw: the engine reads the unprocessed halves, so skip the upscale/threshold entirely.
+    if split is None:
+        return None
+    return SupplyPrepared(
+        left_raw=split.left_raw,
+        right_raw=split.right_raw,
+        left_pre=None if raw else preprocess(split.left_raw, preprocess_cfg),
+        right_pre=None if raw else preprocess(split.right_raw, preprocess_cfg),
+        slash_conf=split.slash_conf,
+        digit_templates=split.digit_templates,
+    )
+
+
+def prepare_supply(
+    roi_img: np.ndarray,
+    templates_dir: Path,
+    tracker: SlashTracker | None = None,
+    template_scale: float = 1.0,
+    preprocess_cfg: PreprocessConfig | None = None,
+    raw: bool = False,
+) -> SupplyPrepared | None:
+    return preprocess_supply(split_supply(roi_img, templates_dir, tracker, template_scale), preprocess_cfg, raw)
+
+
+def finish_supply(prepared: SupplyPrepared | None, ocr: OCREngine) -> SupplyReadResult:
+    if prepared is None:
         return SupplyReadResult(None, None, "", 0.0)
 
-    left_pre = preprocess(left_raw)
-    right_pre = preprocess(right_raw)
-    left_ocr = ocr.read_text(left_pre, whitelist="0123456789")
-    right_ocr = ocr.read_text(right_pre, whitelist="0123456789")
+    if ocr.wants_raw:
+        left_ocr, right_ocr = ocr.read_texts([prepared.left_raw, prepared.right_raw], whitelist="0123456789")
+    else:
+        left_ocr = ocr.read_text(prepared.left_pre, whitelist="0123456789")
+        right_ocr = ocr.read_text(prepared.right_pre, whitelist="0123456789")
 
     if not left_ocr.text:
-        left_ocr = _template_digits_from_contours(left_raw, digit_templates)
+        left_ocr = _template_digits_from_contours(prepared.left_raw, prepared.digit_templates)
     if not right_ocr.text:
-        right_ocr = _template_digits_from_contours(right_raw, digit_templates)
+        right_ocr = _template_digits_from_contours(prepared.right_raw, prepared.digit_templates)
 
     raw = ""
     used = None
@@ -200,5 +302,18 @@ def read_supply(
             used = None
             total = None
 
-    conf = min(conf, slash_conf)
+    conf = min(conf, prepared.slash_conf)
     return SupplyReadResult(used, total, raw, conf)
+
+
+@timed("read_supply")
+def read_supply(
+    roi_img: np.ndarray,
+    templates_dir: Path,
+    ocr: OCREngine,
+    tracker: SlashTracker | None = None,
+    template_scale: float = 1.0,
+    preprocess_cfg: PreprocessConfig | None = None,
+) -> SupplyReadResult:
+    prepared = prepare_supply(roi_img, templates_dir, tracker, template_scale, preprocess_cfg, ocr.wants_raw)
+    return finish_supply(prepared, ocr)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ocr.digits import CLASSES, GLYPH_H, GLYPH_W, MODEL_PATH, REJECT, normalize_glyph, segment_glyphs  # noqa: E402
+
+CONV = 8
+HIDDEN = 32
+
+
+def _load_glyph_variants(templates_dir: Path) -> Dict[str, List[np.ndarray]]:
+    glyphs: Dict[str, List[np.ndarray]] = {}
+    for name in [str(d) for d in range(10)] + ["slash"]:
+        for ext in ("png", "jpg", "jpeg"):
+            img = cv2.imread(str(templates_dir / f"{name}.{ext}"), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                glyphs.setdefault(name, []).append(img)
+    return glyphs
+
+
+def _render(glyph: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    gh, gw = glyph.shape[:2]
+    h = int(rng.integers(9, 16))
+    w = max(2, int(round(gw * h / gh * rng.uniform(0.85, 1.15))))
+    g = cv2.resize(glyph, (w, h), interpolation=cv2.INTER_LINEAR).astype(np.float32) * rng.uniform(0.6, 1.3)
+    pad_y = int(rng.integers(2, 6))
+    pad_x = int(rng.integers(1, 4))
+    canvas = rng.uniform(0, rng.uniform(10, 50), size=(h + 2 * pad_y, w + 2 * pad_x)).astype(np.float32)
+    canvas[pad_y : pad_y + h, pad_x : pad_x + w] = np.maximum(canvas[pad_y : pad_y + h, pad_x : pad_x + w], g)
+    if rng.random() < 0.3:
+        canvas = cv2.GaussianBlur(canvas, (3, 3), rng.uniform(0.3, 0.9))
+    canvas += rng.normal(0, rng.uniform(0, 8), canvas.shape)
+    return np.clip(canvas, 0, 255).astype(np.uint8)
+
+
+def _largest_segment(img: np.ndarray) -> np.ndarray | None:
+    segments = segment_glyphs(img)
+    if not segments:
+        return None
+    return max(segments, key=lambda s: s.size)
+
+
+def _reject_sample(glyphs: Dict[str, List[np.ndarray]], rng: np.random.Generator) -> np.ndarray:
+    kind = rng.integers(0, 3)
+    if kind == 0:
+        return _render(glyphs["slash"][int(rng.integers(len(glyphs["slash"])))], rng)
+    if kind == 1:
+        digits = [g for k, v in glyphs.items() if k != "slash" for g in v]
+        g = digits[int(rng.integers(len(digits)))]
+        h, w = g.shape[:2]
+        part = g[: h // 2] if rng.random() < 0.5 else g[:, : max(1, w // 3)]
+        return _render(part, rng)
+    blob = np.zeros((int(rng.integers(3, 12)), int(rng.integers(2, 9))), np.uint8)
+    blob[:] = int(rng.integers(90, 220))
+    return _render(blob, rng)
+
+
+def make_dataset(templates_dir: Path, per_class: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    glyphs = _load_glyph_variants(templates_dir)
+    xs: List[np.ndarray] = []
+    ys: List[int] = []
+    for label, ch in enumerate(CLASSES):
+        n = 0
+        while n < per_class:
+            if ch == REJECT:
+                img = _reject_sample(glyphs, rng)
+            else:
+                variants = glyphs[ch]
+                img = _render(variants[int(rng.integers(len(variants)))], rng)
+            seg = _largest_segment(img)
+            if seg is None:
+                continue
+            xs.append(normalize_glyph(seg))
+            ys.append(label)
+            n += 1
+    return np.stack(xs)[:, None, :, :], np.asarray(ys)
+
+
+def _im2col(x: np.ndarray) -> np.ndarray:
+    n = x.shape[0]
+    padded = np.pad(x[:, 0], ((0, 0), (1, 1), (1, 1)))
+    taps = [padded[:, dy : dy + GLYPH_H, dx : dx + GLYPH_W] for dy in range(3) for dx in range(3)]
+    return np.stack(taps, axis=-1).reshape(n, GLYPH_H * GLYPH_W, 9)
+
+
+def init_params(rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    flat = CONV * (GLYPH_H // 2) * (GLYPH_W // 2)
+    return {
+        "W1": rng.normal(0, np.sqrt(2 / 9), (CONV, 9)).astype(np.float32),
+        "b1": np.zeros(CONV, np.float32),
+        "W2": rng.normal(0, np.sqrt(2 / flat), (flat, HIDDEN)).astype(np.float32),
+        "b2": np.zeros(HIDDEN, np.float32),
+        "W3": rng.normal(0, np.sqrt(2 / HIDDEN), (HIDDEN, len(CLASSES))).astype(np.float32),
+        "b3": np.zeros(len(CLASSES), np.float32),
+    }
+
+
+def forward(params: Dict[str, np.ndarray], x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    n = x.shape[0]
+    cols = _im2col(x)
+    conv = (cols @ params["W1"].T + params["b1"]).reshape(n, GLYPH_H, GLYPH_W, CONV)
+    r1 = np.maximum(conv, 0)
+    blocks = r1.reshape(n, GLYPH_H // 2, 2, GLYPH_W // 2, 2, CONV)
+    pooled = blocks.max(axis=(2, 4))
+    flat = pooled.transpose(0, 3, 1, 2).reshape(n, -1)
+    h = np.maximum(flat @ params["W2"] + params["b2"], 0)
+    logits = h @ params["W3"] + params["b3"]
+    cache = {"cols": cols, "conv": conv, "blocks": blocks, "pooled": pooled, "flat": flat, "h": h}
+    return logits, cache
+
+
+def backward(params: Dict[str, np.ndarray], cache: Dict[str, np.ndarray], probs: np.ndarray, y: np.ndarray) -> Dict[str, np.ndarray]:
+    n = y.shape[0]
+    d_logits = probs.copy()
+    d_logits[np.arange(n), y] -= 1.0
+    d_logits /= n
+    grads = {"W3": cache["h"].T @ d_logits, "b3": d_logits.sum(axis=0)}
+    d_h = (d_logits @ params["W3"].T) * (cache["h"] > 0)
+    grads["W2"] = cache["flat"].T @ d_h
+    grads["b2"] = d_h.sum(axis=0)
+    d_flat = d_h @ params["W2"].T
+    d_pooled = d_flat.reshape(n, CONV, GLYPH_H // 2, GLYPH_W // 2).transpose(0, 2, 3, 1)
+    mask = cache["blocks"] == cache["pooled"][:, :, None, :, None, :]
+    d_r1 = (mask * d_pooled[:, :, None, :, None, :]).reshape(n, GLYPH_H, GLYPH_W, CONV)
+    d_conv = (d_r1 * (cache["conv"] > 0)).reshape(n, GLYPH_H * GLYPH_W, CONV)
+    grads["W1"] = np.einsum("npc,npk->ck", d_conv, cache["cols"])
+    grads["b1"] = d_conv.sum(axis=(0, 1))
+    return grads
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def train(x: np.ndarray, y: np.ndarray, epochs: int, seed: int, lr: float = 3e-3, batch: int = 128) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    params = init_params(rng)
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(p) for k, p in params.items()}
+    step = 0
+    for epoch in range(epochs):
+        order = rng.permutation(len(x))
+        loss = 0.0
+        for i in range(0, len(x), batch):
+            idx = order[i : i + batch]
+            logits, cache = forward(params, x[idx])
+            probs = _softmax(logits)
+            loss += float(-np.log(probs[np.arange(len(idx)), y[idx]] + 1e-9).sum())
+            grads = backward(params, cache, probs, y[idx])
+            step += 1
+            for k in params:
+                m[k] = 0.9 * m[k] + 0.1 * grads[k]
+                v[k] = 0.999 * v[k] + 0.001 * grads[k] ** 2
+                m_hat = m[k] / (1 - 0.9**step)
+                v_hat = v[k] / (1 - 0.999**step)
+                params[k] -= (lr * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+        print(f"epoch {epoch + 1}/{epochs} loss {loss / len(x):.4f}")
+    return params
+
+
+def export_onnx(params: Dict[str, np.ndarray], path: Path) -> None:
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    inits = [
+        numpy_helper.from_array(params["W1"].reshape(CONV, 1, 3, 3), "W1"),
+        numpy_helper.from_array(params["b1"], "b1"),
+        numpy_helper.from_array(params["W2"], "W2"),
+        numpy_helper.from_array(params["b2"], "b2"),
+        numpy_helper.from_array(params["W3"], "W3"),
+        numpy_helper.from_array(params["b3"], "b3"),
+    ]
+    nodes = [
+        helper.make_node("Conv", ["x", "W1", "b1"], ["c1"], kernel_shape=[3, 3], pads=[1, 1, 1, 1]),
+        helper.make_node("Relu", ["c1"], ["r1"]),
+        helper.make_node("MaxPool", ["r1"], ["p1"], kernel_shape=[2, 2], strides=[2, 2]),
+        helper.make_node("Flatten", ["p1"], ["f1"], axis=1),
+        helper.make_node("Gemm", ["f1", "W2", "b2"], ["g1"]),
+        helper.make_node("Relu", ["g1"], ["r2"]),
+        helper.make_node("Gemm", ["r2", "W3", "b3"], ["g2"]),
+        helper.make_node("Softmax", ["g2"], ["y"], axis=1),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "supply_digits",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["N", 1, GLYPH_H, GLYPH_W])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["N", len(CLASSES)])],
+        inits,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], producer_name="train_digits")
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    onnx.save(model, str(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the supply digit CNN and export it to ONNX.")
+    parser.add_argument("--templates", default=str(Path(__file__).resolve().parents[2] / "a"))
+    parser.add_argument("--out", default=str(MODEL_PATH))
+    parser.add_argument("--per-class", type=int, default=600)
+    parser.add_argument("--epochs", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    x, y = make_dataset(Path(args.templates), args.per_class, args.seed)
+    x_val, y_val = make_dataset(Path(args.templates), max(50, args.per_class // 5), args.seed + 1)
+    params = train(x, y, args.epochs, args.seed)
+    logits, _ = forward(params, x_val)
+    print(f"val accuracy (numpy): {(logits.argmax(axis=1) == y_val).mean():.4f}")
+
+    out = Path(args.out)
+    export_onnx(params, out)
+    net = cv2.dnn.readNetFromONNX(str(out))
+    net.setInput(x_val.astype(np.float32))
+    print(f"val accuracy (cv2.dnn): {(net.forward().argmax(axis=1) == y_val).mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .engine import OCRResult
+
+DEFAULT_VOCAB = Path(__file__).resolve().parent / "vocab_names.txt"
+
+
+@dataclass
+class VocabMatch:
+    name: str
+    distance: int
+    score: float
+
+
+def normalize_name(text: str) -> str:
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+def levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+class BKTree:
+    def __init__(self) -> None:
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            d = levenshtein(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_dist: int) -> List[Tuple[int, str]]:
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            d = levenshtein(word, node_word)
+            if d <= max_dist:
+                found.append((d, node_word))
+            for edge, child in children.items():
+                if d - max_dist <= edge <= d + max_dist:
+                    stack.append(child)
+        return sorted(found)
+
+
+class Vocabulary:
+    def __init__(self, names: Iterable[str], max_ratio: float = 0.34) -> None:
+        self.names: Dict[str, str] = {}
+        for name in names:
+            key = normalize_name(name)
+            if key:
+                self.names.setdefault(key, name.strip())
+        self.max_ratio = max_ratio
+        self._tree = BKTree()
+        for key in self.names:
+            self._tree.add(key)
+        self._memo: Dict[str, Optional[VocabMatch]] = {}
+
+    @classmethod
+    def from_file(cls, path: Path, max_ratio: float = 0.34) -> "Vocabulary":
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return cls([ln.split("#", 1)[0] for ln in lines], max_ratio)
+
+    def match(self, text: str) -> Optional[VocabMatch]:
+        key = normalize_name(text)
+        if not key:
+            return None
+        if key in self._memo:
+            return self._memo[key]
+        best = None
+        hits = self._tree.search(key, int(len(key) * self.max_ratio))
+        if hits:
+            d, word = hits[0]
+            best = VocabMatch(self.names[word], d, 1.0 - d / max(len(key), len(word)))
+        self._memo[key] = best
+        return best
+
+
+def crop_signature(img: np.ndarray) -> bytes:
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (96, 16), interpolation=cv2.INTER_AREA)
+    bits = small > small.mean()
+    return np.packbits(bits).tobytes()
+
+
+class NameSnapper:
+    def __init__(self, vocab: Vocabulary, min_score: float = 0.6, cache_min_score: float = 0.9) -> None:
+        self.vocab = vocab
+        self.min_score = min_score
+        self.cache_min_score = cache_min_score
+        self._signatures: Dict[bytes, OCRResult] = {}
+        self._lock = threading.Lock()
+        self.stats = {"snapped": 0, "exact": 0, "rejected": 0, "cache_hits": 0}
+
+    def lookup(self, img: np.ndarray) -> Optional[OCRResult]:
+        sig = crop_signature(img)
+        with self._lock:
+            hit = self._signatures.get(sig)
+            if hit is not None:
+                self.stats["cache_hits"] += 1
+            return hit
+
+    def snap(self, res: OCRResult, img: Optional[np.ndarray] = None) -> OCRResult:
+        if not res.text.strip():
+            return res
+        m = self.vocab.match(res.text)
+        with self._lock:
+            if m is None or m.score < self.min_score:
+                self.stats["rejected"] += 1
+                return OCRResult("", 0.0)
+            self.stats["exact" if m.distance == 0 else "snapped"] += 1
+            out = OCRResult(m.name, float(res.conf) * m.score)
+            if img is not None and m.score >= self.cache_min_score:
+                self._signatures[crop_signature(img)] = out
+            return out
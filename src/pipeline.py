@@ -1,20 +1,48 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import cv2
+import numpy as np
 
-from decode.ffmpeg_decode import DecodeConfig, iter_frames, sample_frames_with_capture, open_capture
+from checkpoint import Checkpoint, Checkpointer, fingerprint
+from columnar import ColumnarWriter
+from decode.ffmpeg_decode import (
+    DecodeConfig,
+    ThreadCaptures,
+    get_frame_at,
+    iter_frames,
+    open_capture,
+    sample_frames_with_capture,
+    video_duration,
+)
+from decode.index import load_or_build_index
+from decode.strips import StripCache, open_or_build_strips, strips_dir
 from detect.diff_trigger import DiffConfig, changed
-from ocr.engine import OCREngine
-from ocr.preprocess import sharpness_score
+from detect.ui_presence import UIPresenceConfig, UIPresenceDetector, find_game_start, find_gameplay_intervals
+from ocr.consensus import ConsensusConfig, decode_supply
+from ocr.engine import cache_root
+from ocr.fusion import FusionConfig, fuse_crops
+from ocr.glyph_cache import GlyphCache, profile_cache_path, reader_key
+from ocr.memo import OCRMemo
+from ocr.pool import OCREnginePool
+from ocr.preprocess import PreprocessConfig, sharpness_score
 from ocr.read_queue import read_queue
 from ocr.read_selection import read_selection
-from ocr.read_supply import read_supply
-from roi.crop import crop_roi
+from ocr.read_supply import SlashTracker, SupplyReadResult, finish_supply, preprocess_supply, read_supply, split_supply
+from ocr.vocab import NameSnapper, Vocabulary
+from roi.crop import ROITracker, ThreadTrackers
+from metrics import MetricsRegistry, TextfileExporter, default_registry, serve_http
+from stages import Stage, StagedRunner
+from timing import StageTimer, activate, timed, timed_iter
+from timing import active as timing_active
 
 
 @dataclass
@@ -31,184 +59,909 @@ class PipelineConfig:
     roi_samples: int = 10
     diff_threshold: float = 0.03
     ocr_engine: Optional[str] = None
+    skip_intro: bool = True
+    intro_min_conf: float = 0.6
+    skip_non_gameplay: bool = False
+    gameplay_scan_step_sec: float = 1.0
+    gameplay_min_gap_sec: float = 3.0
+    decode_to_profile: bool = True
+    decode_backend: str = "opencv"
+    timing: bool = True
+    metrics_textfile: Optional[str] = None
+    metrics_port: Optional[int] = None
+    metrics_interval_sec: float = 10.0
+    staged: bool = False
+    decode_workers: int = 2
+    preprocess_workers: int = 2
+    ocr_workers: int = 1
+    queue_depth: int = 8
+    ocr_pool_size: Optional[int] = None
+    ocr_warmup: bool = True
+    supply_ocr_engine: Optional[str] = None
+    vocab_path: Optional[str] = None
+    vocab_min_score: float = 0.6
+    glyph_cache: bool = False
+    glyph_cache_dir: Optional[str] = None
+    glyph_cache_distance: int = 8
+    fuse_frames: bool = False
+    fusion_method: str = "median"
+    fusion_denoise: bool = False
+    supply_consensus: bool = False
+    frame_index: bool = False
+    strip_cache: bool = False
+    strip_cache_dir: Optional[str] = None
+    checkpoint_every_sec: Optional[float] = None
+    resume: bool = False
+    columnar_dir: Optional[str] = None
+    video_id: Optional[str] = None
 
 
+@timed("evidence")
 def _save_evidence(img, path: Path) -> str:
     path.parent.mkdir(parents=True, exist_ok=True)
     cv2.imwrite(str(path), img)
     return str(path.as_posix())
 
 
-def run_pipeline(cfg: PipelineConfig) -> Dict:
-    ocr = OCREngine(cfg.ocr_engine)
-    profile_path = Path(cfg.profile_path)
-    templates_dir = _repo_root() / "a"
+SignalCallback = Callable[[str, Dict], None]
 
-    evidence_dir = Path(cfg.output_path).resolve().parent / "evidence"
-    evidence_dir.mkdir(parents=True, exist_ok=True)
+_CHECKPOINT_EXCLUDE = (
+    "resume",
+    "checkpoint_every_sec",
+    "metrics_textfile",
+    "metrics_port",
+    "metrics_interval_sec",
+    "timing",
+    "columnar_dir",
+    "video_id",
+)
+
+
+class PipelineCancelled(RuntimeError):
+    pass
+
+
+SupplyObs = Tuple[float, Dict[Tuple[int, int], Tuple[float, float]]]
+
+_OCR_STAT_KEYS = ("supply_parsed", "supply_total", "selection_nonempty", "selection_total", "queue_nonempty", "queue_total")
+
+
+@dataclass
+class _RunState:
+    ocr_stats: Dict[str, Any] = field(default_factory=lambda: dict.fromkeys(_OCR_STAT_KEYS, 0))
+    supply_series: List[Dict] = field(default_factory=list)
+    supply_obs: List[SupplyObs] = field(default_factory=list)
+    selection_changes: List[Dict] = field(default_factory=list)
+    queue_events: List[Dict] = field(default_factory=list)
+    events: List[Dict] = field(default_factory=list)
+    first_supply_time: Optional[float] = None
+    last_supply: Optional[Tuple[int, int]] = None
+    supply_idx: int = 0
+    roi_idx: int = 0
+    frames_decoded: int = 0
+    last_rois: Dict[str, np.ndarray] = field(default_factory=dict)
+    game_start: Optional[float] = None
+    intro_probes: int = 0
+    gameplay: Optional[Dict] = None
+
+    def dump(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        state = {
+            "game_start": self.game_start,
+            "intro_probes": self.intro_probes,
+            "gameplay": self.gameplay,
+            "first_supply_time": self.first_supply_time,
+            "last_supply": list(self.last_supply) if self.last_supply is not None else None,
+            "supply_idx": self.supply_idx,
+            "roi_idx": self.roi_idx,
+            "frames_decoded": self.frames_decoded,
+            "ocr_stats": self.ocr_stats,
+            "supply_series": self.supply_series,
+            "supply_obs": [[ot, [[u, tot, c, ct] for (u, tot), (c, ct) in obs.items()]] for ot, obs in self.supply_obs],
+            "selection_changes": self.selection_changes,
+            "queue_events": self.queue_events,
+            "events": self.events,
+        }
+        return state, {f"last_roi_{kind}": np.asarray(roi) for kind, roi in self.last_rois.items()}
+
+    @classmethod
+    def load(cls, state: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "_RunState":
+        return cls(
+            ocr_stats=dict(state["ocr_stats"]),
+            supply_series=state["supply_series"],
+            supply_obs=[(t, {(u, tot): (c, ct) for u, tot, c, ct in obs}) for t, obs in state["supply_obs"]],
+            selection_changes=state["selection_changes"],
+            queue_events=state["queue_events"],
+            events=state["events"],
+            first_supply_time=state["first_supply_time"],
+            last_supply=tuple(state["last_supply"]) if state["last_supply"] is not None else None,
+            supply_idx=state["supply_idx"],
+            roi_idx=state["roi_idx"],
+            frames_decoded=state["frames_decoded"],
+            last_rois={name[len("last_roi_") :]: arr for name, arr in arrays.items() if name.startswith("last_roi_")},
+            game_start=state["game_start"],
+            intro_probes=state["intro_probes"],
+            gameplay=state.get("gameplay"),
+        )
+
+
+@dataclass
+class _RunContext:
+    cfg: PipelineConfig
+    ocr: OCREnginePool
+    roi_tracker: ROITracker
+    templates_dir: Path
+    frame_size: Optional[Tuple[int, int]]
+    supply_ocr: Optional[OCREnginePool] = None
+    snapper: Optional[NameSnapper] = None
+    glyph_caches: Dict[str, GlyphCache] = field(default_factory=dict)
+    fusion: Optional[FusionConfig] = None
+    slash_tracker: SlashTracker = field(default_factory=SlashTracker)
+    ocr_limiter: Optional[threading.Semaphore] = None
+    cancel: Optional[threading.Event] = None
+    strips: Optional[StripCache] = None
+    decode_stats: Dict[str, int] = field(default_factory=dict)
+    state: _RunState = field(default_factory=_RunState)
+    registry: MetricsRegistry = field(default_factory=lambda: MetricsRegistry(enabled=False))
+    evidence_dir: Path = Path("evidence")
+    on_signal: Optional[SignalCallback] = None
+
+    def check_cancel(self) -> None:
+        if self.cancel is not None and self.cancel.is_set():
+            raise PipelineCancelled("pipeline run cancelled")
+
+    def release_captures(self, caps: List[Any]) -> None:
+        for cap in caps:
+            for key, value in getattr(cap, "stats", {}).items():
+                self.decode_stats[key] = self.decode_stats.get(key, 0) + value
+            cap.release()
+
+    def tracker_state(self) -> Dict[str, Any]:
+        slash = self.slash_tracker
+        return {
+            "slash_tracker": {
+                "loc": list(slash.loc) if slash.loc is not None else None,
+                "fast_attempts": slash.fast_attempts,
+                "fast_hits": slash.fast_hits,
+            },
+            "roi_tracker": self.roi_tracker.state(),
+        }
+
+    def checkpoint(
+        self, phase: str, t: float, trackers: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        # `trackers` is a snapshot taken right after tick t when staged workers have already moved the live trackers on.
+        state, arrays = self.state.dump()
+        state.update(
+            phase=phase,
+            t=t,
+            **(trackers if trackers is not None else self.tracker_state()),
+            snapper=dict(self.snapper.stats) if self.snapper is not None else None,
+            glyph_caches={kind: cache.dump() for kind, cache in self.glyph_caches.items()},
+            glyph_stats={kind: dict(cache.stats) for kind, cache in self.glyph_caches.items()},
+        )
+        return state, arrays
+
+    def restore(self, ckpt: Checkpoint) -> Tuple[str, float]:
+        st = ckpt.state
+        self.state = _RunState.load(st, ckpt.arrays)
+        slash = st["slash_tracker"]
+        self.slash_tracker.loc = tuple(slash["loc"]) if slash["loc"] is not None else None
+        self.slash_tracker.fast_attempts, self.slash_tracker.fast_hits = slash["fast_attempts"], slash["fast_hits"]
+        self.roi_tracker.restore(st["roi_tracker"])
+        if self.snapper is not None and st["snapper"] is not None:
+            self.snapper.stats.update(st["snapper"])
+        for kind, data in st["glyph_caches"].items():
+            self.glyph_caches[kind] = GlyphCache.from_data(data, self.cfg.glyph_cache_distance)
+            self.glyph_caches[kind].stats.update(st["glyph_stats"][kind])
+        return st["phase"], float(st["t"])
+
+
+@dataclass
+class _SupplyTick:
+    t: float
+    decoded: int
+    reads: List[Tuple[float, np.ndarray, SupplyReadResult]]
+    ocr_calls: int = 0
+    fused: Optional[bool] = None
+    trackers: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _RoiRead:
+    kind: str
+    idx: int
+    decoded: int
+    best: Optional[Dict[str, Any]] = None
+    res: Any = None
+    ocr_calls: int = 0
+    fused: Optional[bool] = None
+
+
+def _read_ocr(ctx: _RunContext, fn, pool: Optional[OCREnginePool] = None):
+    if ctx.ocr_limiter is not None:
+        ctx.ocr_limiter.acquire()
+    try:
+        with (pool or ctx.ocr).checkout() as engine:
+            before = engine.calls
+            res = fn(engine)
+            return res, engine.calls - before
+    finally:
+        if ctx.ocr_limiter is not None:
+            ctx.ocr_limiter.release()
+
+
+def _denoise_strength(ctx: _RunContext, fused: bool) -> int:
+    # Only a fused crop is clean enough to skip denoising; a window that fell back to one raw crop keeps it.
+    return 0 if fused and not ctx.cfg.fusion_denoise else PreprocessConfig.denoise_strength
+
+
+def _sample_window(ctx: _RunContext, cap: cv2.VideoCapture, t: float, window_sec: float, count: int) -> List[Tuple[float, Any]]:
+    if ctx.strips is not None:
+        return ctx.strips.sample(t, window_sec, count)
+    return sample_frames_with_capture(cap, t, window_sec, count, ctx.frame_size)
+
+
+def _crop(ctx: _RunContext, frame: Any, kind: str) -> Tuple[Optional[np.ndarray], float]:
+    # With a strip cache the "frames" are row numbers into the cached crops.
+    if ctx.strips is not None:
+        return ctx.strips.crop(kind, frame), ctx.strips.scale(ctx.roi_tracker.resolution)
+    return ctx.roi_tracker.crop(frame, kind), ctx.roi_tracker.scale_for(frame)[0]
+
+
+def _decoded(ctx: _RunContext, n: int) -> int:
+    return 0 if ctx.strips is not None else n
+
+
+def _gameplay_probe(ctx: _RunContext, cap: cv2.VideoCapture, detector: UIPresenceDetector) -> Callable[[float], bool]:
+    if ctx.strips is not None:
+
+        def probe(t: float) -> bool:
+            row = ctx.strips.row_at(t)
+            return row is not None and detector.present_roi(ctx.strips.crop("supply", row))
+
+        return probe
+    # The detector region is in profile coordinates, so probe at the profile resolution even when decoding natively.
+    return lambda t: detector.present(get_frame_at(cap, t, ctx.roi_tracker.resolution))
+
+
+def _in_gameplay(
+    make: Callable[[float, float], Iterator[Tuple[float, Any]]],
+    start: float,
+    end: float,
+    fps: float,
+    intervals: Optional[List[List[float]]],
+    margin: float = 0.0,
+) -> Iterator[Tuple[float, Any]]:
+    # Restart the fixed-rate iterator inside each interval, on the same tick grid as an unrestricted run.
+    # Edges where the UI appears/disappears are pulled in by `margin` so sampling windows stay inside.
+    if intervals is None:
+        yield from make(start, end)
+        return
+    step = 1.0 / fps
+    for s, e in intervals:
+        lo = max(start, s + margin) if s > start else start
+        hi = min(end, e - margin - 1e-6) if e < end else end
+        if hi < lo:
+            continue
+        yield from make(start + math.ceil((lo - start) / step - 1e-9) * step, hi)
+
+
+def _window_crops(
+    ctx: _RunContext, frames: List[Tuple[float, Any]], kind: str
+) -> Tuple[List[Tuple[float, np.ndarray, float]], Optional[bool]]:
+    # The flag is None without fusion, else whether this window was actually fused.
+    crops = []
+    for ct, frame in frames:
+        roi, scale = _crop(ctx, frame, kind)
+        if roi is not None:
+            crops.append((ct, roi, scale))
+    if ctx.fusion is None:
+        return crops, None
+    if len(crops) < 2:
+        return crops, False if crops else None
+    ct, fused, stacked = fuse_crops([(ct, roi) for ct, roi, _ in crops], ctx.fusion)
+    return [(ct, fused, crops[0][2])], stacked > 1
+
+
+def _supply_tick(ctx: _RunContext, cap: cv2.VideoCapture, t: float) -> _SupplyTick:
+    cfg = ctx.cfg
+    candidates = _sample_window(ctx, cap, t, cfg.supply_window_sec, cfg.supply_samples)
+    tick = _SupplyTick(t, _decoded(ctx, 1 + len(candidates)), [])
+    crops, tick.fused = _window_crops(ctx, candidates, "supply")
+    pre_cfg = PreprocessConfig(denoise_strength=_denoise_strength(ctx, bool(tick.fused)))
+    for ct, roi, template_scale in crops:
+        result, calls = _read_ocr(
+            ctx,
+            lambda ocr: read_supply(roi, ctx.templates_dir, ocr, ctx.slash_tracker, template_scale, pre_cfg),
+            ctx.supply_ocr,
+        )
+        tick.ocr_calls += calls
+        tick.reads.append((ct, roi, result))
+    return tick
+
+
+def _iter_supply_staged(
+    ctx: _RunContext, ticks: Iterator[float], stats: Dict, snapshot: bool = False
+) -> Iterator[_SupplyTick]:
+    cfg = ctx.cfg
+    captures = ThreadCaptures(cfg.video_path, cfg.frame_index)
+
+    def decode(t: float):
+        cap = captures.get()
+        return t, _sample_window(ctx, cap, t, cfg.supply_window_sec, cfg.supply_samples)
+
+    def track(item) -> _SupplyTick:
+        # Template crops and slash location advance ctx.roi_tracker / ctx.slash_tracker, so they run on one thread in tick order.
+        t, candidates = item
+        crops, fused = _window_crops(ctx, candidates, "supply")
+        splits = [(ct, roi, split_supply(roi, ctx.templates_dir, ctx.slash_tracker, scale)) for ct, roi, scale in crops]
+        trackers = ctx.tracker_state() if snapshot else None
+        return _SupplyTick(t, _decoded(ctx, 1 + len(candidates)), splits, fused=fused, trackers=trackers)
 
-    supply_series = []
-    selection_changes = []
-    queue_events = []
-    events = []
-    first_supply_time = None
-    ocr_stats = {
-        "supply_parsed": 0,
-        "supply_total": 0,
-        "selection_nonempty": 0,
-        "selection_total": 0,
-        "queue_nonempty": 0,
-        "queue_total": 0,
+    def prepare(tick: _SupplyTick) -> _SupplyTick:
+        pre_cfg = PreprocessConfig(denoise_strength=_denoise_strength(ctx, bool(tick.fused)))
+        raw = (ctx.supply_ocr or ctx.ocr).wants_raw
+        tick.reads = [(ct, roi, preprocess_supply(split, pre_cfg, raw)) for ct, roi, split in tick.reads]
+        return tick
+
+    def recognise(tick: _SupplyTick) -> _SupplyTick:
+        reads = []
+        for ct, roi, prepared in tick.reads:
+            result, calls = _read_ocr(ctx, partial(finish_supply, prepared), ctx.supply_ocr)
+            tick.ocr_calls += calls
+            reads.append((ct, roi, result))
+        tick.reads = reads
+        return tick
+
+    runner = StagedRunner(
+        ticks,
+        [
+            Stage("decode", decode, cfg.decode_workers),
+            Stage("track", track, 1, ordered=True),
+            Stage("preprocess", prepare, cfg.preprocess_workers),
+            Stage("ocr", recognise, cfg.ocr_workers),
+        ],
+        queue_depth=cfg.queue_depth,
+        timer=timing_active(),
+        source_name="ticks",
+    )
+    try:
+        yield from runner
+    finally:
+        ctx.release_captures(captures.captures())
+        captures.release()
+        stats["supply"] = runner.stats()
+
+
+def _frame_index_stats(ctx: _RunContext) -> Optional[Dict]:
+    if not ctx.cfg.frame_index:
+        return None
+    index = load_or_build_index(ctx.cfg.video_path)
+    return {
+        "source": index.source,
+        "frames": index.frame_count,
+        "keyframes": int(index.keyframes.size),
+        "built": index.built,
+        **ctx.decode_stats,
+    }
+
+
+def _strip_cache_stats(ctx: _RunContext) -> Optional[Dict]:
+    if ctx.strips is None:
+        return None
+    return {
+        "path": str(ctx.strips.path),
+        "frames": ctx.strips.frame_count,
+        "built": ctx.strips.built,
+        "rows_read": ctx.strips.rows_read,
     }
 
-    last_supply = None
-    supply_idx = 0
 
-    decode_cfg = DecodeConfig(fps=cfg.supply_fps, start_sec=cfg.start_sec, end_sec=cfg.end_sec)
-    cap = open_capture(cfg.video_path)
+def _roi_window(ctx: _RunContext, cap: cv2.VideoCapture, kind: str, idx: int, t: float) -> _RoiRead:
+    cfg = ctx.cfg
+    frames = _sample_window(ctx, cap, t, cfg.roi_window_sec, cfg.roi_samples)
+    read = _RoiRead(kind, idx, _decoded(ctx, len(frames)))
+    crops, read.fused = _window_crops(ctx, frames, kind)
+    for ct, roi, _ in crops:
+        sharp = sharpness_score(roi)
+        if read.best is None or sharp > read.best["sharp"]:
+            read.best = {"t": ct, "roi": roi, "sharp": sharp}
+    if read.best:
+        reader = read_selection if kind == "selection_panel" else read_queue
+        glyph_cache = ctx.glyph_caches.get(kind)
+        denoise_strength = _denoise_strength(ctx, bool(read.fused))
+        read.res, read.ocr_calls = _read_ocr(
+            ctx,
+            lambda ocr: reader(
+                read.best["roi"], ocr, snapper=ctx.snapper, glyph_cache=glyph_cache, denoise_strength=denoise_strength
+            ),
+        )
+    return read
+
+
+def _supply_consensus(supply_obs: List[Tuple[float, Dict[Tuple[int, int], Tuple[float, float]]]]) -> List[Dict]:
+    path = decode_supply([{v: c for v, (c, _) in obs.items()} for _, obs in supply_obs], ConsensusConfig())
+    series: List[Dict] = []
+    run_ticks = 0
+    for (t, obs), value in zip(supply_obs, path):
+        if value is None:
+            continue
+        if not series or (series[-1]["used"], series[-1]["total"]) != value:
+            if series:
+                series[-1]["support"] = round(series[-1]["support"] / run_ticks, 3)
+            series.append({"t": round(obs[value][1] if value in obs else t, 3), "used": value[0], "total": value[1], "support": 0})
+            run_ticks = 0
+        run_ticks += 1
+        if value in obs:
+            series[-1]["support"] += 1
+    if series:
+        series[-1]["support"] = round(series[-1]["support"] / run_ticks, 3)
+    return series
+
+
+def _supply_detector(roi_tracker: ROITracker, templates_dir: Path, presence_cfg: UIPresenceConfig) -> UIPresenceDetector | None:
+    tpl = cv2.imread(str(templates_dir / "supply_frame.png"), cv2.IMREAD_GRAYSCALE)
+    if tpl is None:
+        return None
+    region = None
+    roi = roi_tracker.rois.get("supply")
+    if roi is not None and roi.mode == "static":
+        region = (roi.x, roi.y, roi.w, roi.h)
+    return UIPresenceDetector(tpl, region, presence_cfg)
+
+
+def run_pipeline(
+    cfg: PipelineConfig,
+    cancel: Optional[threading.Event] = None,
+    on_signal: Optional[SignalCallback] = None,
+    ocr_limiter: Optional[threading.Semaphore] = None,
+    ocr_memo: Optional[OCRMemo] = None,
+) -> Dict:
+    exported = cfg.metrics_textfile is not None or cfg.metrics_port is not None
+    registry = default_registry() if exported else MetricsRegistry(enabled=False)
+    listener = None
+    if registry.enabled:
+        listener = lambda name, sec: registry.observe(  # noqa: E731
+            "stage_seconds", sec, {"stage": name}, "Per-stage latency of run_pipeline."
+        )
+    if cfg.metrics_port is not None:
+        serve_http(registry, cfg.metrics_port)
+    exporter = None
+    if cfg.metrics_textfile is not None:
+        exporter = TextfileExporter(registry, Path(cfg.metrics_textfile), cfg.metrics_interval_sec).start()
+
+    timer = StageTimer(enabled=cfg.timing or registry.enabled, listener=listener)
     try:
-        for t, _ in iter_frames(cfg.video_path, decode_cfg):
-            candidates = sample_frames_with_capture(cap, t, cfg.supply_window_sec, cfg.supply_samples)
-            best = None
-            for ct, frame in candidates:
-                roi = crop_roi(frame, profile_path, "supply")
-                if roi is None:
+        with activate(timer):
+            return _run_pipeline(cfg, timer, registry, cancel, on_signal, ocr_limiter, ocr_memo)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+
+def _write_evidence(ctx: _RunContext, img: np.ndarray, name: str) -> str:
+    path = ctx.evidence_dir / name
+    frame_path = _save_evidence(img, path)
+    if ctx.registry.enabled and path.exists():
+        ctx.registry.inc("evidence_bytes_total", path.stat().st_size, help_text="Evidence image bytes written.")
+    return frame_path
+
+
+def _signal(ctx: _RunContext, kind: str, entry: Dict) -> None:
+    if ctx.on_signal is not None:
+        ctx.on_signal(kind, entry)
+
+
+def _count_frames(ctx: _RunContext, n: int, phase: str) -> None:
+    ctx.state.frames_decoded += n
+    ctx.registry.inc("frames_decoded_total", n, {"phase": phase}, "Frames decoded by run_pipeline.")
+
+
+def _count_ocr(ctx: _RunContext, roi_name: str, calls: int) -> None:
+    engine = ctx.supply_ocr.name if roi_name == "supply" else ctx.ocr.name
+    ctx.registry.inc("ocr_calls_total", calls, {"engine": engine, "roi": roi_name}, "OCR engine calls.")
+
+
+def _count_fusion(ctx: _RunContext, fused: Optional[bool]) -> None:
+    if fused is not None:
+        ctx.state.ocr_stats["fusion_fused_windows" if fused else "fusion_fallback_windows"] += 1
+
+
+def _handle_supply_tick(ctx: _RunContext, tick: _SupplyTick) -> None:
+    st = ctx.state
+    _count_frames(ctx, tick.decoded, "supply")
+    _count_fusion(ctx, tick.fused)
+    _count_ocr(ctx, "supply", tick.ocr_calls)
+    ctx.registry.set("video_position_seconds", tick.t, {"phase": "supply"}, "Current position in the video.")
+    best = None
+    tick_obs: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    for ct, roi, result in tick.reads:
+        st.ocr_stats["supply_total"] += 1
+        if result.used is None or result.total is None:
+            continue
+        st.ocr_stats["supply_parsed"] += 1
+        value = (result.used, result.total)
+        if value not in tick_obs or result.conf > tick_obs[value][0]:
+            tick_obs[value] = (float(result.conf), float(ct))
+        if best is None or result.conf > best["conf"]:
+            best = {"t": ct, "roi": roi, "res": result, "conf": result.conf}
+    if ctx.cfg.supply_consensus:
+        st.supply_obs.append((tick.t, tick_obs))
+    if best is None:
+        return
+    current = (best["res"].used, best["res"].total)
+    if st.first_supply_time is None:
+        st.first_supply_time = float(best["t"])
+    if st.last_supply is None or current != st.last_supply:
+        st.supply_idx += 1
+        frame_path = _write_evidence(ctx, best["roi"], f"supply_{st.supply_idx:06d}.jpg")
+        st.supply_series.append(
+            {
+                "t": round(float(best["t"]), 3),
+                "used": best["res"].used,
+                "total": best["res"].total,
+                "raw_text": best["res"].raw_text,
+                "conf": round(float(best["res"].conf), 3),
+                "frame": frame_path,
+            }
+        )
+        _signal(ctx, "supply", st.supply_series[-1])
+        st.last_supply = current
+
+
+def _emit_roi(ctx: _RunContext, read: _RoiRead) -> None:
+    st = ctx.state
+    _count_frames(ctx, read.decoded, "roi")
+    _count_fusion(ctx, read.fused)
+    if not read.best:
+        return
+    _count_ocr(ctx, read.kind, read.ocr_calls)
+    best, res = read.best, read.res
+    if read.kind == "selection_panel":
+        frame_path = _write_evidence(ctx, best["roi"], f"sel_{read.idx:06d}.jpg")
+        st.ocr_stats["selection_total"] += 1
+        if res.selected_name.text or res.hp_text.text:
+            st.ocr_stats["selection_nonempty"] += 1
+        st.selection_changes.append(
+            {
+                "t": round(float(best["t"]), 3),
+                "frame": frame_path,
+                "ocr": {
+                    "selected_name": {"text": res.selected_name.text, "conf": round(float(res.selected_name.conf), 3)},
+                    "hp_text": {"text": res.hp_text.text, "conf": round(float(res.hp_text.conf), 3)},
+                },
+            }
+        )
+        _signal(ctx, "selection", st.selection_changes[-1])
+        return
+    frame_path = _write_evidence(ctx, best["roi"], f"q_{read.idx:06d}.jpg")
+    st.ocr_stats["queue_total"] += 1
+    if res.queue_text.text:
+        st.ocr_stats["queue_nonempty"] += 1
+    st.queue_events.append(
+        {
+            "t": round(float(best["t"]), 3),
+            "frame": frame_path,
+            "ocr": {"queue_text": {"text": res.queue_text.text, "conf": round(float(res.queue_text.conf), 3)}},
+        }
+    )
+    _signal(ctx, "queue", st.queue_events[-1])
+    if res.queue_text.text:
+        st.events.append(
+            {
+                "t": round(float(best["t"]), 3),
+                "id": f"{res.queue_text.text.strip().lower()}_started",
+                "count": 1,
+                "conf": round(float(res.queue_text.conf), 3),
+                "evidence": [frame_path],
+                "source": "queue_ocr",
+            }
+        )
+        _signal(ctx, "event", st.events[-1])
+
+
+def _find_gameplay(ctx: _RunContext, cap: cv2.VideoCapture, warnings: List[str]) -> None:
+    cfg, st = ctx.cfg, ctx.state
+    presence_cfg = UIPresenceConfig(
+        min_conf=cfg.intro_min_conf,
+        scan_step_sec=cfg.gameplay_scan_step_sec,
+        min_gap_sec=cfg.gameplay_min_gap_sec,
+    )
+    detector = _supply_detector(ctx.roi_tracker, ctx.templates_dir, presence_cfg)
+    if detector is None:
+        if cfg.skip_non_gameplay:
+            warnings.append("no supply_frame template; not skipping non-gameplay segments")
+        return
+    if not cfg.skip_non_gameplay:
+        st.game_start = find_game_start(cap, detector, cfg.start_sec, cfg.end_sec, ctx.roi_tracker.resolution)
+        st.intro_probes = detector.probes
+        return
+    duration = video_duration(cap)
+    scan_end = cfg.end_sec if duration is None else min(cfg.end_sec, duration - presence_cfg.tolerance_sec)
+    intervals = find_gameplay_intervals(_gameplay_probe(ctx, cap, detector), cfg.start_sec, scan_end, presence_cfg)
+    st.gameplay = {
+        "intervals": [[round(float(s), 3), round(float(e), 3)] for s, e in intervals],
+        "skipped_sec": round(max(0.0, scan_end - cfg.start_sec) - sum(e - s for s, e in intervals), 3),
+    }
+    if intervals and intervals[-1][1] >= scan_end:
+        st.gameplay["intervals"][-1][1] = cfg.end_sec
+    st.game_start = intervals[0][0] if intervals else None
+    if not intervals:
+        warnings.append("no gameplay found; every supply tick and ROI frame was skipped")
+    st.intro_probes = detector.probes
+
+
+def _iter_ticks(ctx: _RunContext, start: float, margin: float) -> Iterator[Tuple[float, Any]]:
+    # Fixed-rate (t, frame) pairs inside gameplay; with a strip cache the "frame" is a row number.
+    cfg = ctx.cfg
+    intervals = ctx.state.gameplay["intervals"] if ctx.state.gameplay is not None else None
+    if ctx.strips is not None:
+        return _in_gameplay(
+            lambda s, e: ctx.strips.iter_rows(s, e, cfg.supply_fps), start, cfg.end_sec, cfg.supply_fps, intervals, margin
+        )
+    decode_cfg = DecodeConfig(
+        fps=cfg.supply_fps,
+        start_sec=start,
+        end_sec=cfg.end_sec,
+        size=ctx.frame_size,
+        backend=cfg.decode_backend,
+        frame_index=cfg.frame_index,
+    )
+    frames = _in_gameplay(
+        lambda s, e: iter_frames(cfg.video_path, replace(decode_cfg, start_sec=s, end_sec=e)),
+        start,
+        cfg.end_sec,
+        cfg.supply_fps,
+        intervals,
+        margin,
+    )
+    return timed_iter(frames, "decode")
+
+
+def _run_supply(
+    ctx: _RunContext,
+    cap: cv2.VideoCapture,
+    ckpt: Optional[Checkpointer],
+    resume_at: Optional[Tuple[str, float]],
+    staged_stats: Dict[str, Dict],
+) -> None:
+    cfg = ctx.cfg
+    if resume_at is not None and resume_at[0] == "roi":
+        return
+    start = ctx.state.game_start if ctx.state.game_start is not None else cfg.start_sec
+    if resume_at is not None:
+        start = resume_at[1]
+    ticks = (t for t, _ in _iter_ticks(ctx, start, cfg.supply_window_sec / 2.0))
+    if resume_at is not None:
+        ticks = (t for t in ticks if t > resume_at[1])
+    if cfg.staged:
+        supply_ticks = _iter_supply_staged(ctx, ticks, staged_stats, snapshot=ckpt is not None)
+    else:
+        supply_ticks = (_supply_tick(ctx, cap, t) for t in ticks)
+    for tick in supply_ticks:
+        ctx.check_cancel()
+        _handle_supply_tick(ctx, tick)
+        if ckpt is not None and ckpt.due():
+            ckpt.save(*ctx.checkpoint("supply", tick.t, tick.trackers))
+
+
+def _run_roi(
+    ctx: _RunContext,
+    timer: StageTimer,
+    ckpt: Optional[Checkpointer],
+    resume_at: Optional[Tuple[str, float]],
+    staged_stats: Dict[str, Dict],
+) -> None:
+    cfg, st = ctx.cfg, ctx.state
+    roi_resume = resume_at[1] if resume_at is not None and resume_at[0] == "roi" else None
+    frames_iter = _iter_ticks(ctx, st.first_supply_time if roi_resume is None else roi_resume, cfg.roi_window_sec / 2.0)
+    if roi_resume is not None:
+        frames_iter = ((t, frame) for t, frame in frames_iter if t > roi_resume)
+    diff_cfg = DiffConfig(cfg.diff_threshold)
+    cap = open_capture(cfg.video_path, cfg.frame_index)
+    captures = ThreadCaptures(cfg.video_path, cfg.frame_index)
+    trackers = ThreadTrackers(ctx.roi_tracker)
+    pool = ThreadPoolExecutor(max_workers=max(1, cfg.decode_workers)) if cfg.staged else None
+    pending: List[Future] = []
+    runner = None
+    if cfg.staged:
+        runner = StagedRunner(frames_iter, [], queue_depth=cfg.queue_depth, timer=timer, source_name="decode")
+        frames_iter = iter(runner)
+
+    def window_job(kind: str, idx: int, t: float) -> _RoiRead:
+        # The main loop keeps cropping trigger frames with ctx.roi_tracker, so each pool thread tracks with its own copy.
+        with activate(timer):
+            return _roi_window(replace(ctx, roi_tracker=trackers.get()), captures.get(), kind, idx, t)
+
+    try:
+        for t, frame in frames_iter:
+            ctx.check_cancel()
+            _count_frames(ctx, _decoded(ctx, 1), "roi")
+            ctx.registry.set("video_position_seconds", t, {"phase": "roi"}, "Current position in the video.")
+            for kind in ("selection_panel", "production_queue"):
+                cur, _ = _crop(ctx, frame, kind)
+                if cur is None:
                     continue
-                result = read_supply(roi, templates_dir, ocr)
-                ocr_stats["supply_total"] += 1
-                if result.used is None or result.total is None:
+                last = st.last_rois.get(kind)
+                if last is not None and not changed(last, cur, diff_cfg):
                     continue
-                ocr_stats["supply_parsed"] += 1
-                if best is None or result.conf > best["conf"]:
-                    best = {"t": ct, "frame": frame, "roi": roi, "res": result, "conf": result.conf}
-            if best is None:
-                continue
-            current = (best["res"].used, best["res"].total)
-            if first_supply_time is None:
-                first_supply_time = float(best["t"])
-            if last_supply is None or current != last_supply:
-                supply_idx += 1
-                ev_path = evidence_dir / f"supply_{supply_idx:06d}.jpg"
-                frame_path = _save_evidence(best["roi"], ev_path)
-                supply_series.append(
-                    {
-                        "t": round(float(best["t"]), 3),
-                        "used": best["res"].used,
-                        "total": best["res"].total,
-                        "raw_text": best["res"].raw_text,
-                        "conf": round(float(best["res"].conf), 3),
-                        "frame": frame_path,
-                    }
-                )
-                last_supply = current
+                st.roi_idx += 1
+                ctx.registry.inc("triggers_total", 1, {"roi": kind}, "ROI change triggers.")
+                if pool is None:
+                    _emit_roi(ctx, _roi_window(ctx, cap, kind, st.roi_idx, t))
+                else:
+                    pending.append(pool.submit(window_job, kind, st.roi_idx, t))
+                st.last_rois[kind] = cur
+            while pending and pending[0].done():
+                _emit_roi(ctx, pending.pop(0).result())
+            if ckpt is not None and ckpt.due():
+                while pending:
+                    _emit_roi(ctx, pending.pop(0).result())
+                trackers.merge_stats()
+                ckpt.save(*ctx.checkpoint("roi", t))
+        for fut in pending:
+            ctx.check_cancel()
+            _emit_roi(ctx, fut.result())
     finally:
-        cap.release()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        ctx.release_captures([cap, *captures.captures()])
+        captures.release()
+        trackers.merge_stats()
+        if runner is not None:
+            staged_stats["roi"] = runner.stats()
 
-    if first_supply_time is None:
-        first_supply_time = cfg.start_sec
 
-    diff_cfg = DiffConfig(cfg.diff_threshold)
-    last_sel = None
-    last_queue = None
-    roi_idx = 0
+def _run_pipeline(
+    cfg: PipelineConfig,
+    timer: StageTimer,
+    registry: MetricsRegistry,
+    cancel: Optional[threading.Event],
+    on_signal: Optional[SignalCallback],
+    ocr_limiter: Optional[threading.Semaphore],
+    ocr_memo: Optional[OCRMemo],
+) -> Dict:
+    with timer.stage("ocr_init"):
+        ocr = OCREnginePool(cfg.ocr_engine, cfg.ocr_pool_size, cfg.ocr_warmup, ocr_memo)
+        supply_ocr = ocr
+        if cfg.supply_ocr_engine is not None:
+            supply_ocr = OCREnginePool(cfg.supply_ocr_engine, cfg.ocr_pool_size, cfg.ocr_warmup, ocr_memo)
+    for pool in {id(ocr): ocr, id(supply_ocr): supply_ocr}.values():
+        registry.set("ocr_init_seconds", pool.init_sec + pool.warmup_sec, {"engine": pool.name}, "OCR engine pool start-up time.")
+    profile_path = Path(cfg.profile_path)
+    roi_tracker = ROITracker(profile_path)
+    frame_size = roi_tracker.resolution if cfg.decode_to_profile else None
+    snapper = None
+    if cfg.vocab_path is not None:
+        snapper = NameSnapper(Vocabulary.from_file(Path(cfg.vocab_path)), cfg.vocab_min_score)
+    glyph_caches: Dict[str, GlyphCache] = {}
+    glyph_cache_paths: Dict[str, Path] = {}
+    reader = reader_key(ocr.name, cfg.vocab_path, cfg.vocab_min_score) if cfg.glyph_cache else None
+    for kind in ("selection_panel", "production_queue"):
+        if cfg.glyph_cache:
+            glyph_cache_paths[kind] = profile_cache_path(profile_path, kind, cfg.glyph_cache_dir, reader)
+            glyph_caches[kind] = GlyphCache.load(glyph_cache_paths[kind], cfg.glyph_cache_distance)
+        elif snapper is not None:
+            glyph_caches[kind] = GlyphCache(cfg.glyph_cache_distance)
+    evidence_dir = Path(cfg.output_path).resolve().parent / "evidence"
+    evidence_dir.mkdir(parents=True, exist_ok=True)
+    ctx = _RunContext(
+        cfg,
+        ocr,
+        roi_tracker,
+        _repo_root() / "a",
+        frame_size,
+        supply_ocr,
+        snapper,
+        glyph_caches,
+        FusionConfig(method=cfg.fusion_method) if cfg.fuse_frames else None,
+        ocr_limiter=ocr_limiter,
+        cancel=cancel,
+        registry=registry,
+        evidence_dir=evidence_dir,
+        on_signal=on_signal,
+    )
+    if cfg.fuse_frames:
+        ctx.state.ocr_stats.update(fusion_fused_windows=0, fusion_fallback_windows=0)
+    warnings: List[str] = []
+    if cfg.strip_cache:
+        kinds = [k for k in ("supply", "selection_panel", "production_queue") if k in roi_tracker.rois]
+        if all(roi_tracker.rois[k].mode == "static" for k in kinds if roi_tracker.rois[k].enabled):
+            cache_dir = Path(cfg.strip_cache_dir) if cfg.strip_cache_dir else cache_root() / "strips"
+            path = strips_dir(cfg.video_path, profile_path, frame_size, cache_dir)
+            ctx.strips = open_or_build_strips(cfg.video_path, path, roi_tracker.crop, kinds, frame_size)
+        else:
+            warnings.append("strip cache needs static ROIs; decoding frames instead")
+
+    ckpt = None
+    resume_at: Optional[Tuple[str, float]] = None
+    if cfg.checkpoint_every_sec is not None or cfg.resume:
+        stat = Path(cfg.video_path).stat()
+        key = fingerprint({**asdict(cfg), "video": [stat.st_size, stat.st_mtime_ns]}, _CHECKPOINT_EXCLUDE)
+        out = Path(cfg.output_path)
+        every = cfg.checkpoint_every_sec if cfg.checkpoint_every_sec is not None else 60.0
+        ckpt = Checkpointer(out.with_name(out.name + ".ckpt.npz"), key, every)
+        if cfg.resume:
+            resume = ckpt.load()
+            if resume is not None:
+                resume_at = ctx.restore(resume)
 
-    decode_cfg_roi = DecodeConfig(fps=cfg.supply_fps, start_sec=first_supply_time, end_sec=cfg.end_sec)
-    cap = open_capture(cfg.video_path)
+    staged_stats: Dict[str, Dict] = {}
+    cap = open_capture(cfg.video_path, cfg.frame_index)
     try:
-        for t, frame in iter_frames(cfg.video_path, decode_cfg_roi):
-            sel_roi = crop_roi(frame, profile_path, "selection_panel")
-            if sel_roi is not None:
-                if last_sel is None or changed(last_sel, sel_roi, diff_cfg):
-                    roi_idx += 1
-                    frames = sample_frames_with_capture(cap, t, cfg.roi_window_sec, cfg.roi_samples)
-                    best = None
-                    for ct, f in frames:
-                        roi = crop_roi(f, profile_path, "selection_panel")
-                        if roi is None:
-                            continue
-                        sharp = sharpness_score(roi)
-                        if best is None or sharp > best["sharp"]:
-                            best = {"t": ct, "roi": roi, "sharp": sharp}
-                    if best:
-                        res = read_selection(best["roi"], ocr)
-                        ev_path = evidence_dir / f"sel_{roi_idx:06d}.jpg"
-                        frame_path = _save_evidence(best["roi"], ev_path)
-                        ocr_stats["selection_total"] += 1
-                        if res.selected_name.text or res.hp_text.text:
-                            ocr_stats["selection_nonempty"] += 1
-                        selection_changes.append(
-                            {
-                                "t": round(float(best["t"]), 3),
-                                "frame": frame_path,
-                                "ocr": {
-                                    "selected_name": {"text": res.selected_name.text, "conf": round(float(res.selected_name.conf), 3)},
-                                    "hp_text": {"text": res.hp_text.text, "conf": round(float(res.hp_text.conf), 3)},
-                                },
-                            }
-                        )
-                    last_sel = sel_roi
-
-            queue_roi = crop_roi(frame, profile_path, "production_queue")
-            if queue_roi is not None:
-                if last_queue is None or changed(last_queue, queue_roi, diff_cfg):
-                    roi_idx += 1
-                    frames = sample_frames_with_capture(cap, t, cfg.roi_window_sec, cfg.roi_samples)
-                    best = None
-                    for ct, f in frames:
-                        roi = crop_roi(f, profile_path, "production_queue")
-                        if roi is None:
-                            continue
-                        sharp = sharpness_score(roi)
-                        if best is None or sharp > best["sharp"]:
-                            best = {"t": ct, "roi": roi, "sharp": sharp}
-                    if best:
-                        res = read_queue(best["roi"], ocr)
-                        ev_path = evidence_dir / f"q_{roi_idx:06d}.jpg"
-                        frame_path = _save_evidence(best["roi"], ev_path)
-                        ocr_stats["queue_total"] += 1
-                        if res.queue_text.text:
-                            ocr_stats["queue_nonempty"] += 1
-                        queue_events.append(
-                            {
-                                "t": round(float(best["t"]), 3),
-                                "frame": frame_path,
-                                "ocr": {"queue_text": {"text": res.queue_text.text, "conf": round(float(res.queue_text.conf), 3)}},
-                            }
-                        )
-                        if res.queue_text.text:
-                            events.append(
-                                {
-                                    "t": round(float(best["t"]), 3),
-                                    "id": f"{res.queue_text.text.strip().lower()}_started",
-                                    "count": 1,
-                                    "conf": round(float(res.queue_text.conf), 3),
-                                    "evidence": [frame_path],
-                                    "source": "queue_ocr",
-                                }
-                            )
-                    last_queue = queue_roi
+        if (cfg.skip_intro or cfg.skip_non_gameplay) and resume_at is None:
+            _find_gameplay(ctx, cap, warnings)
+        _run_supply(ctx, cap, ckpt, resume_at, staged_stats)
     finally:
-        cap.release()
+        ctx.release_captures([cap])
+
+    st = ctx.state
+    supply_consensus = _supply_consensus(st.supply_obs) if cfg.supply_consensus else None
+    slash_tracker = ctx.slash_tracker
+    st.ocr_stats["supply_slash_fast_attempts"] = slash_tracker.fast_attempts
+    st.ocr_stats["supply_slash_fast_hits"] = slash_tracker.fast_hits
+    st.ocr_stats["supply_slash_fast_hit_rate"] = round(slash_tracker.hit_rate, 3)
+    registry.inc("cache_hits_total", slash_tracker.fast_hits, {"cache": "slash_window"}, "Fast-path cache hits.")
+    if st.first_supply_time is None:
+        st.first_supply_time = cfg.start_sec
+
+    _run_roi(ctx, timer, ckpt, resume_at, staged_stats)
+
+    registry.inc("cache_hits_total", roi_tracker.stats["local_hits"], {"cache": "roi_tracker"}, "Fast-path cache hits.")
+    for kind, cache in glyph_caches.items():
+        registry.inc("cache_hits_total", cache.stats["hits"], {"cache": f"glyph_{kind}"}, "Fast-path cache hits.")
+        if kind in glyph_cache_paths:
+            cache.save(glyph_cache_paths[kind])
+    registry.inc("videos_total", 1, help_text="Videos processed by run_pipeline.")
 
     output = {
         "version": 1,
         "segment": {"start_sec": cfg.start_sec, "end_sec": cfg.end_sec},
         "roi_profile": Path(cfg.profile_path).name.replace(".json", ""),
         "signals": {
-            "supply_series": supply_series,
-            "selection_changes": selection_changes,
-            "queue_events": queue_events,
+            "supply_series": st.supply_series,
+            "selection_changes": st.selection_changes,
+            "queue_events": st.queue_events,
         },
-        "events": events,
+        "events": st.events,
         "diagnostics": {
-            "warnings": [],
+            "warnings": warnings,
             "ocr_engine": ocr.name,
+            "supply_ocr_engine": supply_ocr.name,
             "preprocess": "upscale3x+adaptive_threshold",
-            "ocr_stats": ocr_stats,
+            "ocr_stats": st.ocr_stats,
+            "ocr_pool": ocr.stats(),
+            "supply_ocr_pool": supply_ocr.stats() if supply_ocr is not ocr else None,
+            "roi_tracking": dict(roi_tracker.stats),
+            "vocab": dict(snapper.stats) if snapper is not None else None,
+            "glyph_cache": {kind: dict(cache.stats, entries=len(cache.entries)) for kind, cache in glyph_caches.items()},
+            "ocr_memo": dict(ocr_memo.stats, entries=len(ocr_memo)) if ocr_memo is not None else None,
+            "game_start_sec": None if st.game_start is None else round(float(st.game_start), 3),
+            "intro_probes": st.intro_probes,
+            "gameplay": st.gameplay,
+            "frames_decoded": st.frames_decoded,
+            "frame_index": _frame_index_stats(ctx),
+            "checkpoint": None
+            if ckpt is None
+            else {
+                "saves": ckpt.saves,
+                "resumed_from": None if resume_at is None else {"phase": resume_at[0], "t": resume_at[1]},
+            },
+            "strip_cache": _strip_cache_stats(ctx),
+            "timing": timer.summary() if cfg.timing else {"enabled": False},
         },
     }
 
+    if cfg.staged:
+        output["diagnostics"]["staged"] = staged_stats
+    if supply_consensus is not None:
+        output["signals"]["supply_series_consensus"] = supply_consensus
+
     Path(cfg.output_path).write_text(json.dumps(output, indent=2), encoding="utf-8")
+    if cfg.columnar_dir:
+        ColumnarWriter(Path(cfg.columnar_dir)).append([(cfg.video_id or Path(cfg.video_path).stem, output)])
+    if ckpt is not None:
+        ckpt.clear()
     return output
 
 
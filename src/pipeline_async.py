@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from pipeline import PipelineCancelled, PipelineConfig, SignalCallback, run_pipeline
+
+_DONE = object()
+
+
+async def run_pipeline_async(
+    cfg: PipelineConfig,
+    ocr_limiter: Optional[threading.Semaphore] = None,
+    on_signal: Optional[SignalCallback] = None,
+    executor: Optional[Executor] = None,
+) -> Dict:
+    loop = asyncio.get_running_loop()
+    cancel = threading.Event()
+    fut = loop.run_in_executor(
+        executor,
+        partial(run_pipeline, cfg, cancel=cancel, on_signal=on_signal, ocr_limiter=ocr_limiter),
+    )
+    try:
+        return await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        cancel.set()
+        # Wait for the worker thread to unwind so captures and exporters are released.
+        with contextlib.suppress(PipelineCancelled):
+            await fut
+        raise
+
+
+async def iter_signals(
+    cfg: PipelineConfig,
+    ocr_limiter: Optional[threading.Semaphore] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Tuple[str, Dict]]:
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_signal(kind: str, entry: Dict) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, (kind, entry))
+
+    task = asyncio.ensure_future(run_pipeline_async(cfg, ocr_limiter, on_signal, executor))
+    task.add_done_callback(lambda _: queue.put_nowait(_DONE))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+async def run_many(
+    cfgs: Sequence[PipelineConfig],
+    max_videos: int = 4,
+    ocr_concurrency: int = 2,
+) -> List[Dict | BaseException]:
+    ocr_limiter = threading.BoundedSemaphore(max(1, ocr_concurrency))
+    videos = asyncio.Semaphore(max(1, max_videos))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_videos), thread_name_prefix="video") as executor:
+
+        async def one(cfg: PipelineConfig) -> Dict:
+            async with videos:
+                return await run_pipeline_async(cfg, ocr_limiter, executor=executor)
+
+        return await asyncio.gather(*(one(cfg) for cfg in cfgs), return_exceptions=True)
@@ -2,16 +2,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Tuple, Optional
 
 import cv2
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def _match_template(img, template) -> Tuple[int, int]:
-    res = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
-    _, _, _, max_loc = cv2.minMaxLoc(res)
-    return max_loc
+from decode.ffmpeg_decode import resize_frame  # noqa: E402
+from roi.match import pyramid_match  # noqa: E402
 
 
 def _read_frame(video_path: str, t_sec: float):
@@ -42,6 +42,21 @@ def _parse_rect(s: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
     return tuple(int(p) for p in parts)  # type: ignore
 
 
+def _parse_size(s: str) -> Tuple[int, int]:
+    w, h = s.lower().split("x")
+    return int(w), int(h)
+
+
+def _normalized(rect: Tuple[int, int, int, int], ref_w: int, ref_h: int) -> dict:
+    x, y, w, h = rect
+    return {
+        "x": round(x / ref_w, 6),
+        "y": round(y / ref_h, 6),
+        "w": round(w / ref_w, 6),
+        "h": round(h / ref_h, 6),
+    }
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Calibrate ROI profile for 480p.")
     parser.add_argument("video", help="Input video path")
@@ -51,9 +66,11 @@ def main() -> None:
     parser.add_argument("--sel", help="Selection ROI as x,y,w,h (skip GUI)")
     parser.add_argument("--queue", help="Queue ROI as x,y,w,h (skip GUI)")
     parser.add_argument("--dump-frame", help="Save the sampled frame to this path")
+    parser.add_argument("--reference", default="854x480", help="Reference resolution WxH the frame is scaled to")
     args = parser.parse_args()
 
-    frame = _read_frame(args.video, args.time)
+    ref_w, ref_h = _parse_size(args.reference)
+    frame = resize_frame(_read_frame(args.video, args.time), (ref_w, ref_h))
     if args.dump_frame:
         Path(args.dump_frame).parent.mkdir(parents=True, exist_ok=True)
         cv2.imwrite(args.dump_frame, frame)
@@ -62,7 +79,7 @@ def main() -> None:
     if tpl is None:
         raise RuntimeError("Supply template not found")
 
-    sx, sy = _match_template(gray, tpl)
+    (sx, sy), _ = pyramid_match(gray, tpl)
     sh, sw = tpl.shape[:2]
 
     sel = _parse_rect(args.sel)
@@ -78,31 +95,23 @@ def main() -> None:
         cv2.destroyAllWindows()
 
     profile = {
-        "resolution": [int(frame.shape[1]), int(frame.shape[0])],
+        "resolution": [ref_w, ref_h],
+        "units": "normalized",
         "rois": {
             "supply": {
                 "mode": "static",
-                "x": int(sx),
-                "y": int(sy),
-                "w": int(sw),
-                "h": int(sh),
+                **_normalized((sx, sy, sw, sh), ref_w, ref_h),
                 "template_min_conf": 0.8,
                 "enabled": True,
             },
             "selection_panel": {
                 "mode": "static",
-                "x": int(sel[0]),  # type: ignore[index]
-                "y": int(sel[1]),  # type: ignore[index]
-                "w": int(sel[2]),  # type: ignore[index]
-                "h": int(sel[3]),  # type: ignore[index]
+                **_normalized(sel, ref_w, ref_h),  # type: ignore[arg-type]
                 "enabled": True,
             },
             "production_queue": {
                 "mode": "static",
-                "x": int(queue[0]),  # type: ignore[index]
-                "y": int(queue[1]),  # type: ignore[index]
-                "w": int(queue[2]),  # type: ignore[index]
-                "h": int(queue[3]),  # type: ignore[index]
+                **_normalized(queue, ref_w, ref_h),  # type: ignore[arg-type]
                 "enabled": True,
             },
         },
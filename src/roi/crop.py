@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from timing import timed
+
+from .match import load_template, match_template, pyramid_match
+
 
 @dataclass
 class ROIDefinition:
@@ -24,14 +29,16 @@ class ROIDefinition:
 
 def _load_profile(path: Path) -> Dict[str, ROIDefinition]:
     data = json.loads(path.read_text(encoding="utf-8"))
+    normalized = data.get("units") == "normalized"
+    ref_w, ref_h = data.get("resolution", [1, 1]) if normalized else (1, 1)
     rois = {}
     for key, val in data.get("rois", {}).items():
         rois[key] = ROIDefinition(
             mode=val.get("mode", "static"),
-            x=val.get("x", 0),
-            y=val.get("y", 0),
-            w=val.get("w", 0),
-            h=val.get("h", 0),
+            x=int(round(val.get("x", 0) * ref_w)),
+            y=int(round(val.get("y", 0) * ref_h)),
+            w=int(round(val.get("w", 0) * ref_w)),
+            h=int(round(val.get("h", 0) * ref_h)),
             template=val.get("template"),
             template_min_conf=float(val.get("template_min_conf", 0.8)),
             padding=tuple(val.get("padding", [0, 0, 0, 0])),
@@ -40,12 +47,45 @@ def _load_profile(path: Path) -> Dict[str, ROIDefinition]:
     return rois
 
 
-def _match_template(img: np.ndarray, template: np.ndarray) -> Tuple[Tuple[int, int], float]:
-    res = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(res)
-    return max_loc, float(max_val)
+def load_profile_resolution(path: Path) -> Optional[Tuple[int, int]]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    res = data.get("resolution")
+    if not res or len(res) != 2:
+        return None
+    return int(res[0]), int(res[1])
+
+
+def _load_template(profile_path: Path, roi: ROIDefinition, scale: float = 1.0) -> np.ndarray | None:
+    if not roi.template:
+        return None
+    tpl_path = (profile_path.parent / roi.template).resolve()
+    if not tpl_path.exists():
+        return None
+    return load_template(str(tpl_path), scale)
+
 
+def _to_gray(img: np.ndarray) -> np.ndarray:
+    return img if len(img.shape) == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
+
+def _padded_crop(
+    frame: np.ndarray,
+    roi: ROIDefinition,
+    x: int,
+    y: int,
+    w: int,
+    h: int,
+    scale: float = 1.0,
+) -> np.ndarray:
+    pad_l, pad_t, pad_r, pad_b = [int(round(p * scale)) for p in roi.padding]
+    x0 = max(0, x - pad_l)
+    y0 = max(0, y - pad_t)
+    x1 = min(frame.shape[1], x + w + pad_r)
+    y1 = min(frame.shape[0], y + h + pad_b)
+    return frame[y0:y1, x0:x1]
+
+
+@timed("crop_roi")
 def crop_roi(frame: np.ndarray, profile_path: Path, name: str) -> np.ndarray | None:
     rois = _load_profile(profile_path)
     if name not in rois:
@@ -56,19 +96,133 @@ def crop_roi(frame: np.ndarray, profile_path: Path, name: str) -> np.ndarray | N
     if roi.mode == "static":
         return frame[roi.y : roi.y + roi.h, roi.x : roi.x + roi.w]
     if roi.mode == "template" and roi.template:
-        tpl_path = (profile_path.parent / roi.template).resolve()
-        if not tpl_path.exists():
+        tpl = _load_template(profile_path, roi)
+        if tpl is None:
             return None
-        tpl = cv2.imread(str(tpl_path), cv2.IMREAD_GRAYSCALE)
-        gray = frame if len(frame.shape) == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        (x, y), conf = _match_template(gray, tpl)
+        (x, y), conf = pyramid_match(_to_gray(frame), tpl)
         if conf < roi.template_min_conf:
             return None
         h, w = tpl.shape[:2]
-        pad_l, pad_t, pad_r, pad_b = roi.padding
-        x0 = max(0, x - pad_l)
-        y0 = max(0, y - pad_t)
-        x1 = min(frame.shape[1], x + w + pad_r)
-        y1 = min(frame.shape[0], y + h + pad_b)
-        return frame[y0:y1, x0:x1]
+        return _padded_crop(frame, roi, x, y, w, h)
     return None
+
+
+class ROITracker:
+    def __init__(self, profile_path: Path, search_margin: int = 8, full_search_every: int = 50) -> None:
+        self.profile_path = Path(profile_path)
+        self.rois = _load_profile(self.profile_path)
+        self.resolution = load_profile_resolution(self.profile_path)
+        self.search_margin = search_margin
+        self.full_search_every = full_search_every
+        self._templates: Dict[Tuple[str, float], np.ndarray | None] = {}
+        self._last: Dict[str, Tuple[int, int]] = {}
+        self._since_full: Dict[str, int] = {}
+        self.stats = {"full_searches": 0, "local_hits": 0, "local_misses": 0}
+
+    def state(self) -> Dict:
+        return {
+            "last": {k: list(v) for k, v in self._last.items()},
+            "since_full": dict(self._since_full),
+            "stats": dict(self.stats),
+        }
+
+    def restore(self, state: Dict) -> None:
+        self._last = {k: (int(v[0]), int(v[1])) for k, v in state.get("last", {}).items()}
+        self._since_full = {k: int(v) for k, v in state.get("since_full", {}).items()}
+        self.stats.update(state.get("stats", {}))
+
+    def scale_for(self, frame: np.ndarray) -> Tuple[float, float]:
+        if self.resolution is None:
+            return 1.0, 1.0
+        ref_w, ref_h = self.resolution
+        return frame.shape[1] / ref_w, frame.shape[0] / ref_h
+
+    def _template(self, name: str, roi: ROIDefinition, scale: float) -> np.ndarray | None:
+        key = (name, round(scale, 4))
+        if key not in self._templates:
+            self._templates[key] = _load_template(self.profile_path, roi, key[1])
+        return self._templates[key]
+
+    def _local_match(self, frame: np.ndarray, tpl: np.ndarray, last: Tuple[int, int]) -> Tuple[Tuple[int, int], float]:
+        th, tw = tpl.shape[:2]
+        lx, ly = last
+        m = self.search_margin
+        x0 = max(0, lx - m)
+        y0 = max(0, ly - m)
+        x1 = min(frame.shape[1], lx + tw + m)
+        y1 = min(frame.shape[0], ly + th + m)
+        if y1 - y0 < th or x1 - x0 < tw:
+            return last, -1.0
+        (wx, wy), conf = match_template(_to_gray(frame[y0:y1, x0:x1]), tpl)
+        return (x0 + wx, y0 + wy), conf
+
+    @timed("template_match")
+    def _locate(self, frame: np.ndarray, name: str, roi: ROIDefinition, tpl: np.ndarray) -> Tuple[int, int] | None:
+        last = self._last.get(name)
+        since = self._since_full.get(name, 0)
+        if last is not None and since < self.full_search_every:
+            loc, conf = self._local_match(frame, tpl, last)
+            if conf >= roi.template_min_conf:
+                self.stats["local_hits"] += 1
+                self._last[name] = loc
+                self._since_full[name] = since + 1
+                return loc
+            self.stats["local_misses"] += 1
+
+        self.stats["full_searches"] += 1
+        self._since_full[name] = 0
+        loc, conf = pyramid_match(_to_gray(frame), tpl)
+        if conf < roi.template_min_conf:
+            self._last.pop(name, None)
+            return None
+        self._last[name] = loc
+        return loc
+
+    @timed("crop_roi")
+    def crop(self, frame: np.ndarray, name: str) -> np.ndarray | None:
+        roi = self.rois.get(name)
+        if roi is None or not roi.enabled:
+            return None
+        sx, sy = self.scale_for(frame)
+        if roi.mode == "static":
+            if sx == 1.0 and sy == 1.0:
+                return frame[roi.y : roi.y + roi.h, roi.x : roi.x + roi.w]
+            x0 = int(round(roi.x * sx))
+            y0 = int(round(roi.y * sy))
+            x1 = int(round((roi.x + roi.w) * sx))
+            y1 = int(round((roi.y + roi.h) * sy))
+            return frame[y0:y1, x0:x1]
+        if roi.mode == "template" and roi.template:
+            tpl = self._template(name, roi, sx)
+            if tpl is None:
+                return None
+            loc = self._locate(frame, name, roi, tpl)
+            if loc is None:
+                return None
+            h, w = tpl.shape[:2]
+            return _padded_crop(frame, roi, loc[0], loc[1], w, h, sx)
+        return None
+
+
+class ThreadTrackers:
+    def __init__(self, base: ROITracker) -> None:
+        self.base = base
+        self._local = threading.local()
+        self._trackers: List[ROITracker] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> ROITracker:
+        tracker = getattr(self._local, "tracker", None)
+        if tracker is None:
+            tracker = ROITracker(self.base.profile_path, self.base.search_margin, self.base.full_search_every)
+            self._local.tracker = tracker
+            with self._lock:
+                self._trackers.append(tracker)
+        return tracker
+
+    def merge_stats(self) -> None:
+        with self._lock:
+            for tracker in self._trackers:
+                for key, value in tracker.stats.items():
+                    self.base.stats[key] += value
+                tracker.stats = dict.fromkeys(tracker.stats, 0)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=128)
+def load_template(path: str, scale: float = 1.0) -> np.ndarray | None:
+    tpl = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if tpl is None or scale == 1.0:
+        return tpl
+    h, w = tpl.shape[:2]
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(tpl, size, interpolation=interp)
+
+
+def match_template(img: np.ndarray, template: np.ndarray) -> Tuple[Tuple[int, int], float]:
+    res = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return max_loc, float(max_val)
+
+
+def pyramid_levels(template: np.ndarray, max_levels: int = 3, min_side: int = 8) -> int:
+    levels = 0
+    h, w = template.shape[:2]
+    while levels < max_levels and min(h, w) // 2 >= min_side:
+        h //= 2
+        w //= 2
+        levels += 1
+    return levels
+
+
+def pyramid_match(
+    img: np.ndarray,
+    template: np.ndarray,
+    max_levels: int = 3,
+    min_side: int = 8,
+    refine_margin: int = 2,
+) -> Tuple[Tuple[int, int], float]:
+    th, tw = template.shape[:2]
+    if img.shape[0] < th or img.shape[1] < tw:
+        return (0, 0), -1.0
+    levels = pyramid_levels(template, max_levels, min_side)
+    if levels == 0:
+        return match_template(img, template)
+
+    small_img = img
+    small_tpl = template
+    for _ in range(levels):
+        small_img = cv2.pyrDown(small_img)
+        small_tpl = cv2.pyrDown(small_tpl)
+    if small_img.shape[0] < small_tpl.shape[0] or small_img.shape[1] < small_tpl.shape[1]:
+        return match_template(img, template)
+
+    (cx, cy), _ = match_template(small_img, small_tpl)
+    scale = 1 << levels
+    m = scale + refine_margin
+    x0 = max(0, cx * scale - m)
+    y0 = max(0, cy * scale - m)
+    x1 = min(img.shape[1], cx * scale + tw + m)
+    y1 = min(img.shape[0], cy * scale + th + m)
+    (rx, ry), conf = match_template(img[y0:y1, x0:x1], template)
+    return (x0 + rx, y0 + ry), conf
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from timing import StageTimer, activate
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    ordered: bool = False
+
+
+class _Failure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class _Queue:
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        self.q: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+        self.samples = 0
+        self.depth_sum = 0
+        self.depth_max = 0
+
+    def put(self, item: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                self.q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            depth = self.q.qsize()
+            self.samples += 1
+            self.depth_sum += depth
+            self.depth_max = max(self.depth_max, depth)
+            return True
+        return False
+
+    def get(self, stop: threading.Event) -> Any:
+        while not stop.is_set():
+            try:
+                return self.q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def stats(self) -> Dict:
+        return {
+            "capacity": self.q.maxsize,
+            "max_depth": self.depth_max,
+            "mean_depth": round(self.depth_sum / self.samples, 3) if self.samples else 0.0,
+        }
+
+
+class StagedRunner:
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: List[Stage],
+        queue_depth: int = 8,
+        timer: Optional[StageTimer] = None,
+        source_name: str = "source",
+    ) -> None:
+        for stage in stages:
+            if stage.ordered and stage.workers != 1:
+                raise ValueError(f"Ordered stage {stage.name} must have exactly one worker")
+        self.source = source
+        self.stages = stages
+        self.timer = timer
+        self.source_name = source_name
+        self.queues = [_Queue(source_name if i == 0 else stages[i - 1].name, queue_depth) for i in range(len(stages) + 1)]
+        self._stop = threading.Event()
+        self._busy: Dict[str, float] = {source_name: 0.0, **{s.name: 0.0 for s in stages}}
+        self._busy_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._started = 0.0
+        self._wall = 0.0
+
+    def _add_busy(self, name: str, seconds: float) -> None:
+        with self._busy_lock:
+            self._busy[name] += seconds
+
+    def _run_source(self) -> None:
+        out = self.queues[0]
+        with activate(self.timer):
+            try:
+                it = iter(self.source)
+                seq = 0
+                while not self._stop.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        break
+                    self._add_busy(self.source_name, time.perf_counter() - t0)
+                    if not out.put((seq, item), self._stop):
+                        return
+                    seq += 1
+            except BaseException as exc:  # noqa: BLE001
+                out.put((-1, _Failure(exc)), self._stop)
+            finally:
+                close = getattr(self.source, "close", None)
+                if close is not None:
+                    close()
+            for _ in range(self.stages[0].workers if self.stages else 1):
+                out.put(_DONE, self._stop)
+
+    def _apply(self, stage: Stage, seq: int, item: Any, outq: _Queue) -> bool:
+        if not isinstance(item, _Failure):
+            t0 = time.perf_counter()
+            try:
+                item = stage.fn(item)
+            except BaseException as exc:  # noqa: BLE001
+                item = _Failure(exc)
+            self._add_busy(stage.name, time.perf_counter() - t0)
+        return outq.put((seq, item), self._stop)
+
+    def _run_stage(self, idx: int, remaining: List[int], lock: threading.Lock) -> None:
+        stage = self.stages[idx]
+        inq, outq = self.queues[idx], self.queues[idx + 1]
+        next_workers = self.stages[idx + 1].workers if idx + 1 < len(self.stages) else 1
+        # An ordered stage sees items in source order even when a parallel stage upstream finishes them out of order.
+        held: Dict[int, Any] = {}
+        next_seq = 0
+        with activate(self.timer):
+            while True:
+                msg = inq.get(self._stop)
+                if msg is _DONE:
+                    break
+                seq, item = msg
+                if not stage.ordered or seq < 0:
+                    if not self._apply(stage, seq, item, outq):
+                        return
+                    continue
+                held[seq] = item
+                while next_seq in held:
+                    if not self._apply(stage, next_seq, held.pop(next_seq), outq):
+                        return
+                    next_seq += 1
+            for seq in sorted(held):
+                if not self._apply(stage, seq, held.pop(seq), outq):
+                    return
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                outq.put(_DONE, self._stop)
+
+    def _start(self) -> None:
+        self._started = time.perf_counter()
+        threads = [threading.Thread(target=self._run_source, name=f"stage-{self.source_name}", daemon=True)]
+        for idx, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for w in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._run_stage,
+                        args=(idx, remaining, lock),
+                        name=f"stage-{stage.name}-{w}",
+                        daemon=True,
+                    )
+                )
+        self._threads = threads
+        for th in threads:
+            th.start()
+
+    def __iter__(self) -> Iterator[Any]:
+        self._start()
+        pending: Dict[int, Any] = {}
+        next_seq = 0
+        final = self.queues[-1]
+        try:
+            while True:
+                msg = final.get(self._stop)
+                if msg is _DONE:
+                    break
+                seq, item = msg
+                if isinstance(item, _Failure):
+                    raise item.exc
+                pending[seq] = item
+                while next_seq in pending:
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+            for seq in sorted(pending):
+                yield pending.pop(seq)
+        finally:
+            self._wall = time.perf_counter() - self._started
+            self._stop.set()
+            for th in self._threads:
+                th.join()
+
+    def stats(self) -> Dict:
+        wall = self._wall or (time.perf_counter() - self._started if self._started else 0.0)
+        workers = {self.source_name: 1, **{s.name: s.workers for s in self.stages}}
+        stages = {}
+        for name, busy in self._busy.items():
+            capacity = wall * workers[name]
+            stages[name] = {
+                "workers": workers[name],
+                "busy_sec": round(busy, 4),
+                "utilisation": round(busy / capacity, 3) if capacity > 0 else 0.0,
+            }
+        return {
+            "wall_sec": round(wall, 4),
+            "stages": stages,
+            "queues": {q.name: q.stats() for q in self.queues},
+        }
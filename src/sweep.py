@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from dataclasses import fields, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from eval.eval import evaluate  # noqa: E402
+from ocr.memo import OCRMemo  # noqa: E402
+from pipeline import PipelineConfig, run_pipeline  # noqa: E402
+
+_FIXED = {"video_path", "profile_path", "output_path"}
+
+
+def parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def parse_assignment(text: str) -> tuple[str, List[Any]]:
+    key, _, values = text.partition("=")
+    key = key.strip().replace("-", "_")
+    if not values:
+        raise ValueError(f"Expected key=v1,v2,...: {text!r}")
+    return key, [parse_value(v.strip()) for v in values.split(",")]
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    known = {f.name for f in fields(PipelineConfig)} - _FIXED
+    unknown = sorted(set(grid) - known)
+    if unknown:
+        raise ValueError(f"Unknown PipelineConfig fields: {', '.join(unknown)}")
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def _rank_key(row: Dict) -> tuple:
+    return (-row["f1"], row["mean_dt"], row["wall_sec"])
+
+
+def run_sweep(
+    base: PipelineConfig,
+    grid: Dict[str, List[Any]],
+    gt_path: str,
+    out_dir: Path,
+    max_dt: float = 3.0,
+    memo: Optional[OCRMemo] = None,
+) -> List[Dict]:
+    memo = memo if memo is not None else OCRMemo()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows = []
+    for i, params in enumerate(expand_grid(grid)):
+        run_dir = out_dir / f"run_{i:03d}"
+        run_dir.mkdir(exist_ok=True)
+        cfg = replace(base, output_path=str(run_dir / "output.json"), **params)
+        hits_before = memo.stats["hits"]
+        t0 = time.perf_counter()
+        output = run_pipeline(cfg, ocr_memo=memo)
+        wall = time.perf_counter() - t0
+        metrics = evaluate(cfg.output_path, gt_path, max_dt)["metrics"]
+        stages = output["diagnostics"].get("timing", {}).get("stages", {})
+        rows.append(
+            {
+                "run": run_dir.name,
+                "params": params,
+                "f1": round(metrics["f1"], 4),
+                "precision": round(metrics["precision"], 4),
+                "recall": round(metrics["recall"], 4),
+                "mean_dt": round(metrics["mean_dt"], 3),
+                "wall_sec": round(wall, 3),
+                "ocr_calls": stages.get("ocr", {}).get("calls", 0),
+                "memo_hits": memo.stats["hits"] - hits_before,
+            }
+        )
+    rows.sort(key=_rank_key)
+    return rows
+
+
+def format_table(rows: List[Dict]) -> str:
+    header = ["#", "f1", "prec", "recall", "mean|dt|", "wall_s", "ocr", "memo", "params"]
+    lines = [header]
+    for rank, row in enumerate(rows, 1):
+        params = " ".join(f"{k}={v}" for k, v in row["params"].items())
+        lines.append(
+            [
+                str(rank),
+                f"{row['f1']:.3f}",
+                f"{row['precision']:.3f}",
+                f"{row['recall']:.3f}",
+                f"{row['mean_dt']:.2f}",
+                f"{row['wall_sec']:.1f}",
+                str(row["ocr_calls"]),
+                str(row["memo_hits"]),
+                params,
+            ]
+        )
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header) - 1)]
+    return "\n".join("  ".join(c.rjust(w) for c, w in zip(line, widths)) + "  " + line[-1] for line in lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a grid of pipeline configurations on one video and rank them.")
+    parser.add_argument("video", help="Input video path")
+    parser.add_argument("gt", help="Ground truth JSON")
+    parser.add_argument("-o", "--out-dir", default="sweep", help="Per-run outputs and sweep.json go here")
+    parser.add_argument("--profile", default=str(Path(__file__).resolve().parent / "roi" / "profile_480p.json"))
+    parser.add_argument("--grid", help="JSON file: {field: [values, ...]}")
+    parser.add_argument("--set", action="append", default=[], metavar="FIELD=V1,V2", help="Grid axis (repeatable)")
+    parser.add_argument("--base", action="append", default=[], metavar="FIELD=V", help="Fixed PipelineConfig value")
+    parser.add_argument("--max-dt", type=float, default=3.0, help="Max time delta for an event match")
+    parser.add_argument("--no-strip-cache", action="store_true", help="Decode every run instead of sharing a strip cache")
+    args = parser.parse_args()
+
+    grid: Dict[str, List[Any]] = {}
+    if args.grid:
+        grid.update(json.loads(Path(args.grid).read_text(encoding="utf-8")))
+    for item in args.set:
+        key, values = parse_assignment(item)
+        grid[key] = values
+    overrides = {}
+    for item in args.base:
+        key, values = parse_assignment(item)
+        overrides[key] = values[0]
+
+    out_dir = Path(args.out_dir)
+    base = PipelineConfig(
+        video_path=args.video,
+        profile_path=args.profile,
+        output_path=str(out_dir / "output.json"),
+        strip_cache=not args.no_strip_cache,
+    )
+    base = replace(base, **overrides)
+    rows = run_sweep(base, grid, args.gt, out_dir, args.max_dt)
+    (out_dir / "sweep.json").write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
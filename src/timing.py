@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_local = threading.local()
+
+RESERVOIR_SIZE = 2048
+
+
+class _StageStats:
+    # Exact count/sum/max; percentiles come from a fixed-size uniform reservoir so long runs stay bounded.
+    __slots__ = ("count", "total", "max", "reservoir", "_rng")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.reservoir: List[float] = []
+        self._rng = random.Random(0)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(seconds)
+        else:
+            i = self._rng.randrange(self.count)
+            if i < RESERVOIR_SIZE:
+                self.reservoir[i] = seconds
+
+
+class StageTimer:
+    def __init__(self, enabled: bool = True, listener: Optional[Callable[[str, float], None]] = None) -> None:
+        self.enabled = enabled
+        self.listener = listener
+        self._stats: Dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _StageStats()
+            stats.add(seconds)
+        if self.listener is not None:
+            self.listener(name, seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def summary(self) -> Dict:
+        if not self.enabled:
+            return {"enabled": False}
+        import numpy as np
+
+        with self._lock:
+            samples = {k: (v.count, v.total, v.max, list(v.reservoir)) for k, v in self._stats.items()}
+        stages = {}
+        for name, (count, total, peak, values) in sorted(samples.items()):
+            arr = np.asarray(values, dtype=np.float64)
+            stages[name] = {
+                "calls": count,
+                "total_sec": round(total, 4),
+                "p50_ms": round(float(np.percentile(arr, 50)) * 1000.0, 3),
+                "p95_ms": round(float(np.percentile(arr, 95)) * 1000.0, 3),
+                "max_ms": round(peak * 1000.0, 3),
+            }
+        return {
+            "enabled": True,
+            "wall_sec": round(time.perf_counter() - self._started, 4),
+            "stages": stages,
+        }
+
+
+def active() -> Optional[StageTimer]:
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def activate(timer: Optional[StageTimer]) -> Iterator[Optional[StageTimer]]:
+    prev = active()
+    _local.timer = timer if timer is not None and timer.enabled else None
+    try:
+        yield timer
+    finally:
+        _local.timer = prev
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timer = active()
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - t0)
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            timer = getattr(_local, "timer", None)
+            if timer is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timer.record(name, time.perf_counter() - t0)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(items: Iterable[T], name: str) -> Iterator[T]:
+    it = iter(items)
+    try:
+        while True:
+            timer = getattr(_local, "timer", None)
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            if timer is not None:
+                timer.record(name, time.perf_counter() - t0)
+            yield item
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            close()
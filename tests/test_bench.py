@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import cv2
+
+from bench.bench_pipeline import run_benchmark, supply_accuracy
+from bench.synth import SynthConfig, make_script
+
+
+def test_make_script_is_deterministic():
+    cfg = SynthConfig(duration_sec=30.0, seed=3)
+    a = make_script(cfg)
+    b = make_script(cfg)
+    assert a.supply == b.supply and a.selection == b.selection and a.queue == b.queue
+    assert all(u <= tot for _, u, tot in a.supply)
+
+
+def test_supply_accuracy_counts_matches():
+    gt = [{"t": 1.0, "used": 4, "total": 10}, {"t": 5.0, "used": 5, "total": 10}]
+    pred = [{"t": 1.2, "used": 4, "total": 10}, {"t": 3.0, "used": 9, "total": 10}]
+    acc = supply_accuracy(pred, gt)
+    assert acc["precision"] == 0.5
+    assert acc["recall"] == 0.5
+
+
+def test_run_benchmark_reports_json(tmp_path: Path):
+    cfg = SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0)
+    report = run_benchmark(tmp_path, cfg, supply_fps=1.0, supply_samples=2, roi_samples=2)
+
+    cap = cv2.VideoCapture(str(tmp_path / "synth.mp4"))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 20
+    cap.release()
+    assert report["throughput"]["frames_decoded"] > 0
+    assert "read_supply" in report["stages"]
+    assert set(report["accuracy"]) == {"supply", "events"}
@@ -0,0 +1,113 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from columnar import ColumnarWriter, compact, load_table, main, part_paths
+from pipeline import PipelineConfig, run_pipeline
+
+
+def _output(n_supply: int, name: str) -> dict:
+    return {
+        "version": 1,
+        "signals": {
+            "supply_series": [
+                {"t": i * 0.5, "used": i, "total": 10 + i, "raw_text": f"{i}/{10 + i}", "conf": 0.9, "frame": f"s_{i}.jpg"}
+                for i in range(n_supply)
+            ],
+            "selection_changes": [
+                {
+                    "t": 1.0,
+                    "frame": "sel.jpg",
+                    "ocr": {"selected_name": {"text": name, "conf": 0.8}, "hp_text": {"text": "", "conf": 0.0}},
+                }
+            ],
+            "queue_events": [],
+        },
+    }
+
+
+def test_append_batches_and_mmap_load(tmp_path: Path):
+    writer = ColumnarWriter(tmp_path / "cols", "npy")
+    assert writer.append([("a", _output(3, "Probe")), ("b", _output(2, "Nexus"))]) == {
+        "supply_series": 5,
+        "selection_changes": 2,
+        "queue_events": 0,
+    }
+    writer.append([("a_much_longer_video_id", _output(1, "Mothership"))])
+    assert len(part_paths(tmp_path / "cols", "supply_series")) == 2
+    assert not (tmp_path / "cols" / "queue_events").exists()
+
+    first = np.load(part_paths(tmp_path / "cols", "supply_series")[0], mmap_mode="r")
+    assert isinstance(first, np.memmap)
+    supply = load_table(tmp_path / "cols", "supply_series")
+    assert list(supply["video_id"]) == ["a", "a", "a", "b", "b", "a_much_longer_video_id"]
+    assert supply["used"].tolist() == [0, 1, 2, 0, 1, 0]
+    assert supply["raw_text"][2] == "2/12"
+    sel = load_table(tmp_path / "cols", "selection_changes")
+    assert sel["selected_name"].tolist() == ["Probe", "Nexus", "Mothership"]
+    assert len(load_table(tmp_path / "cols", "queue_events")) == 0
+
+    assert compact(tmp_path / "cols")["supply_series"] == 2
+    assert len(part_paths(tmp_path / "cols", "supply_series")) == 1
+    assert np.array_equal(load_table(tmp_path / "cols", "supply_series"), supply)
+
+    with pytest.raises(ValueError):
+        ColumnarWriter(tmp_path / "cols", "parquet")
+
+
+def test_cli_converts_json_outputs(tmp_path: Path, capsys):
+    for vid in ("g1", "g2", "g3"):
+        (tmp_path / "runs" / vid).mkdir(parents=True)
+        (tmp_path / "runs" / vid / "output.json").write_text(json.dumps(_output(2, vid)), encoding="utf-8")
+    main([str(tmp_path / "cols"), str(tmp_path / "runs"), "--id-from", "parent", "--batch-size", "2", "--format", "npy"])
+    assert json.loads(capsys.readouterr().out)["rows"]["supply_series"] == 6
+    assert len(part_paths(tmp_path / "cols", "supply_series")) == 2
+    assert sorted(set(load_table(tmp_path / "cols", "supply_series")["video_id"])) == ["g1", "g2", "g3"]
+
+
+def test_pipeline_appends_to_columnar_export(tmp_path: Path):
+    assets = synthesize(tmp_path / "clip", Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+    out = run_pipeline(
+        PipelineConfig(
+            video_path=str(assets["video"]),
+            profile_path=str(assets["profile"]),
+            output_path=str(tmp_path / "output.json"),
+            end_sec=4.0,
+            supply_samples=3,
+            roi_samples=3,
+            ocr_engine="none",
+            supply_ocr_engine="digits",
+            columnar_dir=str(tmp_path / "cols"),
+            video_id="clip_01",
+        )
+    )
+    assert json.loads((tmp_path / "output.json").read_text(encoding="utf-8"))["version"] == 1
+    supply = load_table(tmp_path / "cols", "supply_series")
+    assert len(supply) == len(out["signals"]["supply_series"]) > 0
+    assert set(supply["video_id"]) == {"clip_01"}
+    assert supply["t"].tolist() == [e["t"] for e in out["signals"]["supply_series"]]
+
+
+def test_concurrent_writers_never_share_a_part(tmp_path: Path):
+    ColumnarWriter(tmp_path / "cols", "npy")
+    barrier = threading.Barrier(8)
+
+    def write(i: int) -> None:
+        writer = ColumnarWriter(tmp_path / "cols", "npy")
+        barrier.wait()
+        writer.append([(f"v{i}", _output(2, "Probe"))])
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert len(part_paths(tmp_path / "cols", "supply_series")) == 8
+    assert not list((tmp_path / "cols" / "supply_series").glob("*.tmp"))
+    supply = load_table(tmp_path / "cols", "supply_series")
+    assert sorted(set(supply["video_id"])) == [f"v{i}" for i in range(8)]
+    assert len(supply) == 16
@@ -0,0 +1,28 @@
+import numpy as np
+
+from ocr.consensus import ConsensusConfig, decode_supply, transition_costs
+
+
+def test_outlier_tick_is_corrected():
+    obs = [{(4, 10): 0.9}] * 5 + [{(9, 18): 0.95}] + [{(4, 10): 0.9}] * 5
+    assert decode_supply(obs) == [(4, 10)] * 11
+
+
+def test_real_change_is_kept_and_gaps_are_filled():
+    obs = [{(4, 10): 0.9}] * 4 + [{}] * 2 + [{(5, 10): 0.8, (6, 10): 0.3}] * 4 + [{(5, 18): 0.9}] * 3
+    path = decode_supply(obs)
+    assert path[:6] == [(4, 10)] * 6
+    assert path[6:10] == [(5, 10)] * 4
+    assert path[10:] == [(5, 18)] * 3
+
+
+def test_leading_ticks_without_reads_stay_empty():
+    assert decode_supply([{}, {}, {(4, 10): 0.9}]) == [None, None, (4, 10)]
+    assert decode_supply([{}, {}]) == [None, None]
+
+
+def test_depot_sized_total_steps_are_cheaper():
+    states = np.array([(4, 10), (4, 18), (4, 15)])
+    cost = transition_costs(states, ConsensusConfig())
+    assert cost[0, 1] < cost[0, 2]
+    assert np.all(np.diag(cost) == 0)
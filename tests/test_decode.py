@@ -0,0 +1,34 @@
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from decode.ffmpeg_decode import DecodeConfig, ffmpeg_command, iter_frames
+
+
+def test_ffmpeg_command_filters():
+    cfg = DecodeConfig(fps=2.0, start_sec=5.0, end_sec=60.0, size=(854, 480), crop=(0, 0, 1280, 720))
+    cmd = ffmpeg_command("clip.mp4", cfg, "ffmpeg")
+    assert cmd[cmd.index("-ss") + 1] == "5.000"
+    assert cmd[cmd.index("-vf") + 1] == "fps=2.0,crop=1280:720:0:0,scale=854:480:flags=area"
+    assert cmd[cmd.index("-pix_fmt") + 1] == "bgr24"
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_ffmpeg_backend_matches_opencv(tmp_path: Path):
+    video = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"mp4v"), 10, (160, 90))
+    for i in range(40):
+        writer.write(np.full((90, 160, 3), i * 5, dtype=np.uint8))
+    writer.release()
+
+    base = DecodeConfig(fps=2.0, start_sec=0.0, end_sec=3.0)
+    ref = list(iter_frames(str(video), base))
+    out = list(iter_frames(str(video), DecodeConfig(fps=2.0, start_sec=0.0, end_sec=3.0, backend="ffmpeg")))
+
+    assert [t for t, _ in out] == [t for t, _ in ref]
+    assert all(b.shape == a.shape for (_, a), (_, b) in zip(ref, out))
+    means = [float(f.mean()) for _, f in out]
+    assert means == sorted(means)
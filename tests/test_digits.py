@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import numpy as np
+
+from bench.synth import SUPPLY_RECT, draw_supply, load_glyphs
+from ocr.digits import segment_glyphs
+from ocr.engine import OCREngine
+from ocr.read_supply import finish_supply, prepare_supply, read_supply
+
+TEMPLATES = Path(__file__).resolve().parents[1] / "a"
+
+
+def _supply_roi(used: int, total: int) -> np.ndarray:
+    x, y, w, h = SUPPLY_RECT
+    frame = np.zeros((y + h + 2, x + w + 2, 3), np.uint8)
+    draw_supply(frame, load_glyphs(TEMPLATES), used, total)
+    return frame[y : y + h, x : x + w]
+
+
+def test_segment_glyphs_splits_on_column_gaps():
+    img = np.zeros((12, 20), np.uint8)
+    img[2:10, 2:5] = 200
+    img[2:10, 8:12] = 200
+    img[5:6, 15:16] = 200
+    assert [s.shape for s in segment_glyphs(img)] == [(8, 3), (8, 4)]
+
+
+def test_digits_engine_reads_supply():
+    engine = OCREngine("digits")
+    assert engine.name == "digits"
+    for used, total in [(4, 10), (17, 26), (38, 45)]:
+        res = read_supply(_supply_roi(used, total), TEMPLATES, engine)
+        assert (res.used, res.total) == (used, total)
+    assert engine.calls == 6
+
+
+def test_digits_engine_skips_preprocess_and_classifies_halves_together(monkeypatch):
+    engine = OCREngine("digits")
+    batches = []
+    classify = engine._impl.classify
+    monkeypatch.setattr(engine._impl, "classify", lambda crops: batches.append(len(crops)) or classify(crops))
+    prepared = prepare_supply(_supply_roi(17, 26), TEMPLATES, raw=engine.wants_raw)
+    assert prepared.left_pre is None and prepared.right_pre is None
+    res = finish_supply(prepared, engine)
+    assert (res.used, res.total) == (17, 26)
+    assert batches == [4]
+    assert engine.calls == 2
@@ -1,7 +1,8 @@
 from pathlib import Path
 import json
+import random
 
-from eval.eval import evaluate
+from eval.eval import _match_events, evaluate, evaluate_dir
 
 
 def test_evaluate_simple_match(tmp_path: Path):
@@ -16,3 +17,70 @@ def test_evaluate_simple_match(tmp_path: Path):
     m = result["metrics"]
     assert m["precision"] == 1.0
     assert m["recall"] == 1.0
+
+
+def _reference_match(pred, gt, max_dt):
+    matched = []
+    used_pred = set()
+    used_gt = set()
+    for gi, g in enumerate(gt):
+        best = None
+        best_i = None
+        for pi, p in enumerate(pred):
+            if pi in used_pred or p.get("id") != g.get("id"):
+                continue
+            dt = abs(float(p.get("t", 0.0)) - float(g.get("t", 0.0)))
+            if dt <= max_dt and (best is None or dt < best):
+                best = dt
+                best_i = pi
+        if best_i is not None:
+            used_pred.add(best_i)
+            used_gt.add(gi)
+            matched.append((pred[best_i], g))
+    return matched, [p for i, p in enumerate(pred) if i not in used_pred], [g for i, g in enumerate(gt) if i not in used_gt]
+
+
+def test_indexed_matcher_agrees_with_nested_loop():
+    rng = random.Random(0)
+    ids = ["marine_started", "scv_started", "tank_started"]
+    for _ in range(300):
+        # Half-second grid so exact ties (same time, or equal distance both sides) happen often.
+        pred = [{"t": rng.randrange(0, 40) / 2, "id": rng.choice(ids), "n": i} for i in range(rng.randrange(0, 30))]
+        gt = [{"t": rng.randrange(0, 40) / 2, "id": rng.choice(ids)} for _ in range(rng.randrange(0, 30))]
+        max_dt = rng.choice([0.0, 0.5, 1.0, 3.0])
+        assert _match_events(pred, gt, max_dt) == _reference_match(pred, gt, max_dt)
+
+
+def test_tie_prefers_lowest_prediction_index():
+    pred = [{"t": 12.0, "id": "a"}, {"t": 8.0, "id": "a"}, {"t": 8.0, "id": "a"}]
+    matched, un_pred, _ = _match_events(pred, [{"t": 10.0, "id": "a"}], 3.0)
+    assert matched[0][0] is pred[0]
+    assert un_pred == pred[1:]
+
+
+def test_evaluate_dir_micro_macro_and_per_id(tmp_path: Path):
+    pred_dir = tmp_path / "pred"
+    gt_dir = tmp_path / "gt"
+    videos = {
+        "a": ([{"t": 1.0, "id": "x"}, {"t": 5.0, "id": "y"}], [{"t": 1.5, "id": "x"}, {"t": 9.0, "id": "y"}]),
+        "sub/b": ([{"t": 2.0, "id": "x"}], [{"t": 2.0, "id": "x"}]),
+    }
+    for name, (pred, gt) in videos.items():
+        for root, events in ((pred_dir, pred), (gt_dir, gt)):
+            path = root / f"{name}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"events": events}), encoding="utf-8")
+    (gt_dir / "c.json").write_text(json.dumps({"events": [{"t": 3.0, "id": "y"}]}), encoding="utf-8")
+
+    result = evaluate_dir(str(pred_dir), str(gt_dir), max_dt=3.0, workers=2)
+    assert result["videos"] == 3
+    assert result["missing_pred"] == ["c"]
+    micro = result["micro"]
+    assert (micro["tp"], micro["fp"], micro["fn"]) == (2, 1, 2)
+    assert micro["mean_dt"] == 0.25
+    assert abs(result["macro"]["recall"] - (0.5 + 1.0 + 0.0) / 3) < 1e-9
+    assert result["per_id"]["x"]["recall"] == 1.0
+    assert (result["per_id"]["y"]["fp"], result["per_id"]["y"]["fn"]) == (1, 2)
+    single = evaluate(str(pred_dir / "a.json"), str(gt_dir / "a.json"))["metrics"]
+    assert result["per_video"]["a"]["f1"] == single["f1"]
+    assert evaluate_dir(str(pred_dir), str(gt_dir), max_dt=3.0, workers=1) == result
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from decode.ffmpeg_decode import get_frame_at, open_capture, sample_frames_with_capture
+from decode.index import IndexedCapture, build_index, load_index, load_or_build_index, parse_ffprobe_packets, save_index, sidecar_path
+
+
+def _clip(path: Path, frames: int = 40) -> Path:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (96, 64))
+    for i in range(frames):
+        img = np.full((64, 96, 3), (i * 6) % 256, dtype=np.uint8)
+        cv2.putText(img, str(i), (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        writer.write(img)
+    writer.release()
+    return path
+
+
+def test_parse_ffprobe_packets_reorders_to_presentation():
+    text = "0.000000,K__\n0.300000,___\n0.100000,___\n0.200000,___\n0.400000,K__\nN/A,___\n"
+    pts, keyframes = parse_ffprobe_packets(text)
+    assert pts.tolist() == [0.0, 0.1, 0.2, 0.3, 0.4]
+    assert keyframes.tolist() == [0, 4]
+
+
+def test_sidecar_roundtrip_and_invalidation(tmp_path: Path):
+    video = _clip(tmp_path / "clip.mp4")
+    index = build_index(str(video))
+    assert index.frame_count == 40
+    assert index.keyframes[0] == 0
+    save_index(index, str(video))
+    assert sidecar_path(str(video)).exists()
+
+    loaded = load_index(str(video))
+    assert loaded is not None and not loaded.built
+    assert np.array_equal(loaded.pts, index.pts)
+    assert np.array_equal(loaded.keyframes, index.keyframes)
+
+    _clip(video, frames=30)
+    assert load_index(str(video)) is None
+    assert load_or_build_index(str(video)).frame_count == 30
+
+
+def test_frame_at_picks_nearest_pts():
+    from decode.index import FrameIndex
+
+    index = FrameIndex(np.array([0.0, 0.1, 0.2, 0.3]), np.array([0, 2]), 10.0, "test")
+    assert index.frame_at(0.0) == 0
+    assert index.frame_at(0.14) == 1
+    assert index.frame_at(0.16) == 2
+    assert index.frame_at(0.34) == 3
+    assert index.frame_at(9.0) == 4
+    assert index.keyframe_before(1) == 0
+    assert index.keyframe_before(3) == 2
+
+
+def test_indexed_capture_matches_plain_seeks(tmp_path: Path):
+    video = str(_clip(tmp_path / "clip.mp4"))
+    plain = open_capture(video)
+    indexed = open_capture(video, frame_index=True)
+    assert isinstance(indexed, IndexedCapture)
+    for t in (0.0, 1.23, 0.5, 3.9, 2.04, 2.05, 2.06, 0.31):
+        assert np.array_equal(get_frame_at(plain, t), get_frame_at(indexed, t))
+
+    window = sample_frames_with_capture(indexed, 2.0, 0.25, 7)
+    ref = sample_frames_with_capture(plain, 2.0, 0.25, 7)
+    assert [t for t, _ in window] == [t for t, _ in ref]
+    assert all(np.array_equal(a, b) for (_, a), (_, b) in zip(window, ref))
+    assert indexed.stats["reused"] > 0
+    assert get_frame_at(indexed, 10.0) is None
+    assert get_frame_at(plain, 10.0) is None
+    plain.release()
+    indexed.release()
@@ -0,0 +1,76 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from bench.synth import SynthConfig, synthesize
+import pipeline
+from ocr.fusion import FusionConfig, align_crops, fuse_crops
+from pipeline import PipelineConfig, run_pipeline
+
+
+def _pattern():
+    img = np.zeros((24, 40), np.uint8)
+    img[6:18, 8:12] = 200
+    img[6:10, 20:32] = 160
+    img[14:18, 22:30] = 220
+    return img
+
+
+def test_align_recovers_integer_shift():
+    ref = _pattern()
+    shifted = np.roll(ref, (1, 2), axis=(0, 1))
+    aligned = align_crops([shifted, ref, shifted])
+    assert np.abs(aligned[0][3:-3, 3:-3].astype(int) - ref[3:-3, 3:-3]).mean() < 5
+
+
+def test_median_fusion_removes_noise_and_uses_dominant_shape():
+    rng = np.random.default_rng(0)
+    ref = _pattern()
+    items = []
+    for i in range(7):
+        noisy = np.clip(ref.astype(np.int16) + rng.normal(0, 25, ref.shape), 0, 255).astype(np.uint8)
+        items.append((i * 0.1, noisy))
+    items.append((0.9, np.zeros((10, 10), np.uint8)))
+    t, fused, stacked = fuse_crops(items)
+    assert stacked == 7
+    assert fused.shape == ref.shape
+    assert t == items[3][0]
+    single_err = np.abs(items[0][1].astype(int) - ref).mean()
+    fused_err = np.abs(fused.astype(int) - ref).mean()
+    assert fused_err < single_err / 2
+
+
+def test_window_with_mismatched_shapes_is_not_fused(monkeypatch):
+    shapes = iter([(20, 30), (21, 30)])
+    monkeypatch.setattr(pipeline, "_crop", lambda ctx, frame, kind: (np.zeros(next(shapes), np.uint8), 1.0))
+    ctx = SimpleNamespace(fusion=FusionConfig())
+    crops, fused = pipeline._window_crops(ctx, [(0.0, None), (0.1, None)], "supply")
+    assert len(crops) == 1
+    assert fused is False
+
+
+def test_pipeline_counts_fusion_fallback_windows(tmp_path: Path):
+    assets = synthesize(tmp_path / "clip", Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+
+    def stats(samples: int) -> dict:
+        out = run_pipeline(
+            PipelineConfig(
+                video_path=str(assets["video"]),
+                profile_path=str(assets["profile"]),
+                output_path=str(tmp_path / f"output_{samples}.json"),
+                end_sec=4.0,
+                supply_samples=samples,
+                roi_samples=samples,
+                ocr_engine="none",
+                supply_ocr_engine="digits",
+                fuse_frames=True,
+            )
+        )
+        return out["diagnostics"]["ocr_stats"]
+
+    fused = stats(3)
+    assert fused["fusion_fused_windows"] > 0 and fused["fusion_fallback_windows"] == 0
+    single = stats(1)
+    assert single["fusion_fused_windows"] == 0 and single["fusion_fallback_windows"] > 0
+    assert single["supply_parsed"] > 0
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ocr.engine import OCRResult
+from ocr.glyph_cache import GlyphCache, GlyphEntry, average_hash, profile_cache_path, reader_key
+from ocr.read_selection import read_selection
+
+
+class _FakeOCR:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def read_text(self, img, whitelist=None):
+        self.calls += 1
+        return OCRResult(self.text, 0.9)
+
+
+def _panel(text):
+    img = np.full((90, 220, 3), (24, 32, 24), np.uint8)
+    cv2.putText(img, text, (6, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (230, 230, 230), 1, cv2.LINE_AA)
+    return img
+
+
+def test_lookup_tolerates_small_noise():
+    cache = GlyphCache(max_distance=8)
+    clean = _panel("Marine")[:30]
+    cache.add(clean, OCRResult("Marine", 0.9))
+    rng = np.random.default_rng(0)
+    noisy = np.clip(clean.astype(np.int16) + rng.integers(-6, 7, clean.shape), 0, 255).astype(np.uint8)
+    assert cache.lookup(noisy).text == "Marine"
+    assert cache.lookup(_panel("Command Center")[:30]) is None
+
+
+def test_band_index_agrees_with_linear_scan():
+    rng = np.random.default_rng(1)
+    cache = GlyphCache(max_distance=8)
+    for i in range(200):
+        cache._insert(GlyphEntry(int.from_bytes(rng.bytes(128), "big"), str(i), 1.0))
+    for _ in range(100):
+        base = cache.entries[int(rng.integers(len(cache.entries)))].hash
+        h = base
+        for bit in rng.choice(1024, size=int(rng.integers(0, 14)), replace=False):
+            h ^= 1 << int(bit)
+        d = (base ^ h).bit_count()
+        found = cache._nearest(h)
+        if d <= 8:
+            assert found is not None and found.hash == base
+        else:
+            assert found is None
+
+
+def test_selection_reuses_cached_name_and_persists(tmp_path: Path):
+    profile = tmp_path / "profile.json"
+    profile.write_text("{}", encoding="utf-8")
+    path = profile_cache_path(profile, "selection_panel", tmp_path / "glyphs")
+
+    cache = GlyphCache()
+    ocr = _FakeOCR("SCV")
+    panel = _panel("SCV")
+    for _ in range(3):
+        assert read_selection(panel, ocr, glyph_cache=cache).selected_name.text == "SCV"
+    assert ocr.calls == 4  # one name read + three hp reads
+    cache.save(path)
+
+    reloaded = GlyphCache.load(path)
+    ocr = _FakeOCR("SCV")
+    assert read_selection(panel, ocr, glyph_cache=reloaded).selected_name.text == "SCV"
+    assert ocr.calls == 1
+    assert average_hash(panel) == average_hash(panel.copy())
+
+
+def test_cache_path_is_keyed_by_engine_and_vocab(tmp_path: Path):
+    profile = tmp_path / "profile.json"
+    profile.write_text("{}", encoding="utf-8")
+    vocab = tmp_path / "names.txt"
+    vocab.write_text("SCV\nMarine\n", encoding="utf-8")
+
+    def path(*args):
+        return profile_cache_path(profile, "selection_panel", tmp_path, reader_key(*args))
+
+    base = path("tesseract", vocab, 0.6)
+    assert base == path("tesseract", vocab, 0.6)
+    assert len({base, path("easyocr", vocab, 0.6), path("tesseract"), path("tesseract", vocab, 0.8)}) == 4
+    vocab.write_text("SCV\nMarine\nMedic\n", encoding="utf-8")
+    assert path("tesseract", vocab, 0.6) != base
@@ -0,0 +1,56 @@
+import urllib.request
+from pathlib import Path
+
+from metrics import MetricsRegistry, serve_http, write_textfile
+
+
+def test_render_prometheus_exposition(tmp_path: Path):
+    reg = MetricsRegistry()
+    reg.inc("ocr_calls_total", 3, {"engine": "tesseract", "roi": "supply"}, "OCR engine calls.")
+    reg.set("video_position_seconds", 12.5, {"phase": "supply"})
+    reg.observe("stage_seconds", 0.003, {"stage": "ocr"}, buckets=(0.001, 0.01))
+    reg.observe("stage_seconds", 0.5, {"stage": "ocr"}, buckets=(0.001, 0.01))
+
+    text = reg.render()
+    assert "# TYPE supply_ocr_ocr_calls_total counter" in text
+    assert 'supply_ocr_ocr_calls_total{engine="tesseract",roi="supply"} 3' in text
+    assert 'supply_ocr_video_position_seconds{phase="supply"} 12.5' in text
+    assert 'supply_ocr_stage_seconds_bucket{stage="ocr",le="0.01"} 1' in text
+    assert 'supply_ocr_stage_seconds_bucket{stage="ocr",le="+Inf"} 2' in text
+    assert 'supply_ocr_stage_seconds_count{stage="ocr"} 2' in text
+
+    out = tmp_path / "metrics.prom"
+    write_textfile(reg, out)
+    assert out.read_text(encoding="utf-8") == text
+
+
+def test_render_keeps_full_precision():
+    reg = MetricsRegistry()
+    reg.inc("evidence_bytes_total", 1234567)
+    reg.inc("evidence_bytes_total", 1)
+    reg.set("video_position_seconds", 1234.5678901)
+    reg.observe("stage_seconds", 1234567.25, buckets=(1.0,))
+    text = reg.render()
+    assert "supply_ocr_evidence_bytes_total 1234568\n" in text
+    assert "supply_ocr_video_position_seconds 1234.5678901\n" in text
+    assert "supply_ocr_stage_seconds_sum 1234567.25\n" in text
+
+
+def test_disabled_registry_is_noop():
+    reg = MetricsRegistry(enabled=False)
+    reg.inc("frames_decoded_total", 10)
+    assert reg.get("frames_decoded_total") == 0.0
+    assert reg.render() == "\n"
+
+
+def test_serve_http_exposes_metrics():
+    reg = MetricsRegistry()
+    reg.inc("videos_total", 1)
+    server = serve_http(reg, 0)
+    try:
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode("utf-8")
+        assert "supply_ocr_videos_total 1" in body
+    finally:
+        server.shutdown()
+        server.server_close()
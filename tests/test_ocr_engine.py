@@ -0,0 +1,42 @@
+import sys
+
+from ocr import engine
+from ocr.engine import OCREngine
+
+
+def test_auto_engine_caches_resolved_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUPPLY_OCR_ENGINE_CACHE", str(tmp_path / "ocr_engine.json"))
+    monkeypatch.setattr(engine, "available_backends", lambda: ["tesseract", "easyocr"])
+    tried = []
+
+    def fake_init(self, name):
+        tried.append(name)
+        if name == "easyocr":
+            self._impl_name = name
+            return True
+        return False
+
+    monkeypatch.setattr(OCREngine, "_try_init", fake_init)
+    assert OCREngine("auto").name == "easyocr"
+    assert tried == ["tesseract", "easyocr"]
+
+    tried.clear()
+    assert OCREngine("auto").name == "easyocr"
+    assert tried == ["easyocr"]
+
+
+def test_available_backends_does_not_import():
+    before = set(sys.modules)
+    engine.available_backends()
+    assert not {"paddleocr", "easyocr", "pytesseract"} & (set(sys.modules) - before)
+
+
+def test_auto_engine_cache_is_dropped_when_backends_change(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUPPLY_OCR_ENGINE_CACHE", str(tmp_path / "ocr_engine.json"))
+    monkeypatch.setattr(engine, "available_backends", lambda: ["tesseract"])
+    monkeypatch.setattr(OCREngine, "_try_init", lambda self, name: setattr(self, "_impl_name", name) or True)
+    assert OCREngine("auto").name == "tesseract"
+
+    monkeypatch.setattr(engine, "available_backends", lambda: ["paddleocr", "tesseract"])
+    assert OCREngine("auto").name == "paddleocr"
+    assert OCREngine("auto").name == "paddleocr"
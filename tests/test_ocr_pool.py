@@ -0,0 +1,37 @@
+import threading
+
+import numpy as np
+
+from ocr.pool import OCREnginePool
+
+
+def test_pool_hands_out_distinct_engines():
+    pool = OCREnginePool("none", size=2)
+    assert pool.size == 2
+    with pool.checkout() as a, pool.checkout() as b:
+        assert a is not b
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_pool_blocks_until_engine_returned():
+    pool = OCREnginePool("none", size=1)
+    seen = []
+
+    def worker():
+        with pool.checkout() as eng:
+            seen.append(eng)
+
+    with pool.checkout() as held:
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join(0.05)
+        assert t.is_alive()
+    t.join(1.0)
+    assert seen == [held]
+
+
+def test_pool_counts_calls_across_engines():
+    pool = OCREnginePool("none", size=2)
+    with pool.checkout() as eng:
+        eng.read_text(np.zeros((8, 8), np.uint8))
+    assert pool.calls == 1
@@ -0,0 +1,73 @@
+import os
+import signal
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ocr.engine import OCREngine
+from ocr.procpool import OCRProcessPool, SlotRing
+from ocr.read_supply import read_supply
+
+
+def test_slot_ring_round_trip_and_bounds():
+    ring = SlotRing(3, 64)
+    try:
+        img = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+        shape, dtype = ring.write(2, img)
+        other = SlotRing(3, 64, ring.name)
+        assert np.array_equal(other.view(2, shape, dtype), img)
+        other.close()
+        with pytest.raises(ValueError):
+            ring.view(0, (65,), np.uint8)
+        with pytest.raises(ValueError):
+            ring.view(3, (4,), np.uint8)
+    finally:
+        ring.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=ring.name)
+
+
+def test_process_pool_matches_in_process_reads():
+    rng = np.random.default_rng(0)
+    imgs = [rng.integers(0, 255, size=(18, 57, 3), dtype=np.uint8) for _ in range(12)]
+    big = rng.integers(0, 255, size=(64, 64, 3), dtype=np.uint8)
+    templates_dir = Path(__file__).resolve().parents[1] / "a"
+    engine = OCREngine("none")
+    expected = [read_supply(img, templates_dir, engine) for img in imgs]
+
+    for transport in ("shm", "pickle"):
+        with OCRProcessPool("none", workers=2, slots=2, slot_bytes=18 * 57 * 3, transport=transport) as pool:
+            sums = [pool.submit("checksum", img) for img in imgs + [big]]
+            assert [f.result() for f in sums] == [int(img.sum()) for img in imgs + [big]]
+            reads = [pool.submit("supply", img) for img in imgs]
+            assert [f.result() for f in reads] == expected
+            with pytest.raises(RuntimeError):
+                pool.read("supply", np.zeros((0, 0, 3), dtype=np.uint8))
+            stats = pool.stats()
+        assert stats["inline"] == (1 if transport == "shm" else 0)
+        assert stats["submitted"] == 2 * len(imgs) + 2
+    with pytest.raises(RuntimeError):
+        pool.submit("checksum", imgs[0])
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="needs POSIX job-control signals")
+def test_process_pool_fails_in_flight_reads_when_a_worker_dies():
+    img = np.ones((18, 57, 3), dtype=np.uint8)
+    with OCRProcessPool("none", workers=2, slots=4, slot_bytes=img.nbytes) as pool:
+        assert pool.read("checksum", img) == img.size
+        # Freeze both workers so the reads below are still in flight when one of them is killed.
+        for proc in pool.procs:
+            os.kill(proc.pid, signal.SIGSTOP)
+        futures = [pool.submit("checksum", img) for _ in range(3)]
+        os.kill(pool.procs[0].pid, signal.SIGKILL)
+        for fut in futures:
+            with pytest.raises(RuntimeError, match="exited with code"):
+                fut.result(timeout=10)
+        stats = pool.stats()
+        assert stats["broken"] and stats["free_slots"] == 4
+        with pytest.raises(RuntimeError, match="exited with code"):
+            pool.submit("checksum", img)
+        os.kill(pool.procs[1].pid, signal.SIGCONT)
+    assert not any(proc.is_alive() for proc in pool.procs)
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from pipeline import PipelineCancelled, PipelineConfig, run_pipeline
+from pipeline_async import iter_signals, run_many, run_pipeline_async
+
+
+def _config(tmp_path: Path, assets, name: str) -> PipelineConfig:
+    out = tmp_path / name / "output.json"
+    out.parent.mkdir()
+    return PipelineConfig(
+        video_path=str(assets["video"]),
+        profile_path=str(assets["profile"]),
+        output_path=str(out),
+        end_sec=4.0,
+        supply_samples=3,
+        roi_samples=3,
+        ocr_engine="none",
+    )
+
+
+@pytest.fixture(scope="module")
+def assets(tmp_path_factory):
+    root = tmp_path_factory.mktemp("clip")
+    return synthesize(root, Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+
+
+def test_iter_signals_streams_emitted_entries(tmp_path: Path, assets):
+    async def collect(cfg):
+        return [item async for item in iter_signals(cfg)]
+
+    items = asyncio.run(collect(_config(tmp_path, assets, "stream")))
+    result = run_pipeline(_config(tmp_path, assets, "sync"))
+    supply = [entry for kind, entry in items if kind == "supply"]
+    assert [(s["t"], s["used"], s["total"]) for s in supply] == [(s["t"], s["used"], s["total"]) for s in result["signals"]["supply_series"]]
+    assert len([1 for kind, _ in items if kind == "event"]) == len(result["events"])
+
+
+def test_cancel_event_stops_run(tmp_path: Path, assets):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(PipelineCancelled):
+        run_pipeline(_config(tmp_path, assets, "cancel"), cancel=cancel)
+
+
+def test_async_cancellation_propagates(tmp_path: Path, assets):
+    async def go(cfg):
+        task = asyncio.ensure_future(run_pipeline_async(cfg))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(go(_config(tmp_path, assets, "acancel")))
+
+
+def test_run_many_shares_ocr_limit(tmp_path: Path, assets):
+    cfgs = [_config(tmp_path, assets, f"many{i}") for i in range(3)]
+    results = asyncio.run(run_many(cfgs, max_videos=2, ocr_concurrency=1))
+    assert all(isinstance(r, dict) for r in results)
+    assert len({len(r["signals"]["supply_series"]) for r in results}) == 1
@@ -1,13 +1,15 @@
 from pathlib import Path
 import json
+import threading
 
 import cv2
 import numpy as np
 
-from roi.crop import crop_roi
+from roi.crop import ROITracker, ThreadTrackers, crop_roi
+from roi.match import pyramid_match
 
 
-def test_crop_roi_template_match():
+def test_crop_roi_template_match(tmp_path: Path):
     base = Path(__file__).resolve().parents[1]
     tpl_path = base / "a" / "supply_frame.png"
     template = cv2.imread(str(tpl_path), cv2.IMREAD_GRAYSCALE)
@@ -30,9 +32,111 @@ def test_crop_roi_template_match():
             }
         },
     }
-    profile_path = base / "tests" / "_tmp_profile.json"
+    profile_path = tmp_path / "profile.json"
     profile_path.write_text(json.dumps(profile), encoding="utf-8")
     roi = crop_roi(frame, profile_path, "supply")
     assert roi is not None
     assert roi.shape[0] == template.shape[0]
     assert roi.shape[1] >= template.shape[1]
+
+
+def test_roi_tracker_reuses_cached_location(tmp_path: Path):
+    base = Path(__file__).resolve().parents[1]
+    tpl_path = base / "a" / "supply_frame.png"
+    template = cv2.imread(str(tpl_path), cv2.IMREAD_GRAYSCALE)
+
+    def make_frame(x: int) -> np.ndarray:
+        frame = np.zeros((120, 200), dtype=np.uint8)
+        frame[5 : 5 + template.shape[0], x : x + template.shape[1]] = template
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+    profile = {
+        "resolution": [200, 120],
+        "rois": {
+            "supply": {
+                "mode": "template",
+                "template": str(tpl_path),
+                "template_min_conf": 0.5,
+                "enabled": True,
+            }
+        },
+    }
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps(profile), encoding="utf-8")
+
+    tracker = ROITracker(profile_path)
+    x = 200 - template.shape[1] - 5
+    first = tracker.crop(make_frame(x), "supply")
+    second = tracker.crop(make_frame(x - 3), "supply")
+
+    assert first is not None and second is not None
+    assert second.shape[:2] == template.shape[:2]
+    assert np.array_equal(cv2.cvtColor(second, cv2.COLOR_BGR2GRAY), template)
+    assert tracker.stats["full_searches"] == 1
+    assert tracker.stats["local_hits"] == 1
+
+
+def test_thread_trackers_are_per_thread_and_merge_stats(tmp_path: Path):
+    tpl_path = Path(__file__).resolve().parents[1] / "a" / "supply_frame.png"
+    template = cv2.imread(str(tpl_path), cv2.IMREAD_GRAYSCALE)
+    frame = np.zeros((120, 200), dtype=np.uint8)
+    frame[5 : 5 + template.shape[0], 100 : 100 + template.shape[1]] = template
+    frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(
+        json.dumps({"resolution": [200, 120], "rois": {"supply": {"mode": "template", "template": str(tpl_path), "template_min_conf": 0.5}}}),
+        encoding="utf-8",
+    )
+
+    base = ROITracker(profile_path)
+    trackers = ThreadTrackers(base)
+    seen = []
+
+    def work():
+        tracker = trackers.get()
+        assert trackers.get() is tracker
+        seen.append(tracker)
+        for _ in range(3):
+            assert tracker.crop(frame, "supply") is not None
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert len({id(t) for t in seen}) == 2 and base not in seen
+    trackers.merge_stats()
+    assert base.stats == {"full_searches": 2, "local_hits": 4, "local_misses": 0}
+
+
+def test_pyramid_match_finds_exact_location():
+    base = Path(__file__).resolve().parents[1]
+    template = cv2.imread(str(base / "a" / "supply_frame.png"), cv2.IMREAD_GRAYSCALE)
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 60, size=(480, 854), dtype=np.uint8)
+    frame[1 : 1 + template.shape[0], 784 : 784 + template.shape[1]] = template
+
+    (x, y), conf = pyramid_match(frame, template)
+    assert (x, y) == (784, 1)
+    assert conf > 0.99
+
+
+def test_roi_tracker_scales_normalized_profile(tmp_path: Path):
+    profile = {
+        "resolution": [854, 480],
+        "units": "normalized",
+        "rois": {"supply": {"mode": "static", "x": 0.918033, "y": 0.002083, "w": 0.066745, "h": 0.0375}},
+    }
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps(profile), encoding="utf-8")
+
+    tracker = ROITracker(profile_path)
+    assert tracker.resolution == (854, 480)
+    roi = tracker.rois["supply"]
+    assert (roi.x, roi.y, roi.w, roi.h) == (784, 1, 57, 18)
+
+    ref = tracker.crop(np.zeros((480, 854, 3), dtype=np.uint8), "supply")
+    hi = tracker.crop(np.zeros((1080, 1920, 3), dtype=np.uint8), "supply")
+    assert ref.shape[:2] == (18, 57)
+    assert abs(hi.shape[0] - 18 * 1080 / 480) <= 1
+    assert abs(hi.shape[1] - 57 * 1920 / 854) <= 1
@@ -0,0 +1,114 @@
+import json
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from pipeline import PipelineConfig, run_pipeline
+from stages import Stage, StagedRunner
+
+
+def _jitter(x):
+    time.sleep(random.random() * 0.002)
+    return x
+
+
+def test_staged_runner_preserves_order():
+    runner = StagedRunner(
+        range(50),
+        [Stage("a", lambda x: _jitter(x + 1), 3), Stage("b", lambda x: _jitter(x * 2), 2)],
+        queue_depth=2,
+    )
+    assert list(runner) == [(i + 1) * 2 for i in range(50)]
+    stats = runner.stats()
+    assert set(stats["stages"]) == {"source", "a", "b"}
+    assert stats["queues"]["a"]["capacity"] == 2
+
+
+def test_ordered_stage_sees_source_order():
+    seen = []
+
+    def record(x):
+        seen.append(x)
+        return x
+
+    runner = StagedRunner(range(40), [Stage("a", _jitter, 4), Stage("b", record, 1, ordered=True), Stage("c", _jitter, 2)])
+    assert list(runner) == list(range(40))
+    assert seen == list(range(40))
+    with pytest.raises(ValueError):
+        StagedRunner(range(3), [Stage("b", record, 2, ordered=True)])
+
+
+def test_staged_runner_propagates_errors():
+    def boom(x):
+        if x == 5:
+            raise ValueError("bad item")
+        return x
+
+    with pytest.raises(ValueError):
+        list(StagedRunner(range(10), [Stage("boom", boom, 2)]))
+
+
+def test_staged_pipeline_matches_sequential(tmp_path: Path):
+    assets = synthesize(tmp_path / "clip", Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+
+    def run(name: str, **kwargs):
+        out = tmp_path / name / "output.json"
+        out.parent.mkdir()
+        cfg = PipelineConfig(
+            video_path=str(assets["video"]),
+            profile_path=str(assets["profile"]),
+            output_path=str(out),
+            end_sec=4.0,
+            supply_samples=3,
+            roi_samples=3,
+            ocr_engine="none",
+            **kwargs,
+        )
+        result = run_pipeline(cfg)
+        return json.dumps([result["signals"], result["events"]]).replace(str(out.parent.as_posix()), "")
+
+    seq = run("seq")
+    staged = run("staged", staged=True, decode_workers=2, preprocess_workers=2)
+    assert seq == staged
+
+
+def test_staged_pipeline_matches_sequential_with_template_rois(tmp_path: Path):
+    base = Path(__file__).resolve().parents[1]
+    assets = synthesize(tmp_path / "clip", base / "a", SynthConfig(duration_sec=6.0, fps=5.0, intro_sec=1.0, supply_step_sec=(1.0, 2.0)))
+    # The slash moves as the digits change width, so the supply crop has to follow it via template tracking.
+    profile = {
+        "resolution": [854, 480],
+        "rois": {
+            "supply": {"mode": "template", "template": str(base / "a" / "slash.jpg"), "padding": [20, 3, 38, 3]},
+            "selection_panel": {"mode": "static", "x": 20, "y": 380, "w": 220, "h": 90},
+            "production_queue": {"mode": "static", "x": 560, "y": 380, "w": 220, "h": 90},
+        },
+    }
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps(profile), encoding="utf-8")
+
+    def run(name: str, **kwargs):
+        out = tmp_path / name / "output.json"
+        out.parent.mkdir()
+        cfg = PipelineConfig(
+            video_path=str(assets["video"]),
+            profile_path=str(profile_path),
+            output_path=str(out),
+            end_sec=6.0,
+            supply_samples=3,
+            roi_samples=3,
+            ocr_engine="none",
+            supply_ocr_engine="digits",
+            **kwargs,
+        )
+        result = run_pipeline(cfg)
+        diag = {k: result["diagnostics"][k] for k in ("ocr_stats", "roi_tracking")}
+        return json.dumps([result["signals"], result["events"], diag]).replace(str(out.parent.as_posix()), "")
+
+    seq = run("seq")
+    assert '"supply_series": []' not in seq
+    staged = run("staged", staged=True, decode_workers=3, preprocess_workers=3, ocr_workers=2)
+    assert seq == staged
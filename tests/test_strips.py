@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from decode.ffmpeg_decode import get_frame_at, open_capture
+from decode.strips import StripCache, open_or_build_strips, strips_dir
+from pipeline import PipelineConfig, run_pipeline
+from roi.crop import ROITracker
+
+KINDS = ["supply", "selection_panel", "production_queue"]
+
+
+def _no_paths(entries):
+    return [{k: v for k, v in e.items() if k not in ("frame", "evidence")} for e in entries]
+
+
+@pytest.fixture(scope="module")
+def assets(tmp_path_factory):
+    root = tmp_path_factory.mktemp("clip")
+    return synthesize(root, Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+
+
+def test_strips_match_decoded_crops(tmp_path: Path, assets):
+    tracker = ROITracker(assets["profile"])
+    path = strips_dir(str(assets["video"]), assets["profile"], tracker.resolution, tmp_path)
+    cache = open_or_build_strips(str(assets["video"]), path, tracker.crop, KINDS, tracker.resolution)
+    assert cache.built and cache.frame_count == 20
+
+    cap = open_capture(str(assets["video"]))
+    for t in (0.0, 1.1, 2.5, 3.8):
+        frame = get_frame_at(cap, t, tracker.resolution)
+        for kind in KINDS:
+            assert np.array_equal(cache.crop(kind, cache.row_at(t)), tracker.crop(frame, kind))
+    cap.release()
+    assert cache.row_at(10.0) is None
+    assert isinstance(cache.crop("supply", 0), np.memmap)
+
+    again = open_or_build_strips(str(assets["video"]), path, tracker.crop, KINDS, tracker.resolution)
+    assert not again.built
+    assert StripCache.open(tmp_path / "missing") is None
+
+
+def test_template_rois_fall_back_to_decoding(tmp_path: Path, assets):
+    profile = json.loads(Path(assets["profile"]).read_text(encoding="utf-8"))
+    profile["rois"]["supply"]["mode"] = "template"
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps(profile), encoding="utf-8")
+    out = run_pipeline(
+        PipelineConfig(
+            video_path=str(assets["video"]),
+            profile_path=str(profile_path),
+            output_path=str(tmp_path / "out.json"),
+            end_sec=4.0,
+            ocr_engine="none",
+            strip_cache=True,
+            strip_cache_dir=str(tmp_path / "strips"),
+        )
+    )
+    assert out["diagnostics"]["strip_cache"] is None
+    assert out["diagnostics"]["warnings"]
+
+
+def test_pipeline_output_matches_with_strip_cache(tmp_path: Path, assets):
+    outputs = []
+    for name, extra in [("plain", {}), ("cold", {"strip_cache": True}), ("warm", {"strip_cache": True})]:
+        out = tmp_path / name / "output.json"
+        out.parent.mkdir()
+        result = run_pipeline(
+            PipelineConfig(
+                video_path=str(assets["video"]),
+                profile_path=str(assets["profile"]),
+                output_path=str(out),
+                end_sec=4.0,
+                supply_samples=3,
+                roi_samples=3,
+                ocr_engine="none",
+                supply_ocr_engine="digits",
+                strip_cache_dir=str(tmp_path / "strips"),
+                **extra,
+            )
+        )
+        outputs.append(result)
+    plain, cold, warm = outputs
+    for result in (cold, warm):
+        assert _no_paths(result["signals"]["supply_series"]) == _no_paths(plain["signals"]["supply_series"])
+        assert _no_paths(result["signals"]["queue_events"]) == _no_paths(plain["signals"]["queue_events"])
+        assert _no_paths(result["events"]) == _no_paths(plain["events"])
+        assert result["diagnostics"]["frames_decoded"] == 0
+    assert plain["signals"]["supply_series"]
+    assert cold["diagnostics"]["strip_cache"]["built"]
+    assert not warm["diagnostics"]["strip_cache"]["built"]
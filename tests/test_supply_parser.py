@@ -4,7 +4,7 @@ import cv2
 import numpy as np
 
 from ocr.engine import OCREngine
-from ocr.read_supply import read_supply
+from ocr.read_supply import SlashTracker, read_supply
 
 
 def _load_template(name: str) -> np.ndarray:
@@ -85,3 +85,34 @@ def test_read_supply_two_digits():
 
     assert result.used == 12
     assert result.total == 34
+
+
+def test_read_supply_slash_tracker_fast_path():
+    digit_left = _load_template("4")
+    digit_right = _load_template("9")
+    slash = _load_template("slash")
+
+    h = max(digit_left.shape[0], digit_right.shape[0], slash.shape[0]) + 4
+    w = digit_left.shape[1] + slash.shape[1] + digit_right.shape[1] + 8
+    canvas = np.zeros((h, w), dtype=np.uint8)
+
+    x = 2
+    y = 2
+    canvas[y : y + digit_left.shape[0], x : x + digit_left.shape[1]] = digit_left
+    x += digit_left.shape[1] + 2
+    canvas[y : y + slash.shape[0], x : x + slash.shape[1]] = slash
+    x += slash.shape[1] + 2
+    canvas[y : y + digit_right.shape[0], x : x + digit_right.shape[1]] = digit_right
+
+    roi = cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR)
+    templates_dir = Path(__file__).resolve().parents[1] / "a"
+    ocr = OCREngine("none")
+    tracker = SlashTracker()
+    first = read_supply(roi, templates_dir, ocr, tracker)
+    second = read_supply(roi, templates_dir, ocr, tracker)
+
+    assert (first.used, first.total) == (4, 9)
+    assert (second.used, second.total) == (4, 9)
+    assert tracker.fast_attempts == 1
+    assert tracker.fast_hits == 1
+    assert tracker.hit_rate == 1.0
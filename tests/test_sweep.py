@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from ocr.engine import OCRResult
+from ocr.memo import MemoEngine, OCRMemo
+from pipeline import PipelineConfig
+from sweep import expand_grid, format_table, parse_assignment, run_sweep
+
+
+class _CountingOCR:
+    name = "fake"
+    wants_raw = False
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def read_text(self, img, whitelist=None):
+        self.calls += 1
+        return OCRResult(str(int(img.sum()) % 97), 0.9)
+
+    def read_texts(self, imgs, whitelist=None):
+        return [self.read_text(img, whitelist) for img in imgs]
+
+
+def test_parse_assignment_and_grid():
+    assert parse_assignment("diff-threshold=0.02,0.05") == ("diff_threshold", [0.02, 0.05])
+    assert parse_assignment("ocr_engine=none,digits") == ("ocr_engine", ["none", "digits"])
+    assert parse_assignment("staged=true") == ("staged", [True])
+    grid = expand_grid({"diff_threshold": [0.02, 0.05], "supply_samples": [3, 7]})
+    assert len(grid) == 4 and grid[0] == {"diff_threshold": 0.02, "supply_samples": 3}
+    with pytest.raises(ValueError):
+        expand_grid({"no_such_field": [1]})
+
+
+def test_memo_engine_reuses_identical_crops():
+    memo = OCRMemo()
+    engine = _CountingOCR()
+    wrapped = MemoEngine(engine, memo)
+    img = np.arange(64, dtype=np.uint8).reshape(8, 8)
+    first = wrapped.read_text(img)
+    assert wrapped.read_text(img.copy()) == first
+    assert wrapped.read_text(img, "0123456789") == first
+    assert wrapped.read_text(img.T) is not None
+    assert engine.calls == 3
+    assert memo.stats == {"hits": 1, "misses": 3}
+    assert wrapped.read_texts([img, img + 1]) == [first, engine.read_text(img + 1)]
+    assert engine.calls == 5
+
+
+def test_sweep_shares_ocr_between_runs(tmp_path: Path):
+    assets = synthesize(tmp_path / "clip", Path(__file__).resolve().parents[1] / "a", SynthConfig(duration_sec=4.0, fps=5.0, intro_sec=1.0))
+    base = PipelineConfig(
+        video_path=str(assets["video"]),
+        profile_path=str(assets["profile"]),
+        output_path="unused.json",
+        end_sec=4.0,
+        supply_samples=3,
+        roi_samples=3,
+        ocr_engine="none",
+        supply_ocr_engine="digits",
+        strip_cache=True,
+        strip_cache_dir=str(tmp_path / "strips"),
+    )
+    rows = run_sweep(base, {"diff_threshold": [0.02, 0.05]}, str(assets["gt"]), tmp_path / "sweep")
+    assert len(rows) == 2
+    by_run = {row["run"]: row for row in rows}
+    assert by_run["run_000"]["ocr_calls"] > 0
+    assert by_run["run_001"]["ocr_calls"] == 0
+    assert by_run["run_001"]["memo_hits"] >= by_run["run_000"]["ocr_calls"]
+    assert (tmp_path / "sweep" / "run_001" / "output.json").exists()
+    assert "diff_threshold=0.05" in format_table(rows)
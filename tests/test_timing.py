@@ -0,0 +1,45 @@
+from timing import RESERVOIR_SIZE, StageTimer, activate, stage, timed
+
+
+@timed("work")
+def _work(x):
+    return x * 2
+
+
+def test_timed_records_only_when_active():
+    assert _work(2) == 4
+
+    timer = StageTimer()
+    with activate(timer):
+        for i in range(5):
+            _work(i)
+        with stage("outer"):
+            _work(1)
+    _work(3)
+
+    summary = timer.summary()
+    assert summary["enabled"] is True
+    assert summary["stages"]["work"]["calls"] == 6
+    assert summary["stages"]["outer"]["calls"] == 1
+    assert summary["stages"]["work"]["p95_ms"] >= summary["stages"]["work"]["p50_ms"]
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with activate(timer):
+        _work(1)
+    assert timer.summary() == {"enabled": False}
+
+
+def test_timer_memory_is_bounded_by_reservoir():
+    timer = StageTimer()
+    n = RESERVOIR_SIZE * 5
+    for i in range(n):
+        timer.record("step", (i % 100) / 1000.0)
+    timer.record("step", 1.0)
+    assert len(timer._stats["step"].reservoir) == RESERVOIR_SIZE
+    stats = timer.summary()["stages"]["step"]
+    assert stats["calls"] == n + 1
+    assert stats["max_ms"] == 1000.0
+    assert stats["total_sec"] == round(sum((i % 100) / 1000.0 for i in range(n)) + 1.0, 4)
+    assert 40.0 <= stats["p50_ms"] <= 60.0
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from bench.synth import SynthConfig, synthesize
+from detect.ui_presence import UIPresenceConfig, UIPresenceDetector, find_game_start, find_gameplay_intervals
+from pipeline import PipelineConfig, run_pipeline
+
+
+class _FakeCapture:
+    def __init__(self, template: np.ndarray, game_start: float, duration: float, fps: float = 10.0):
+        self.template = template
+        self.game_start = game_start
+        self.duration = duration
+        self.fps = fps
+        self.t = 0.0
+        self.reads = 0
+
+    def visible(self, t):
+        return t >= self.game_start
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.duration * self.fps
+        return 0.0
+
+    def set(self, prop, value):
+        self.t = value / 1000.0
+        return True
+
+    def read(self):
+        self.reads += 1
+        frame = np.full((120, 200, 3), 40, dtype=np.uint8)
+        if self.visible(self.t):
+            th, tw = self.template.shape[:2]
+            frame[5 : 5 + th, 120 : 120 + tw] = cv2.cvtColor(self.template, cv2.COLOR_GRAY2BGR)
+        return True, frame
+
+
+def test_find_game_start_binary_search():
+    base = Path(__file__).resolve().parents[1]
+    template = cv2.imread(str(base / "a" / "supply_frame.png"), cv2.IMREAD_GRAYSCALE)
+    cap = _FakeCapture(template, game_start=37.3, duration=420.0)
+    detector = UIPresenceDetector(template, region=(120, 5, template.shape[1], template.shape[0]))
+
+    start = find_game_start(cap, detector, 0.0, 420.0)
+
+    assert start is not None
+    assert 37.3 <= start <= 37.3 + detector.cfg.tolerance_sec
+    assert cap.reads < 20
+
+
+class _FlickerCapture(_FakeCapture):
+    def visible(self, t):
+        return 30.0 <= t < 80.0 or t >= self.game_start
+
+
+def test_find_game_start_returns_first_presence_when_hud_flickers():
+    base = Path(__file__).resolve().parents[1]
+    template = cv2.imread(str(base / "a" / "supply_frame.png"), cv2.IMREAD_GRAYSCALE)
+    cap = _FlickerCapture(template, game_start=200.0, duration=420.0)
+    detector = UIPresenceDetector(template, region=(120, 5, template.shape[1], template.shape[0]))
+
+    start = find_game_start(cap, detector, 0.0, 420.0)
+
+    assert start is not None
+    assert 30.0 <= start <= 30.0 + detector.cfg.tolerance_sec
+
+
+def test_find_gameplay_intervals_refines_edges_and_bridges_short_gaps():
+    absent = [(0.0, 12.4), (95.2, 140.7), (200.0, 201.5)]
+    probes = []
+
+    def present(t):
+        probes.append(t)
+        return t < 300.0 and not any(s <= t < e for s, e in absent)
+
+    intervals = find_gameplay_intervals(present, 0.0, 420.0, UIPresenceConfig(tolerance_sec=0.25, min_gap_sec=3.0))
+
+    assert len(intervals) == 2
+    (s0, e0), (s1, e1) = intervals
+    assert 12.4 <= s0 <= 12.4 + 0.25 and 95.2 <= e0 <= 95.2 + 0.25
+    assert 140.7 <= s1 <= 140.7 + 0.25 and 300.0 <= e1 <= 300.0 + 0.25
+    assert len(probes) <= 421 + 6 * 2
+    assert find_gameplay_intervals(lambda t: False, 0.0, 10.0) == []
+
+
+@pytest.mark.parametrize("decode_to_profile", [True, False])
+def test_pipeline_skips_mid_video_breaks(tmp_path, decode_to_profile):
+    # Encode above the profile resolution so native decoding really differs from profile-sized frames.
+    cfg = SynthConfig(
+        duration_sec=12.0, fps=5.0, intro_sec=2.0, breaks=((5.0, 8.0),), supply_frame_hud=True, frame_size=(1280, 720)
+    )
+    assets = synthesize(tmp_path / "clip", Path(__file__).resolve().parents[1] / "a", cfg)
+    out = run_pipeline(
+        PipelineConfig(
+            video_path=str(assets["video"]),
+            profile_path=str(assets["profile"]),
+            output_path=str(tmp_path / "output.json"),
+            end_sec=12.0,
+            supply_samples=3,
+            roi_samples=3,
+            ocr_engine="none",
+            skip_non_gameplay=True,
+            decode_to_profile=decode_to_profile,
+        )
+    )
+    gameplay = out["diagnostics"]["gameplay"]
+    (s0, e0), (s1, e1) = gameplay["intervals"]
+    assert 2.0 <= s0 <= 2.5 and 5.0 <= e0 <= 5.5 and 8.0 <= s1 <= 8.5 and e1 == 12.0
+    assert gameplay["skipped_sec"] >= 4.0
+    signals = out["signals"]["selection_changes"] + out["signals"]["queue_events"]
+    assert signals
+    assert not [e["t"] for e in signals if e["t"] < 2.0 or 5.0 <= e["t"] < 8.0]
@@ -0,0 +1,63 @@
+import random
+
+import cv2
+import numpy as np
+
+from ocr.engine import OCRResult
+from ocr.read_queue import read_queue
+from ocr.vocab import BKTree, NameSnapper, Vocabulary, levenshtein, normalize_name
+
+NAMES = ["SCV", "Marine", "Medic", "Firebat", "Command Center", "Supply Depot", "Barracks"]
+
+
+class _FakeOCR:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def read_text(self, img, whitelist=None):
+        self.calls += 1
+        return OCRResult(self.text, 0.9)
+
+
+def _panel(text):
+    img = np.full((90, 220, 3), (24, 32, 24), np.uint8)
+    cv2.putText(img, text, (6, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (230, 230, 230), 1, cv2.LINE_AA)
+    return img
+
+
+def test_bktree_matches_brute_force():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcde") for _ in range(rng.randint(2, 7))) for _ in range(200)]
+    tree = BKTree()
+    for w in words:
+        tree.add(w)
+    for q in ["abc", "eeed", "a", "bcdab"]:
+        expected = sorted({(levenshtein(q, w), w) for w in words if levenshtein(q, w) <= 2})
+        assert tree.search(q, 2) == expected
+
+
+def test_vocabulary_snaps_close_reads_and_rejects_junk():
+    vocab = Vocabulary(NAMES)
+    assert vocab.match("Marlne").name == "Marine"
+    assert vocab.match("C0mmand Centre").name == "Command Center"
+    assert vocab.match("SCV").distance == 0
+    assert vocab.match("xq7") is None
+    assert normalize_name("Supply Depot!") == "supplydepot"
+
+
+def test_snapper_rejects_junk_reads():
+    snapper = NameSnapper(Vocabulary(NAMES))
+    assert read_queue(_panel("Barracks"), _FakeOCR("Barrack5"), snapper=snapper).queue_text.text == "Barracks"
+    assert read_queue(_panel("Medic"), _FakeOCR("~~ii~~"), snapper=snapper).queue_text.text == ""
+    assert snapper.stats == {"snapped": 1, "exact": 0, "rejected": 1, "cache_hits": 0}
+
+
+def test_snapper_caches_confident_crops_without_glyph_cache():
+    snapper = NameSnapper(Vocabulary(NAMES))
+    ocr = _FakeOCR("Barracks")
+    panel = _panel("Barracks")
+    assert read_queue(panel, ocr, snapper=snapper).queue_text.text == "Barracks"
+    assert read_queue(panel, ocr, snapper=snapper).queue_text.text == "Barracks"
+    assert ocr.calls == 1
+    assert snapper.stats["cache_hits"] == 1